@@ -3,20 +3,25 @@
 FIXED Streamlit App with Correct Imports
 """
 import streamlit as st
-import pandas as pd
-import numpy as np
-import json
 import os
 import sys
 
 # ============================================
 # CRITICAL: ADD CURRENT DIRECTORY TO PYTHON PATH
 # ============================================
+# The script re-runs on every interaction; only touch sys.path once
 current_dir = os.getcwd()
-sys.path.insert(0, current_dir)  # Add current directory
-sys.path.insert(0, os.path.join(current_dir, ".."))  # Add parent
+parent_dir = os.path.join(current_dir, "..")
+if parent_dir not in sys.path:
+    sys.path.insert(0, current_dir)  # Add current directory
+    sys.path.insert(0, parent_dir)  # Add parent
+    print(f"📍 Python path: {sys.path[:3]}")
 
-print(f"📍 Python path: {sys.path[:3]}")
+from contextlib import nullcontext
+
+# Light modules only; numpy-backed matching, document readers and the
+# export writer are imported where they are first used
+from instrumentation import count, timed, trace_request
 
 # ============================================
 # INITIALIZE SESSION STATE
@@ -35,34 +40,18 @@ if 'matches' not in st.session_state:
 # ============================================
 class SimpleTextProcessor:
     def __init__(self):
-        pass
+        from skill_taxonomy import get_skill_matcher
+        # Shared skill taxonomy; aliases like 'ml' or 'js' match whole words only
+        self.skill_matcher = get_skill_matcher()
     
     def clean_text(self, text):
         return text.lower() if text else ""
     
+    @timed('extract_skills')
     def extract_skills(self, text):
-        skills = []
-        text_lower = text.lower()
-        skill_keywords = {
-            'python': ['python'],
-            'tensorflow': ['tensorflow', 'tf'],
-            'pytorch': ['pytorch'],
-            'aws': ['aws', 'amazon web services'],
-            'docker': ['docker'],
-            'machine learning': ['machine learning', 'ml'],
-            'sql': ['sql'],
-            'react': ['react', 'react.js'],
-            'javascript': ['javascript', 'js']
-        }
-        
-        for skill, keywords in skill_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    skills.append(skill)
-                    break
-        
-        return list(set(skills))
+        return self.skill_matcher.find(self.clean_text(text))
     
+    @timed('extract_experience')
     def extract_experience(self, text):
         import re
         text_lower = text.lower()
@@ -75,6 +64,7 @@ class SimpleTextProcessor:
         ]
         
         for pattern in patterns:
+            count('regex_evaluations')
             match = re.search(pattern, text_lower)
             if match:
                 try:
@@ -100,6 +90,7 @@ class SimpleResumeEmbedder:
         self.matcher = SimpleSimilarityMatcher(model_name)
         print(f"✅ Using SimpleResumeEmbedder ({model_name})")
     
+    @timed('process_resume')
     def process_resume(self, text, resume_id=None, metadata=None):
         skills = self.processor.extract_skills(text)
         experience = self.processor.extract_experience(text)
@@ -114,6 +105,7 @@ class SimpleResumeEmbedder:
             'metadata': metadata or {}
         }
     
+    @timed('process_job')
     def process_job(self, text, job_id=None, metadata=None):
         required_skills = self.processor.extract_skills(text)
         experience_needed = self.processor.extract_experience(text)
@@ -128,60 +120,94 @@ class SimpleResumeEmbedder:
             'metadata': metadata or {}
         }
     
-    def match_resume_to_jobs(self, resume_data, jobs_data, top_k=5):
-        results = []
+    @timed('match')
+    def match_resume_to_jobs(self, resume_data, jobs_data, top_k=5, policy=None):
+        if not jobs_data:
+            return []
+        from job_store import JobStore
+        from match_engine import BatchMatchEngine
+        from match_results import APP_KEYS, match_results
+        from scoring_policy import get_policy
         
-        for job in jobs_data:
-            # Calculate skill match
-            resume_skills = set(resume_data.get('skills', []))
-            job_skills = set(job.get('required_skills', []))
-            
-            skill_overlap = len(resume_skills.intersection(job_skills))
-            total_required = len(job_skills)
-            skill_match = skill_overlap / max(total_required, 1)
-            
-            # Experience match
-            resume_exp = resume_data.get('experience_years', 0)
-            job_exp = job.get('experience_needed', 0)
-            
-            if job_exp <= 0:
-                exp_match = 1.0
-            elif resume_exp >= job_exp:
-                exp_match = 1.0
-            else:
-                exp_match = resume_exp / max(job_exp, 1)
-            
-            # Combined score
-            combined_score = 0.6 * skill_match + 0.4 * exp_match
-            
-            # Match level
-            if combined_score >= 0.8:
-                match_level = "🔥 Excellent"
-            elif combined_score >= 0.6:
-                match_level = "👍 Good"
-            elif combined_score >= 0.4:
-                match_level = "⚠️ Fair"
-            else:
-                match_level = "❌ Poor"
-            
-            result = {
-                'job_title': job['metadata'].get('title', 'Unknown'),
-                'company': job['metadata'].get('company', 'Unknown'),
-                'match_percentage': round(combined_score * 100, 1),
-                'match_level': match_level,
-                'matched_skills': list(resume_skills.intersection(job_skills)),
-                'missing_skills': list(job_skills - resume_skills),
-                'total_skills_matched': skill_overlap,
-                'total_skills_required': total_required,
-                'skill_match': round(skill_match, 2),
-                'experience_match': round(exp_match, 2)
-            }
-            
-            results.append(result)
+        policy = get_policy(policy)
         
-        # Sort by score
-        results.sort(key=lambda x: x['match_percentage'], reverse=True)
-        return results[:top_k]
+        # Score every job at once; a job store keeps its engine up to date.
+        # This embedder is shared by every session, so a plain job list gets
+        # an engine of its own for this call only
+        if isinstance(jobs_data, JobStore):
+            engine = jobs_data.engine
+        else:
+            engine = BatchMatchEngine(jobs_data)
+        
+        # Ranking carries only job indexes and scores; each result builds its
+        # skill breakdown and match level when the UI first reads them.
+        # total_skills_matched/total_skills_required are kept for old callers
+        ranked = engine.rank(resume_data, top_k, policy=policy)
+        return match_results(engine.jobs, ranked, resume_data.get('skills', []), policy,
+                             keys=APP_KEYS)
+
+# ============================================
+# CACHED RESOURCES (shared across reruns and sessions)
+# ============================================
+JOB_CACHE_SIZE = 10000  # parsed job descriptions kept in memory
+DEDUP_THRESHOLD = 0.8  # shingle similarity at which a job is a repost of another
+
+@st.cache_resource(show_spinner=False)
+def get_embedder():
+    """Build the embedder once per process"""
+    # Try to import real modules first
+    try:
+        from ml_pipeline.embedder import ResumeEmbedder
+        return ResumeEmbedder(), True
+    except ImportError:
+        # Use simulated version
+        return SimpleResumeEmbedder(), False
+
+@st.cache_data(max_entries=JOB_CACHE_SIZE, show_spinner=False)
+def parse_job(description):
+    """Parse a job description; cached under a hash of its text"""
+    embedder, _ = get_embedder()
+    return embedder.process_job(description)
+
+@st.cache_resource(show_spinner=False)
+def get_document_extractor():
+    """Bounded pool for uploaded documents, shared by all sessions"""
+    from document_reader import DocumentExtractor
+    return DocumentExtractor(max_workers=2, timeout=20)
+
+def get_jobs_data(jobs):
+    """Session job store, patched with only the jobs that were added, changed or removed.
+    
+    Near-duplicates of a job already in the store are neither parsed nor stored.
+    """
+    if 'job_store' not in st.session_state:
+        from job_dedup import JobDeduplicator
+        from job_store import JobStore
+        st.session_state.job_store = JobStore()
+        st.session_state.job_keys = {}
+        st.session_state.job_dedup = JobDeduplicator(DEDUP_THRESHOLD)
+    store, known = st.session_state.job_store, st.session_state.job_keys
+    dedup = st.session_state.job_dedup
+    current = {f"job_{number + 1}": (job['description'], job.get('title'), job.get('company'))
+               for number, job in enumerate(jobs)}
+    # Removed and changed jobs go first; duplicates of a job that went
+    # away are looked at again
+    recheck = set()
+    for job_id in [job_id for job_id in known if current.get(job_id) != known[job_id]]:
+        recheck.update(dedup.remove(job_id))
+        store.delete(job_id)
+    for number, job in enumerate(jobs):
+        job_id = f"job_{number + 1}"
+        if known.get(job_id) == current[job_id] and job_id not in recheck:
+            continue
+        if dedup.add(job_id, job['description']) is not None:
+            count('duplicates_skipped')
+            continue
+        count('jobs_parsed')
+        store.upsert(job_id, {**parse_job(job['description']), 'metadata': job})
+    st.session_state.job_keys = current
+    store.maybe_compact()
+    return store
 
 # ============================================
 # PAGE SETUP
@@ -230,6 +256,11 @@ SAMPLE_JOBS = [
 with st.sidebar:
     st.header("⚙️ Settings")
     top_k = st.slider("Results to show", 1, 10, 5)
+    from scoring_policy import policy_names
+    policy_name = st.selectbox("Scoring policy", policy_names(),
+                               help="Weights and match levels from scoring_policies.json")
+    debug = st.checkbox("🐞 Debug timings", help="Show a per-request timing breakdown")
+    profile = st.checkbox("Profile requests (cProfile)", disabled=not debug)
     
     if st.button("Load Sample Data"):
         st.session_state.resume_text = SAMPLE_RESUME
@@ -247,6 +278,17 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.header("📝 Your Resume")
+    uploaded = st.file_uploader("Upload resume (PDF, DOCX or TXT)", type=["pdf", "docx", "txt"])
+    if uploaded is not None and st.session_state.get('uploaded_resume') != uploaded.file_id:
+        st.session_state.uploaded_resume = uploaded.file_id
+        try:
+            with st.spinner("Reading document..."):
+                text = get_document_extractor().extract(uploaded.getvalue(), uploaded.name)
+            st.session_state.resume_text = text
+            st.session_state.resume_input = text
+        except (TimeoutError, ValueError) as e:
+            st.error(f"Error: {str(e)}")
+    
     resume_text = st.text_area(
         "Enter resume:",
         height=250,
@@ -277,6 +319,10 @@ with col2:
     
     if st.session_state.jobs:
         st.write(f"Jobs loaded: {len(st.session_state.jobs)}")
+        duplicates = st.session_state.get('job_dedup')
+        if duplicates is not None and duplicates.duplicate_count:
+            st.caption(f"{duplicates.duplicate_count} near-duplicate postings are matched once, "
+                       f"as the job they repeat")
 
 # Process Button
 if st.button("🎯 Find Matches", type="primary"):
@@ -285,16 +331,13 @@ if st.button("🎯 Find Matches", type="primary"):
     elif not st.session_state.jobs:
         st.error("Please add jobs")
     else:
-        with st.spinner("Analyzing..."):
+        trace = trace_request(profile=profile) if debug else nullcontext()
+        with st.spinner("Analyzing..."), trace:
             try:
-                # Try to import real modules first
-                try:
-                    from ml_pipeline.embedder import ResumeEmbedder
-                    embedder = ResumeEmbedder()
+                embedder, is_real = get_embedder()
+                if is_real:
                     st.success("✅ Using real ML pipeline")
-                except ImportError:
-                    # Use simulated version
-                    embedder = SimpleResumeEmbedder()
+                else:
                     st.info("⚠️ Using simulated matching (real modules not found)")
                 
                 # Process resume
@@ -303,17 +346,12 @@ if st.button("🎯 Find Matches", type="primary"):
                     metadata={"source": "web_app"}
                 )
                 
-                # Process jobs
-                jobs_data = []
-                for job in st.session_state.jobs:
-                    job_data = embedder.process_job(
-                        job['description'],
-                        metadata=job
-                    )
-                    jobs_data.append(job_data)
+                # Process jobs (only new descriptions are parsed)
+                jobs_data = get_jobs_data(st.session_state.jobs)
                 
                 # Get matches
-                matches = embedder.match_resume_to_jobs(resume_data, jobs_data, top_k)
+                matches = embedder.match_resume_to_jobs(resume_data, jobs_data, top_k,
+                                                        policy=policy_name)
                 st.session_state.matches = matches
                 
                 if matches:
@@ -323,6 +361,23 @@ if st.button("🎯 Find Matches", type="primary"):
                     
             except Exception as e:
                 st.error(f"Error: {str(e)}")
+        if debug:
+            st.session_state.last_trace = {
+                'total_ms': round(trace.total_seconds * 1000, 2),
+                'stages': [{'stage': name, 'calls': calls, 'total_ms': total_ms}
+                           for name, calls, total_ms in trace.breakdown()],
+                'counters': trace.counters(),
+                'profile': trace.profile_text(),
+            }
+
+# Debug panel
+if debug and st.session_state.get('last_trace'):
+    last = st.session_state.last_trace
+    with st.expander(f"🐞 Last request: {last['total_ms']} ms", expanded=True):
+        st.table(last['stages'])
+        st.json(last['counters'])
+        if last['profile']:
+            st.code(last['profile'])
 
 # Show Results
 if st.session_state.matches:
@@ -348,10 +403,10 @@ if st.session_state.matches:
             
             st.markdown('</div>', unsafe_allow_html=True)
     
-    # Export
+    # Export (with per-match skill breakdown)
     if st.session_state.matches:
-        df = pd.DataFrame(st.session_state.matches)
-        csv = df.to_csv(index=False)
+        from match_export import matches_to_csv
+        csv = matches_to_csv(st.session_state.matches)
         st.download_button(
             "📥 Download CSV",
             csv,
@@ -0,0 +1,216 @@
+"""
+Load test of the app's "Find Matches" flow with many simulated sessions
+
+    python benchmarks/bench_app_load.py --sessions 50 --workers 4 --jobs 500
+    python benchmarks/bench_app_load.py --catalog shared distinct --save load.json
+
+Every session is a headless AppTest of app_fixed.py with its own session
+state. It loads a generated job catalog, enters a resume and clicks
+"Find Matches" --clicks times. Sessions are spread over --workers fresh
+processes that run at the same time. Each process stands in for one
+Streamlit server process: its sessions share st.cache_resource and
+st.cache_data. Within a process, sessions run one after another, because
+AppTest swaps a process-wide runtime on every run.
+
+The report gives latency percentiles of clicks and page loads, CPU time
+per session, resident memory per worker, and memory per session with all
+of a worker's sessions still alive. It also gives the pipeline counters
+per click. With "shared" every session gets the same catalog and with
+"distinct" each gets its own. The difference between the two shows what
+the shared parse caches save.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from skill_taxonomy import load_taxonomy  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, "app_fixed.py")
+
+FILLER = ("team product platform customers scalable reliable design deliver "
+          "collaborate stakeholders ownership data services quality testing").split()
+SKILLS = list(load_taxonomy()["skills"])
+CATALOG_MODES = ["shared", "distinct"]
+
+
+def make_text(rng, words, skill_rate=0.1):
+    parts = [f"{rng.randint(1, 12)}+ years of experience"]
+    for _ in range(words):
+        parts.append(rng.choice(SKILLS) if rng.random() < skill_rate else rng.choice(FILLER))
+    return " ".join(parts)
+
+
+def make_catalog(seed, count, words=80):
+    """Jobs as the app keeps them in st.session_state.jobs"""
+    rng = random.Random(seed)
+    return [{
+        "title": f"Job {seed}-{i}",
+        "company": f"LoadCorp {i % 50}",
+        "description": make_text(rng, words),
+        "skills": [],
+    } for i in range(count)]
+
+
+def rss_mb():
+    with open("/proc/self/status") if os.path.exists("/proc/self/status") else open(os.devnull) as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    samples = np.array(samples)
+    return {"p50_ms": round(float(np.percentile(samples, 50)), 1),
+            "p90_ms": round(float(np.percentile(samples, 90)), 1),
+            "p99_ms": round(float(np.percentile(samples, 99)), 1),
+            "max_ms": round(float(samples.max()), 1)}
+
+
+def run_session(number, jobs, clicks, timeout):
+    """One simulated user: page load, resume entry, then the clicks"""
+    from streamlit.testing.v1 import AppTest
+    result = {"load_ms": 0.0, "click_ms": [], "errors": []}
+    start = time.perf_counter()
+    app = AppTest.from_file(APP_PATH, default_timeout=timeout).run()
+    result["load_ms"] = (time.perf_counter() - start) * 1000
+    app.session_state.jobs = jobs
+    app.text_area(key="resume_input").input(make_text(random.Random(-number), 150)).run()
+    for _ in range(clicks):
+        button = next((b for b in app.button if "Find Matches" in b.label), None)
+        if button is None:
+            result["errors"].extend(str(e.value) for e in app.exception)
+            result["errors"].append("page did not render the Find Matches button")
+            break
+        start = time.perf_counter()
+        button.click().run()
+        result["click_ms"].append((time.perf_counter() - start) * 1000)
+        result["errors"].extend(e.value for e in app.error)
+        result["errors"].extend(str(e.value) for e in app.exception)
+        if not app.session_state.matches:
+            result["errors"].append("no matches")
+    return app, result
+
+
+def _quiet_worker():
+    # The app and the bare-mode runtime print on every run; errors still
+    # reach the report through the futures
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+
+
+def run_worker(numbers, catalog, jobs, clicks, timeout, seed):
+    """Run sessions one after another in this process; their apps stay alive"""
+    import instrumentation
+
+    # The first session pays for imports and cached resources; it is not counted
+    run_session(-1, make_catalog(seed - 1, 10), 1, timeout)
+    instrumentation.metrics.reset()
+    instrumentation.enable()
+
+    shared = make_catalog(seed, jobs) if catalog == "shared" else None
+    base_rss = rss_mb()
+    apps, sessions = [], []
+    for number in numbers:
+        session_jobs = shared or make_catalog(seed + number + 1, jobs)
+        cpu = time.process_time()
+        app, result = run_session(number, session_jobs, clicks, timeout)
+        result["cpu_ms"] = (time.process_time() - cpu) * 1000
+        apps.append(app)
+        sessions.append(result)
+    rss = rss_mb()
+    return {"sessions": sessions, "rss_mb": rss,
+            "rss_mb_per_session": (rss - base_rss) / max(len(numbers), 1),
+            "counters": instrumentation.metrics.as_dict()["counters"]}
+
+
+def run_mode(catalog, sessions, workers, jobs, clicks, timeout, seed=0):
+    """All sessions of one catalog mode, spread over fresh worker processes"""
+    workers = max(1, min(workers, sessions))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers, mp_context=get_context("spawn"),
+                             initializer=_quiet_worker) as pool:
+        futures = [pool.submit(run_worker, list(range(worker, sessions, workers)), catalog,
+                               jobs, clicks, timeout, seed)
+                   for worker in range(workers)]
+        results = [future.result() for future in futures]
+    wall = time.perf_counter() - start
+
+    finished = [session for result in results for session in result["sessions"]]
+    click_ms = [ms for session in finished for ms in session["click_ms"]]
+    total_clicks = max(len(click_ms), 1)
+    counters = {}
+    for result in results:
+        for name, value in result["counters"].items():
+            counters[name] = counters.get(name, 0) + value
+    cpu_ms = [session["cpu_ms"] for session in finished]
+    return {
+        "catalog": catalog,
+        "sessions": sessions,
+        "workers": workers,
+        "jobs_per_session": jobs,
+        "clicks": len(click_ms),
+        "wall_seconds": round(wall, 2),
+        "clicks_per_sec": round(len(click_ms) / wall, 2) if wall else 0.0,
+        "click": percentiles(click_ms),
+        "page_load": percentiles([session["load_ms"] for session in finished]),
+        "cpu_ms_per_session": round(float(np.mean(cpu_ms)), 1),
+        "cpu_ms_per_click": round(sum(cpu_ms) / total_clicks, 1),
+        "rss_mb_per_worker": round(float(np.mean([r["rss_mb"] for r in results])), 1),
+        "rss_mb_per_session": round(float(np.mean([r["rss_mb_per_session"] for r in results])), 2),
+        "counters_per_click": {name: round(value / total_clicks, 2)
+                               for name, value in sorted(counters.items())},
+        "errors": sorted({error for session in finished for error in session["errors"]}),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the app's matching flow")
+    parser.add_argument("--sessions", type=int, default=20, help="Simulated sessions per mode")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes running sessions")
+    parser.add_argument("--jobs", type=int, default=200, help="Jobs in each session's catalog")
+    parser.add_argument("--clicks", type=int, default=3, help="'Find Matches' clicks per session")
+    parser.add_argument("--catalog", nargs="+", choices=CATALOG_MODES, default=CATALOG_MODES)
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds allowed per app run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'catalog':<10}{'clicks/s':>10}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}"
+          f"{'load p50':>10}{'cpu ms/sess':>13}{'MB/worker':>11}{'MB/sess':>9}")
+    for catalog in args.catalog:
+        result = run_mode(catalog, args.sessions, args.workers, args.jobs, args.clicks,
+                          args.timeout, args.seed)
+        results[catalog] = result
+        click = result["click"]
+        print(f"{catalog:<10}{result['clicks_per_sec']:>10}{click.get('p50_ms', '-'):>9}"
+              f"{click.get('p90_ms', '-'):>9}{click.get('p99_ms', '-'):>9}"
+              f"{result['page_load']['p50_ms']:>10}{result['cpu_ms_per_session']:>13}"
+              f"{result['rss_mb_per_worker']:>11}{result['rss_mb_per_session']:>9}")
+        for error in result["errors"]:
+            print(f"  ⚠️ {error}")
+    for catalog, result in results.items():
+        print(f"\n{catalog} counters per click: {json.dumps(result['counters_per_click'])}")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results saved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
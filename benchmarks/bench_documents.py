@@ -0,0 +1,108 @@
+"""
+Benchmark resume document extraction on locally generated fixtures
+
+    python benchmarks/bench_documents.py --pages 5 50 200 --docs 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from document_reader import DocumentExtractor, extract_text  # noqa: E402
+
+RESUME_LINES = [
+    "Senior Machine Learning Engineer with 6 years of experience",
+    "Skills: Python, TensorFlow, PyTorch, AWS, Docker, Kubernetes, SQL",
+    "Built NLP and computer vision pipelines serving millions of users",
+    "Led a team of 5 engineers; mentored junior data scientists",
+    "Education: Masters in Computer Science",
+]
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(path, pages, lines_per_page=45):
+    """Write a plain text PDF with Helvetica pages, no third-party writer needed"""
+    objects = []  # object number n is objects[n - 1]
+    page_ids = []
+    font_id = 3
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(None)  # pages tree, filled in below
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for page in range(pages):
+        text = [f"({_pdf_escape(RESUME_LINES[(page + i) % len(RESUME_LINES)])}) '"
+                for i in range(lines_per_page)]
+        stream = ("BT /F1 10 Tf 14 TL 50 780 Td " + " ".join(text) + " ET").encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (font_id, content_id))
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                % (len(objects) + 1, xref))
+
+
+def make_docx(path, paragraphs):
+    from docx import Document
+    document = Document()
+    for i in range(paragraphs):
+        document.add_paragraph(RESUME_LINES[i % len(RESUME_LINES)])
+    document.save(path)
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 50, 200])
+    parser.add_argument("--docs", type=int, default=8, help="Documents for the pool run")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'fixture':<18}{'full ms':>10}{'early-stop ms':>15}{'chars':>10}")
+        for pages in args.pages:
+            pdf = os.path.join(tmp, f"resume_{pages}.pdf")
+            make_pdf(pdf, pages)
+            docx = os.path.join(tmp, f"resume_{pages}.docx")
+            make_docx(docx, pages * 45)
+            for path in (pdf, docx):
+                full, full_ms = _timed(extract_text, path, max_chars=None)
+                _, early_ms = _timed(extract_text, path)
+                print(f"{os.path.basename(path):<18}{full_ms:>10.1f}{early_ms:>15.1f}{len(full):>10}")
+
+        pdf = os.path.join(tmp, f"resume_{args.pages[-1]}.pdf")
+        with open(pdf, "rb") as f:
+            data = f.read()
+        extractor = DocumentExtractor(max_workers=args.workers)
+        _, pool_ms = _timed(extractor.extract_many, [(data, "resume.pdf")] * args.docs)
+        print(f"\npool: {args.docs} x {args.pages[-1]}-page PDF uploads with "
+              f"{args.workers} workers in {pool_ms:.0f} ms "
+              f"({args.docs / pool_ms * 1000:.1f} docs/s)")
+
+
+if __name__ == "__main__":
+    main()
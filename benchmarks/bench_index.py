@@ -0,0 +1,129 @@
+"""
+Benchmark approximate job retrieval: recall against latency
+
+    python benchmarks/bench_index.py --jobs 20000 --queries 200 --components 128
+
+Fits TF-IDF + SVD (LSA) on a seeded synthetic job corpus, prints
+index_recall_report for the dense job vectors (exact search against LSH
+at several table/bit settings), then compares ResumeEmbedder.search_jobs
+over each index with a full scan of the catalog: latency, and how many of
+the scan's top matches the index-backed search returns.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np  # noqa: E402
+
+from embedder import ResumeEmbedder, index_recall_report  # noqa: E402
+from match_engine import BatchMatchEngine  # noqa: E402
+from skill_taxonomy import load_taxonomy  # noqa: E402
+
+FILLER = ("team product platform customers scalable reliable design deliver "
+          "collaborate stakeholders ownership data services quality testing "
+          "production features roadmap agile mentor communication").split()
+SKILLS = list(load_taxonomy()["skills"])
+
+# LSHIndex settings compared with exact search
+CONFIGS = [
+    {"n_tables": 4, "n_bits": 14},
+    {"n_tables": 8, "n_bits": 12},
+    {"n_tables": 16, "n_bits": 10},
+    {"n_tables": 16, "n_bits": 10, "multiprobe": False},
+]
+
+
+def make_corpus(rng, n_texts, topics, words=120, topic_rate=0.3):
+    """Texts drawn from a few skill topics, so neighbours are meaningful"""
+    texts = []
+    for _ in range(n_texts):
+        topic = rng.choice(topics)
+        parts = [f"{rng.randint(0, 10)} years of experience"]
+        for _ in range(words):
+            roll = rng.random()
+            if roll < topic_rate:
+                parts.append(rng.choice(topic))
+            elif roll < topic_rate + 0.03:
+                parts.append(rng.choice(SKILLS))
+            else:
+                parts.append(rng.choice(FILLER))
+        texts.append(" ".join(parts))
+    return texts
+
+
+def _percentiles(latencies):
+    latencies = np.array(latencies)
+    return float(np.percentile(latencies, 50)), float(np.percentile(latencies, 99))
+
+
+def compare_search(embedder, jobs, resumes, k, n_candidates, configs):
+    """search_jobs over each index against ranking the whole catalog"""
+    # Built once, so the scan is timed like a long-lived catalog's
+    engine = BatchMatchEngine(jobs)
+    latencies, truth = [], []
+    for resume in resumes:
+        start = time.perf_counter()
+        ranked = engine.rank(resume, k, policy=embedder.policy)
+        latencies.append((time.perf_counter() - start) * 1000)
+        truth.append({jobs[index]["id"] for index, *_ in ranked})
+    p50, p99 = _percentiles(latencies)
+    print(f"\n{'retrieval':<72}{'agree@' + str(k):>10}{'p50 ms':>10}{'p99 ms':>10}")
+    print(f"{'full scan (BatchMatchEngine.rank)':<72}{1.0:>10.3f}{p50:>10.2f}{p99:>10.2f}")
+
+    for backend, params in [("exact", {})] + [("lsh", params) for params in configs]:
+        index = embedder.build_job_index(jobs, backend, **params)
+        latencies, agree = [], []
+        for resume, expected in zip(resumes, truth):
+            start = time.perf_counter()
+            matches = embedder.search_jobs(resume, jobs, index, k, n_candidates)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found = {match["job_id"] for match in matches}
+            agree.append(len(found & expected) / max(len(expected), 1))
+        p50, p99 = _percentiles(latencies)
+        name = f"search_jobs[{backend}] {params or ''}"
+        print(f"{name:<72}{np.mean(agree):>10.3f}{p50:>10.2f}{p99:>10.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--components", type=int, default=128, help="SVD dimensions")
+    parser.add_argument("--topics", type=int, default=40, help="Skill topics in the corpus")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--candidates", type=int, default=200,
+                        help="Candidates search_jobs re-ranks per query")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    topics = [rng.sample(SKILLS, min(12, len(SKILLS))) for _ in range(args.topics)]
+    job_texts = make_corpus(rng, args.jobs, topics)
+    resume_texts = make_corpus(rng, args.queries, topics, words=200)
+
+    embedder = ResumeEmbedder(n_components=args.components)
+    start = time.perf_counter()
+    embedder.fit_jobs(job_texts)
+    print(f"fit TF-IDF + SVD({embedder.matcher.svd.n_components}) on {args.jobs:,} jobs: "
+          f"{time.perf_counter() - start:,.1f} s")
+
+    start = time.perf_counter()
+    jobs = [embedder.process_job(text, job_id=f"job_{i}",
+                                 metadata={"title": f"Job {i}", "company": "BenchCorp"})
+            for i, text in enumerate(job_texts)]
+    resumes = [embedder.process_resume(text) for text in resume_texts]
+    print(f"process {len(jobs):,} jobs and {len(resumes):,} resumes: "
+          f"{time.perf_counter() - start:,.1f} s\n")
+
+    vectors = np.stack([job["embedding"] for job in jobs])
+    queries = np.stack([resume["embedding"] for resume in resumes])
+    index_recall_report(vectors, queries, args.k, CONFIGS)
+    compare_search(embedder, jobs, resumes, args.k, args.candidates, CONFIGS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmarks for the extraction and matching hot paths
+
+    python benchmarks/bench_matching.py --jobs 1000 100000 --save baseline.json
+    python benchmarks/bench_matching.py --jobs 1000 100000 --compare baseline.json
+
+Every case reports throughput, p50/p99 latency and peak traced memory.
+Corpora are synthetic and seeded, so runs are comparable.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np  # noqa: E402
+
+from embedder import ResumeEmbedder  # noqa: E402
+from match_engine import BatchMatchEngine  # noqa: E402
+from skill_taxonomy import load_taxonomy  # noqa: E402
+from text_processor import TextProcessor  # noqa: E402
+
+FILLER = ("team product platform customers scalable reliable design deliver "
+          "collaborate stakeholders ownership data services quality testing "
+          "production features roadmap agile mentor communication").split()
+SKILLS = load_taxonomy()["skills"]
+SKILL_WORDS = [alias for skill, entry in SKILLS.items()
+               for alias in [skill, *entry.get("aliases", [])]]
+EDUCATION = ["", "Bachelor of Science.", "Masters in Computer Science.", "PhD in Statistics."]
+
+# Resume lengths in words
+RESUME_SIZES = {"short": 80, "medium": 600, "long": 5000}
+
+
+def make_text(rng, words, skill_rate=0.08):
+    parts = [f"{rng.randint(1, 12)} years of experience"]
+    for _ in range(words):
+        parts.append(rng.choice(SKILL_WORDS) if rng.random() < skill_rate else rng.choice(FILLER))
+    parts.append(rng.choice(EDUCATION))
+    return " ".join(parts)
+
+
+def make_parsed_jobs(rng, count, skills):
+    """Parsed job records without running the parser (for big catalogs)"""
+    return [{
+        "id": f"job_{i}",
+        "required_skills": rng.sample(skills, rng.randint(2, 8)),
+        "experience_needed": rng.randint(0, 10),
+        "metadata": {"title": f"Job {i}", "company": "BenchCorp"},
+    } for i in range(count)]
+
+
+def measure(func, inputs, repeat=1):
+    """Per-call latencies (ms) and peak memory of one traced call"""
+    func(inputs[0])  # warm up caches and lazily built state
+    latencies = []
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter()
+            func(item)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    gc.collect()
+    tracemalloc.start()
+    func(inputs[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = np.array(latencies)
+    return {
+        "calls": len(latencies),
+        "throughput_per_sec": round(1000 * len(latencies) / latencies.sum(), 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+        "peak_mem_kb": round(peak / 1024, 1),
+    }
+
+
+def run(job_sizes, samples, seed=0):
+    rng = random.Random(seed)
+    processor = TextProcessor()
+    embedder = ResumeEmbedder()
+    results = {}
+
+    def record(name, stats):
+        results[name] = stats
+        print(f"{name:<38}{stats['throughput_per_sec']:>14,.1f}/s"
+              f"{stats['p50_ms']:>11.3f}{stats['p99_ms']:>11.3f}{stats['peak_mem_kb']:>12,.1f}")
+
+    print(f"{'case':<38}{'throughput':>16}{'p50 ms':>11}{'p99 ms':>11}{'peak KiB':>12}")
+    for size, words in RESUME_SIZES.items():
+        texts = [make_text(rng, words) for _ in range(samples)]
+        cleaned = [processor.clean_text(text) for text in texts]
+        record(f"clean_text[{size}]", measure(processor.clean_text, texts))
+        record(f"extract_skills[{size}]", measure(processor.extract_skills, cleaned))
+        record(f"extract_experience[{size}]", measure(processor.extract_experience, cleaned))
+        record(f"analyze_text[{size}]", measure(processor.analyze_text, texts))
+        record(f"process_resume[{size}]", measure(embedder.process_resume, texts))
+
+    job_texts = [make_text(rng, 120) for _ in range(samples)]
+    record("process_job", measure(embedder.process_job, job_texts))
+
+    skills = list(SKILLS)
+    resumes = [{"skills": rng.sample(skills, rng.randint(3, 10)),
+                "experience_years": rng.randint(0, 12)} for _ in range(samples)]
+    for count in job_sizes:
+        jobs = make_parsed_jobs(rng, count, skills)
+        repeat_resumes = resumes[:max(3, samples // max(1, count // 1000))]
+
+        start = time.perf_counter()
+        engine = BatchMatchEngine(jobs)
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"  engine build for {count:,} jobs: {build_ms:,.0f} ms")
+        results[f"engine_build[{count}]"] = {"ms": round(build_ms, 1)}
+
+        record(f"match_resume_to_jobs[{count}]",
+               measure(lambda r: embedder.find_best_matches(r, jobs, 5), repeat_resumes))
+        record(f"rank[{count}]", measure(lambda r: engine.rank(r, 5), repeat_resumes))
+        record(f"rank_unpruned[{count}]",
+               measure(lambda r: engine.rank(r, 5, prune=False), repeat_resumes))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print throughput change per case; returns names of regressed cases"""
+    regressions = []
+    print(f"\n{'case':<38}{'baseline/s':>14}{'now/s':>14}{'change':>10}")
+    for name, stats in results.items():
+        old = baseline.get("results", {}).get(name)
+        if not old or "throughput_per_sec" not in stats:
+            continue
+        change = stats["throughput_per_sec"] / old["throughput_per_sec"] - 1
+        flag = "  ⚠️" if change < -tolerance else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<38}{old['throughput_per_sec']:>14,.1f}{stats['throughput_per_sec']:>14,.1f}"
+              f"{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark extraction and matching")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Catalog sizes (up to 1000000)")
+    parser.add_argument("--samples", type=int, default=50, help="Inputs per case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="Write results as a baseline JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed throughput drop before flagging a regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.jobs, args.samples, args.seed)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "numpy": np.__version__, "results": results}, f, indent=2)
+        print(f"\n✅ Baseline saved to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Cold-start benchmark for the app and library modules
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --save startup.json
+
+Every case runs in a fresh interpreter and reports the median import (or
+first request) time, resident memory afterwards and which heavy optional
+dependencies ended up loaded. Those should only appear once a feature
+that needs them is used.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+HEAVY_MODULES = ["pandas", "sklearn", "scipy", "pyarrow", "pdfplumber", "PyPDF2", "docx"]
+
+RESUME = ("Senior Python developer with 6 years of experience building machine learning "
+          "services with TensorFlow, Docker and AWS. Master of Science in Computer Science.")
+JOB = ("We need a Python engineer with 5+ years experience in machine learning, "
+       "Docker and Kubernetes. Bachelor degree required.")
+
+# name -> code timed in a fresh interpreter
+CASES = {
+    "import text_processor": "import text_processor",
+    "import embedder": "import embedder",
+    "import match_service": "import match_service",
+    "app first run": (
+        "from streamlit.testing.v1 import AppTest\n"
+        "AppTest.from_file(os.path.join(ROOT, 'app_fixed.py'), default_timeout=120).run()"
+    ),
+    "first match request": (
+        "from embedder import ResumeEmbedder\n"
+        "embedder = ResumeEmbedder()\n"
+        "resume = embedder.process_resume(RESUME)\n"
+        "job = embedder.process_job_description(JOB, job_id='job_1')\n"
+        "embedder.find_best_matches(resume, [job])"
+    ),
+}
+
+_RUNNER = """
+import json, os, sys, time
+ROOT, RESUME, JOB = {root!r}, {resume!r}, {job!r}
+sys.path.insert(0, ROOT)
+start = time.perf_counter()
+exec(compile({code!r}, "<case>", "exec"))
+seconds = time.perf_counter() - start
+rss_kb = 0
+with open("/proc/self/status") if os.path.exists("/proc/self/status") else open(os.devnull) as f:
+    for line in f:
+        if line.startswith("VmRSS:"):
+            rss_kb = int(line.split()[1])
+if not rss_kb:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": seconds, "rss_kb": rss_kb,
+                  "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_case(code, runs):
+    script = _RUNNER.format(root=ROOT, resume=RESUME, job=JOB, code=code, heavy=HEAVY_MODULES)
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                             cwd=ROOT, check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "runs": runs,
+        "median_ms": round(statistics.median(s["seconds"] for s in samples) * 1000, 1),
+        "rss_mb": round(statistics.median(s["rss_kb"] for s in samples) / 1024, 1),
+        "heavy_loaded": samples[-1]["loaded"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cold imports and first requests")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per case")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--save", help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'case':<22} {'median ms':>10} {'rss MB':>8}  heavy modules loaded")
+    for name in args.cases:
+        try:
+            result = run_case(CASES[name], args.runs)
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<22} ❌ failed: {e.stderr.strip().splitlines()[-1:]}")
+            continue
+        results[name] = result
+        print(f"{name:<22} {result['median_ms']:>10} {result['rss_mb']:>8}  "
+              f"{', '.join(result['heavy_loaded']) or '-'}")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results saved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark skill taxonomy compile, load and extraction against taxonomy size
+
+    python benchmarks/bench_taxonomy.py --skills 200 2000 20000
+
+Synthetic taxonomies (three aliases per skill, some implications) are
+written to a temporary directory; extraction runs over the same text for
+every size, so the scan time shows how little it grows with the taxonomy.
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from skill_taxonomy import TAXONOMY_PATH, load_skill_matcher  # noqa: E402
+
+
+def make_taxonomy(rng, n_skills):
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+
+    names = list(dict.fromkeys(" ".join(word() for _ in range(rng.randint(1, 2)))
+                               for _ in range(n_skills)))
+    skills = {}
+    for i, name in enumerate(names):
+        entry = {"aliases": [word(), f"{name}-{word()}"]}
+        if i and rng.random() < 0.3:
+            entry["implies"] = [names[rng.randrange(i)]]
+        skills[name] = entry
+    return {"version": 1, "skills": skills}
+
+
+def make_text(rng, taxonomy, words=20000, skill_rate=0.02):
+    skills = list(taxonomy["skills"])
+    filler = ["experience", "team", "built", "with", "and", "systems", "the", "years"]
+    return " ".join(rng.choice(skills) if rng.random() < skill_rate else rng.choice(filler)
+                    for _ in range(words))
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--skills", type=int, nargs="+", default=[200, 2000, 20000])
+    parser.add_argument("--words", type=int, default=20000, help="Words of text to scan")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = [("shipped", TAXONOMY_PATH)]
+        for n_skills in args.skills:
+            path = os.path.join(tmp, f"taxonomy_{n_skills}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(make_taxonomy(rng, n_skills), f)
+            cases.append((f"{n_skills} skills", path))
+        with open(cases[-1][1], encoding="utf-8") as f:
+            text = make_text(rng, json.load(f), args.words)
+
+        print(f"{'taxonomy':<14}{'skills':>8}{'compile ms':>12}{'load ms':>10}{'scan ms':>10}{'found':>8}")
+        for name, path in cases:
+            cache_dir = os.path.join(tmp, "cache", name)
+            matcher, compile_ms = _timed(load_skill_matcher, path, cache_dir)
+            matcher, load_ms = _timed(load_skill_matcher, path, cache_dir)
+            found, scan_ms = _timed(matcher.find, text)
+            print(f"{name:<14}{len(matcher):>8}{compile_ms:>12.1f}{load_ms:>10.1f}"
+                  f"{scan_ms:>10.1f}{len(found):>8}")
+
+
+if __name__ == "__main__":
+    main()
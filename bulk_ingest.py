@@ -0,0 +1,257 @@
+"""
+Headless bulk ingestion of resumes and job postings
+
+Streams JSONL or CSV records, parses them in chunks on a process pool
+and writes JSONL results in input order:
+
+    python bulk_ingest.py jobs.jsonl parsed_jobs.jsonl --kind job --workers 8
+
+With --dedup-threshold, job postings that are near-duplicates of an
+earlier one (see job_dedup) are dropped before parsing and listed in
+--duplicates-output instead.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+# Field holding the document text, per record kind
+DEFAULT_TEXT_FIELDS = {"job": "description", "resume": "text", "text": "text"}
+
+# Set up once per worker process by _init_worker
+_worker = None
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield records one at a time from a .jsonl or .csv file"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def chunked(records: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class _Worker:
+    """Parser state living in one worker process"""
+
+    def __init__(self, kind: str, model_path: Optional[str], cache_dir: Optional[str]):
+        self.kind = kind
+        if kind == "text":
+            from extraction_cache import ExtractionCache
+            from text_processor import TextProcessor
+            cache = ExtractionCache(cache_dir) if cache_dir else None
+            self.processor = TextProcessor(cache=cache)
+        else:
+            from embedder import ResumeEmbedder
+            self.embedder = ResumeEmbedder(model_path=model_path)
+
+    def parse(self, record_id, text: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        if self.kind == "text":
+            return {"id": record_id, **self.processor.analyze_text(text), "metadata": metadata}
+        if self.kind == "job":
+            parsed = self.embedder.process_job(text, job_id=record_id, metadata=metadata)
+        else:
+            parsed = self.embedder.process_resume(text, resume_id=record_id, metadata=metadata)
+        # Dense embeddings are written out; sparse TF-IDF rows are not
+        embedding = parsed.pop("embedding", None)
+        if isinstance(embedding, np.ndarray):
+            parsed["embedding"] = embedding.tolist()
+        return parsed
+
+
+def _init_worker(kind, model_path, cache_dir):
+    global _worker
+    _worker = _Worker(kind, model_path, cache_dir)
+
+
+def _parse_chunk(chunk):
+    start = time.perf_counter()
+    parsed = [_worker.parse(*item) for item in chunk]
+    return parsed, time.perf_counter() - start
+
+
+class IngestStats:
+    """Record counts and time spent per stage"""
+
+    def __init__(self):
+        self.records = 0
+        self.duplicates = 0  # near-duplicates dropped before parsing
+        self.read_seconds = 0.0
+        self.parse_seconds = 0.0  # summed over workers
+        self.write_seconds = 0.0
+        self.dedup_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        def rate(seconds):
+            return self.records / seconds if seconds > 0 else 0.0
+        return {
+            "records": self.records,
+            "duplicates": self.duplicates,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "read_per_sec": round(rate(self.read_seconds), 1),
+            "parse_per_sec_per_worker": round(rate(self.parse_seconds), 1),
+            "write_per_sec": round(rate(self.write_seconds), 1),
+            "dedup_seconds": round(self.dedup_seconds, 3),
+            "overall_per_sec": round(rate(self.wall_seconds), 1),
+        }
+
+
+def iter_ingest(records: Iterable[Dict[str, Any]], kind: str = "job",
+                text_field: Optional[str] = None, id_field: str = "id",
+                workers: Optional[int] = None, chunk_size: int = 500,
+                model_path: Optional[str] = None, cache_dir: Optional[str] = None,
+                stats: Optional[IngestStats] = None,
+                dedup=None) -> Iterator[Dict[str, Any]]:
+    """Parse records and yield results in input order.
+
+    At most two chunks per worker are in flight, so memory stays flat
+    however long the input is. workers=0 parses in the calling process.
+    With a JobDeduplicator as ``dedup``, records whose text duplicates an
+    earlier record's are skipped; dedup.groups() has them afterwards.
+    """
+    text_field = text_field or DEFAULT_TEXT_FIELDS[kind]
+    stats = stats or IngestStats()
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    def items():
+        for number, record in enumerate(records):
+            record = dict(record)
+            text = record.pop(text_field, "") or ""
+            record_id = record.get(id_field)
+            if record_id in (None, ""):
+                record_id = f"{kind}_{number + 1}"
+            if dedup is not None:
+                start = time.perf_counter()
+                canonical = dedup.add(record_id, text)
+                stats.dedup_seconds += time.perf_counter() - start
+                if canonical is not None:
+                    stats.duplicates += 1
+                    continue
+            yield record_id, text, record
+
+    def timed_chunks():
+        source = chunked(items(), chunk_size)
+        while True:
+            start, dedup_seconds = time.perf_counter(), stats.dedup_seconds
+            chunk = next(source, None)
+            stats.read_seconds += time.perf_counter() - start - (stats.dedup_seconds - dedup_seconds)
+            if chunk is None:
+                return
+            yield chunk
+
+    if workers == 0:
+        _init_worker(kind, model_path, cache_dir)
+        for chunk in timed_chunks():
+            parsed, seconds = _parse_chunk(chunk)
+            stats.parse_seconds += seconds
+            stats.records += len(parsed)
+            yield from parsed
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(kind, model_path, cache_dir)) as pool:
+        pending = deque()
+        for chunk in timed_chunks():
+            pending.append(pool.submit(_parse_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                parsed, seconds = pending.popleft().result()
+                stats.parse_seconds += seconds
+                stats.records += len(parsed)
+                yield from parsed
+        while pending:
+            parsed, seconds = pending.popleft().result()
+            stats.parse_seconds += seconds
+            stats.records += len(parsed)
+            yield from parsed
+
+
+def ingest(input_path: str, output_path: str, dedup_threshold: Optional[float] = None,
+           duplicates_path: Optional[str] = None, **options) -> IngestStats:
+    """Parse every record of input_path into a JSONL file at output_path.
+
+    With dedup_threshold, near-duplicate records are left out and, if
+    duplicates_path is given, written there as
+    ``{"id": ..., "duplicate_of": canonical id}`` lines.
+    """
+    stats = IngestStats()
+    start = time.perf_counter()
+    dedup = None
+    if dedup_threshold is not None:
+        from job_dedup import JobDeduplicator
+        dedup = JobDeduplicator(dedup_threshold)
+    with open(output_path, "w", encoding="utf-8") as out:
+        for parsed in iter_ingest(read_records(input_path), stats=stats, dedup=dedup, **options):
+            write_start = time.perf_counter()
+            out.write(json.dumps(parsed))
+            out.write("\n")
+            stats.write_seconds += time.perf_counter() - write_start
+    if dedup is not None and duplicates_path:
+        with open(duplicates_path, "w", encoding="utf-8") as out:
+            for canonical, duplicates in dedup.groups().items():
+                for duplicate in duplicates:
+                    out.write(json.dumps({"id": duplicate, "duplicate_of": canonical}))
+                    out.write("\n")
+    stats.wall_seconds = time.perf_counter() - start
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-parse resumes or job postings")
+    parser.add_argument("input", help="JSONL or CSV input file")
+    parser.add_argument("output", help="JSONL output file")
+    parser.add_argument("--kind", choices=sorted(DEFAULT_TEXT_FIELDS), default="job")
+    parser.add_argument("--text-field", help="Field holding the document text")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--workers", type=int, default=None, help="0 parses in-process")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--model-path", help="Fitted TF-IDF model for embeddings")
+    parser.add_argument("--cache-dir", help="Extraction cache directory (kind=text)")
+    parser.add_argument("--catalog-dir", help="Also save parsed jobs as a JobCatalog (kind=job)")
+    parser.add_argument("--dedup-threshold", type=float,
+                        help="Drop postings this similar (0-1) to an earlier one (kind=job)")
+    parser.add_argument("--duplicates-output", help="JSONL file listing dropped duplicates")
+    args = parser.parse_args(argv)
+    if args.catalog_dir and args.kind != "job":
+        parser.error("--catalog-dir needs --kind job")
+    if args.dedup_threshold is not None and args.kind != "job":
+        parser.error("--dedup-threshold needs --kind job")
+    if args.duplicates_output and args.dedup_threshold is None:
+        parser.error("--duplicates-output needs --dedup-threshold")
+
+    stats = ingest(args.input, args.output, kind=args.kind, text_field=args.text_field,
+                   id_field=args.id_field, workers=args.workers, chunk_size=args.chunk_size,
+                   model_path=args.model_path, cache_dir=args.cache_dir,
+                   dedup_threshold=args.dedup_threshold, duplicates_path=args.duplicates_output)
+    print(f"✅ Ingested {stats.records} records", file=sys.stderr)
+    if args.dedup_threshold is not None:
+        print(f"✅ Dropped {stats.duplicates} near-duplicates", file=sys.stderr)
+    if args.catalog_dir:
+        from job_catalog import JobCatalog
+        JobCatalog.from_jobs(read_records(args.output)).save(args.catalog_dir)
+        print(f"✅ Catalog saved to {args.catalog_dir}", file=sys.stderr)
+    print(json.dumps(stats.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
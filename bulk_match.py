@@ -0,0 +1,249 @@
+"""
+All-pairs matching of a resume pool against a job catalog
+
+Shards the parsed resumes across worker processes. Every worker maps the
+same JobCatalog files read-only, so the catalog lives in memory once
+however many workers run. Per-resume top-k results stream out as shards
+finish; per-job top-k candidate lists are merged from every shard and
+written at the end:
+
+    python bulk_match.py parsed_resumes.jsonl --catalog catalog_dir \\
+        --output matches.csv --job-output job_candidates.jsonl --workers 8 \\
+        --policy senior_ml
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from bulk_ingest import chunked, read_records
+from job_catalog import JobCatalog
+from match_engine import BatchMatchEngine
+from scoring_policy import DEFAULT_POLICY, ScoringPolicy, get_policy
+
+# Score-by-resume cells materialized at once inside a shard
+_BLOCK_CELLS = 1 << 21
+
+# Per-job candidates are ranked on an int64 key: the score quantized to
+# 1e-9 in the high bits and the inverted resume number in the low 32, so
+# equal scores go to the earlier resume whatever the sharding was
+_SCORE_SCALE = 1e9
+_INDEX_MASK = (1 << 32) - 1
+
+# Catalog, engine and scoring policy of the current worker process, see _init_worker
+_catalog = None
+_engine = None
+_policy = DEFAULT_POLICY
+
+
+def _init_worker(catalog_dir: Optional[str], catalog: Optional[JobCatalog] = None,
+                 policy: ScoringPolicy = DEFAULT_POLICY):
+    global _catalog, _engine, _policy
+    _catalog = catalog if catalog is not None else JobCatalog.load(catalog_dir)
+    _engine = BatchMatchEngine(_catalog)
+    # Compiled once per worker, not per shard
+    _policy = policy
+    _engine.compile_policy(policy)
+
+
+def _merge_job_top(best: Optional[np.ndarray], keys: np.ndarray, job_top_k: int) -> np.ndarray:
+    """Keep the job_top_k largest keys per column (job)"""
+    stacked = keys if best is None else np.concatenate([best, keys])
+    if len(stacked) <= job_top_k:
+        return stacked
+    return np.partition(stacked, len(stacked) - job_top_k, axis=0)[-job_top_k:]
+
+
+def _match_dict(job: int, skill_match: float, exp_match: float, combined: float,
+                resume_skills: set) -> Dict[str, Any]:
+    job_skills = set(_catalog.job_skills(job))
+    matched = resume_skills & job_skills
+    return {
+        "job_id": _catalog.ids[job],
+        "job_title": _catalog.titles[job],
+        "company": _catalog.companies[job],
+        "match_percentage": round(combined * 100, 1),
+        "match_level": _policy.match_level(combined),
+        "skill_match": round(skill_match, 2),
+        "experience_match": round(exp_match, 2),
+        "matched_skills": sorted(matched),
+        "missing_skills": sorted(job_skills - resume_skills),
+        "total_matched": len(matched),
+        "total_required": len(job_skills),
+    }
+
+
+def _match_shard(start: int, resumes: List[Dict[str, Any]], top_k: int, job_top_k: int,
+                 by: str) -> Tuple[int, List[List[Dict[str, Any]]], Optional[np.ndarray], float]:
+    """Score one shard; returns (start, per-resume matches, per-job keys, seconds)"""
+    began = time.perf_counter()
+    block = max(1, _BLOCK_CELLS // max(1, len(_engine)))
+    results, best = [], None
+    for offset in range(0, len(resumes), block):
+        batch = resumes[offset:offset + block]
+        skill_match, exp_match, combined = _engine.score_many(batch, _policy)
+        for i, resume in enumerate(batch):
+            skills = set(resume.get("skills", []))
+            results.append([_match_dict(job, s, e, c, skills) for job, s, e, c in
+                            _engine.top(skill_match[i], exp_match[i], combined[i], top_k, by)])
+        if job_top_k > 0 and len(_engine):
+            scores = combined if by == "combined" else skill_match
+            numbers = start + offset + np.arange(len(batch), dtype=np.int64)
+            keys = (np.rint(scores * _SCORE_SCALE).astype(np.int64) << 32) \
+                | (_INDEX_MASK - numbers)[:, None]
+            best = _merge_job_top(best, keys, job_top_k)
+    return start, results, best, time.perf_counter() - began
+
+
+class BulkMatchStats:
+    """Counts and timings of one run"""
+
+    def __init__(self):
+        self.resumes = 0
+        self.shards = 0
+        self.score_seconds = 0.0  # summed over workers
+        self.wall_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "resumes": self.resumes,
+            "shards": self.shards,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "resumes_per_sec": round(self.resumes / self.wall_seconds, 1) if self.wall_seconds else 0.0,
+            "score_seconds": round(self.score_seconds, 3),
+        }
+
+
+def _shared_directory(catalog: JobCatalog) -> Tuple[str, bool]:
+    """A directory workers can map the catalog from; True if it is temporary"""
+    if catalog.directory:
+        return catalog.directory, False
+    # /dev/shm keeps the files in RAM where available
+    root = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    directory = tempfile.mkdtemp(prefix="job_catalog_", dir=root)
+    catalog.save(directory)
+    return directory, True
+
+
+def iter_bulk_match(resumes: Iterable[Dict[str, Any]], catalog: JobCatalog, top_k: int = 5,
+                    job_top_k: int = 5, workers: Optional[int] = None, shard_size: int = 1000,
+                    by: str = "combined", stats: Optional[BulkMatchStats] = None,
+                    policy=None) -> Iterator[Tuple[str, Any, Any]]:
+    """Match every resume against every job under a scoring policy (see get_policy).
+
+    Yields ``("resume", resume_id, matches)`` in shard completion order
+    as shards finish, then ``("job", job_id, candidates)`` for every job
+    once all shards are merged. At most two shards per worker are in
+    flight. workers=0 scores in the calling process.
+    """
+    stats = stats or BulkMatchStats()
+    policy = get_policy(policy)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    began = time.perf_counter()
+    resume_ids: List[Any] = []
+    best = None
+
+    def shards():
+        for shard in chunked(resumes, shard_size):
+            start = len(resume_ids)
+            for number, resume in enumerate(shard, start):
+                resume_ids.append(resume.get("id", f"resume_{number + 1}"))
+            yield start, [{"skills": resume.get("skills", []),
+                           "experience_years": resume.get("experience_years", 0),
+                           "education": resume.get("education", "unknown"),
+                           "has_management": resume.get("has_management", False)}
+                          for resume in shard]
+
+    def collect(result):
+        nonlocal best
+        start, results, keys, seconds = result
+        stats.shards += 1
+        stats.resumes += len(results)
+        stats.score_seconds += seconds
+        if keys is not None:
+            best = _merge_job_top(best, keys, job_top_k)
+        return [("resume", resume_ids[start + i], matches) for i, matches in enumerate(results)]
+
+    if workers == 0:
+        _init_worker(None, catalog, policy)
+        for start, shard in shards():
+            yield from collect(_match_shard(start, shard, top_k, job_top_k, by))
+    else:
+        directory, temporary = _shared_directory(catalog)
+        try:
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(directory, None, policy)) as pool:
+                pending = set()
+                for start, shard in shards():
+                    pending.add(pool.submit(_match_shard, start, shard, top_k, job_top_k, by))
+                    if len(pending) >= 2 * workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield from collect(future.result())
+                for future in as_completed(pending):
+                    yield from collect(future.result())
+        finally:
+            if temporary:
+                shutil.rmtree(directory, ignore_errors=True)
+
+    if best is not None:
+        # Best first; equal keys cannot occur, the resume number breaks ties
+        ordered = -np.sort(-best, axis=0)
+        for job in range(ordered.shape[1]):
+            candidates = [{"resume_id": resume_ids[_INDEX_MASK - int(key & _INDEX_MASK)],
+                           "match_percentage": round((int(key) >> 32) / _SCORE_SCALE * 100, 1)}
+                          for key in ordered[:, job]]
+            yield "job", catalog.ids[job], candidates
+    stats.wall_seconds = time.perf_counter() - began
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Match every resume against every job")
+    parser.add_argument("resumes", help="Parsed resumes (JSONL/CSV, e.g. from bulk_ingest)")
+    parser.add_argument("--catalog", required=True,
+                        help="Saved JobCatalog directory or parsed jobs (JSONL/CSV)")
+    parser.add_argument("--output", required=True, help="Per-resume matches (.csv/.jsonl/.parquet)")
+    parser.add_argument("--job-output", help="Per-job candidate lists (JSONL)")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--job-top-k", type=int, default=5)
+    parser.add_argument("--by", choices=["combined", "skill"], default="combined")
+    parser.add_argument("--policy", help="Scoring policy name from scoring_policies.json")
+    parser.add_argument("--workers", type=int, default=None, help="0 scores in-process")
+    parser.add_argument("--shard-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    from match_export import MatchExporter
+
+    if os.path.isdir(args.catalog):
+        catalog = JobCatalog.load(args.catalog)
+    else:
+        catalog = JobCatalog.from_jobs(read_records(args.catalog))
+    stats = BulkMatchStats()
+    job_top_k = args.job_top_k if args.job_output else 0
+    job_out = open(args.job_output, "w", encoding="utf-8") if args.job_output else None
+    try:
+        with MatchExporter(args.output) as exporter:
+            for kind, key, value in iter_bulk_match(read_records(args.resumes), catalog, args.top_k,
+                                                    job_top_k, args.workers, args.shard_size,
+                                                    args.by, stats, args.policy):
+                if kind == "resume":
+                    exporter.write(key, value)
+                else:
+                    job_out.write(json.dumps({"job_id": key, "candidates": value}) + "\n")
+    finally:
+        if job_out is not None:
+            job_out.close()
+    print(f"✅ Matched {stats.resumes} resumes against {len(catalog)} jobs", file=sys.stderr)
+    print(json.dumps(stats.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Resume text extraction from PDF, DOCX and plain text documents
+"""
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+# Enough text for skill and experience extraction; reading stops here
+DEFAULT_MAX_CHARS = 20000
+
+Source = Union[str, bytes]
+
+
+def _open(source: Source):
+    return io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+
+
+def iter_pdf_pages(source: Source) -> Iterator[str]:
+    """Yield the text of each PDF page, releasing every page once read"""
+    try:
+        import pdfplumber
+    except ImportError:
+        pdfplumber = None
+
+    with _open(source) as f:
+        if pdfplumber is not None:
+            with pdfplumber.open(f) as pdf:
+                for page in pdf.pages:
+                    yield page.extract_text() or ""
+                    # Drop the parsed layout objects before the next page
+                    page.flush_cache()
+        else:
+            from PyPDF2 import PdfReader
+            for page in PdfReader(f).pages:
+                yield page.extract_text() or ""
+
+
+def iter_docx_paragraphs(source: Source) -> Iterator[str]:
+    """Yield paragraph and table-cell text from a DOCX file"""
+    from docx import Document
+
+    with _open(source) as f:
+        document = Document(f)
+        for paragraph in document.paragraphs:
+            yield paragraph.text
+        for table in document.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    yield cell.text
+
+
+def iter_plain_text(source: Source, block_size: int = 65536) -> Iterator[str]:
+    with _open(source) as f:
+        reader = io.TextIOWrapper(f, encoding="utf-8", errors="replace")
+        while True:
+            block = reader.read(block_size)
+            if not block:
+                return
+            yield block
+
+
+def iter_document(source: Source, filename: Optional[str] = None) -> Iterator[str]:
+    """Yield text pieces lazily, choosing the reader from the file extension"""
+    name = (filename or (source if isinstance(source, str) else "")).lower()
+    if name.endswith(".pdf"):
+        return iter_pdf_pages(source)
+    if name.endswith(".docx"):
+        return iter_docx_paragraphs(source)
+    return iter_plain_text(source)
+
+
+def iter_text(source: Source, filename: Optional[str] = None) -> Iterator[str]:
+    """Stream a whole document as pieces that concatenate to its text.
+
+    Pages and paragraphs are separated by newlines as in extract_text;
+    meant for TextProcessor.analyze_stream on documents of any size.
+    """
+    name = (filename or (source if isinstance(source, str) else "")).lower()
+    pieces = iter_document(source, filename)
+    try:
+        if not name.endswith((".pdf", ".docx")):
+            # Plain text blocks are consecutive slices of one text
+            yield from pieces
+            return
+        for number, piece in enumerate(pieces):
+            if number:
+                yield "\n"
+            yield piece
+    finally:
+        pieces.close()
+
+
+def extract_text(source: Source, filename: Optional[str] = None,
+                 max_chars: Optional[int] = DEFAULT_MAX_CHARS) -> str:
+    """Read a document until max_chars of text have been collected.
+
+    The result is raw text, meant to be passed to TextProcessor.clean_text.
+    """
+    pieces, total = [], 0
+    pieces_iter = iter_document(source, filename)
+    try:
+        for piece in pieces_iter:
+            pieces.append(piece)
+            total += len(piece) + 1
+            if max_chars is not None and total >= max_chars:
+                break
+    finally:
+        # Closes the underlying file when we stop early
+        pieces_iter.close()
+    text = "\n".join(pieces)
+    return text if max_chars is None else text[:max_chars]
+
+
+def _extract_in_child(conn, source, filename, max_chars):
+    try:
+        conn.send(("ok", extract_text(source, filename, max_chars)))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+class DocumentExtractor:
+    """Runs extractions in child processes with a per-document timeout.
+
+    Each document gets its own short-lived process, so a pathological
+    PDF can be killed without disturbing other uploads; a semaphore caps
+    how many run at once. Children come from a fork server (or are
+    spawned), never forked from the caller: a fork of the multithreaded
+    app server could inherit locks other threads hold and deadlock.
+    """
+
+    def __init__(self, max_workers: int = 2, timeout: float = 20.0,
+                 max_chars: Optional[int] = DEFAULT_MAX_CHARS):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_chars = max_chars
+        self._slots = threading.BoundedSemaphore(max_workers)
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._context = multiprocessing.get_context(method)
+
+    def extract(self, source: Source, filename: Optional[str] = None) -> str:
+        """Extract one document; raises TimeoutError or ValueError on failure.
+
+        ``source`` is a path or the document's bytes; file-like objects
+        (e.g. a Streamlit UploadedFile) are read into bytes first, since
+        the child process gets a pickled copy.
+        """
+        if hasattr(source, "getvalue"):
+            source = source.getvalue()
+        elif hasattr(source, "read"):
+            source = source.read()
+        if isinstance(source, (bytearray, memoryview)):
+            source = bytes(source)
+        with self._slots:
+            receiver, sender = self._context.Pipe(duplex=False)
+            process = self._context.Process(
+                target=_extract_in_child, args=(sender, source, filename, self.max_chars),
+                daemon=True)
+            process.start()
+            sender.close()
+            try:
+                if not receiver.poll(self.timeout):
+                    raise TimeoutError(
+                        f"Extracting {filename or 'document'} took longer than {self.timeout}s")
+                status, payload = receiver.recv()
+            except EOFError:
+                status, payload = "error", "extraction process exited unexpectedly"
+            finally:
+                receiver.close()
+                if process.is_alive():
+                    process.kill()
+                process.join()
+        if status != "ok":
+            raise ValueError(f"Could not read {filename or 'document'}: {payload}")
+        return payload
+
+    def extract_many(self, documents: Sequence[Tuple[Source, Optional[str]]]
+                     ) -> List[Union[str, Exception]]:
+        """Extract several documents concurrently; failures are returned, not raised"""
+        def run(document):
+            try:
+                return self.extract(*document)
+            except (TimeoutError, ValueError) as e:
+                return e
+
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            return list(pool.map(run, documents))
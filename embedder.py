@@ -1,32 +1,42 @@
 
 """
 Simple ML Pipeline for Testing
+
+Fit the TF-IDF model on a job corpus once and save it for --model-path:
+
+    python embedder.py fit jobs.jsonl model.pkl --components 128
 """
+import argparse
+import os
+import pickle
+import time
+
 import numpy as np
 
+from instrumentation import count, timed
+from job_store import JobStore
+from match_engine import BatchMatchEngine
+from match_results import match_results
+from scoring_policy import get_policy
+from skill_taxonomy import get_skill_matcher
+
 class TextProcessor:
     def __init__(self):
-        pass
+        # Shared skill taxonomy, loaded once per process
+        self.skill_matcher = get_skill_matcher()
     
     def clean_text(self, text):
         return text.lower() if text else ""
     
+    @timed("extract_skills")
     def extract_skills(self, text):
-        skills = []
-        text_lower = text.lower()
-        
-        skill_list = ["python", "tensorflow", "pytorch", "aws", "docker", 
-                     "machine learning", "sql", "react", "javascript"]
-        
-        for skill in skill_list:
-            if skill in text_lower:
-                skills.append(skill)
-        
-        return skills
+        return self.skill_matcher.find(self.clean_text(text))
     
+    @timed("extract_experience")
     def extract_experience(self, text):
         import re
         years = 0
+        count("regex_evaluations")
         match = re.search(r'(\d+)\s*(?:years?|yrs?)', text.lower())
         if match:
             try:
@@ -37,18 +47,410 @@ class TextProcessor:
         return {"years": years, "has_management": False, "education": "unknown"}
 
 class SimilarityMatcher:
-    def __init__(self, model_name="TF-IDF"):
+    """TF-IDF encoder fit once on the job corpus and reused from disk.
+    
+    With n_components set, a truncated SVD (LSA) is fit on top of TF-IDF
+    and get_dense_embeddings returns compact float32 vectors, which is
+    what the job indexes below search over.
+    """
+    
+    def __init__(self, model_name="TF-IDF", model_path=None, n_components=None):
         self.model_name = model_name
+        self.model_path = model_path
+        self.n_components = n_components
+        self.vectorizer = None
+        self.svd = None
+        # Per-term document counts and size of the fit corpus, which seed
+        # DocumentFrequencies
+        self.document_counts = None
+        self.n_documents = 0
+        if model_path and os.path.exists(model_path):
+            self.load(model_path)
+    
+    @property
+    def is_fitted(self):
+        return self.vectorizer is not None
+    
+    def fit(self, texts):
+        """Learn the vocabulary and IDF weights; returns the corpus matrix"""
+        # scikit-learn is only imported once a model is actually fitted
+        from sklearn.decomposition import TruncatedSVD
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
+        self.vectorizer = TfidfVectorizer(
+            stop_words="english", sublinear_tf=True, dtype=np.float32
+        )
+        matrix = self.vectorizer.fit_transform(texts)
+        # Only needed for introspection and can be large, so don't persist it
+        self.vectorizer.stop_words_ = None
+        self.document_counts = np.bincount(matrix.indices, minlength=matrix.shape[1]).astype(np.int64)
+        self.n_documents = matrix.shape[0]
+        self.svd = None
+        if self.n_components:
+            n_components = min(self.n_components, matrix.shape[1] - 1)
+            self.svd = TruncatedSVD(n_components=n_components, random_state=0).fit(matrix)
+        if self.model_path:
+            self.save(self.model_path)
+        return matrix
+    
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump({"vectorizer": self.vectorizer, "svd": self.svd,
+                         "document_counts": self.document_counts,
+                         "n_documents": self.n_documents}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def load(self, path):
+        with open(path, "rb") as f:
+            model = pickle.load(f)
+        self.vectorizer = model["vectorizer"]
+        self.svd = model["svd"]
+        # Models saved before document counts were kept have none
+        self.document_counts = model.get("document_counts")
+        self.n_documents = model.get("n_documents", 0)
+        if self.svd is not None:
+            self.n_components = self.svd.n_components
     
     def get_embeddings(self, texts):
-        return np.random.rand(len(texts), 10)
+        """Sparse L2-normalized TF-IDF rows, one per text"""
+        if not self.is_fitted:
+            raise RuntimeError("SimilarityMatcher is not fitted; call fit() on the job corpus first")
+        return self.vectorizer.transform(texts)
+    
+    def get_dense_embeddings(self, texts):
+        """L2-normalized float32 LSA vectors, one row per text"""
+        if self.svd is None:
+            raise RuntimeError("Dense embeddings need a model fitted with n_components")
+        vectors = self.svd.transform(self.get_embeddings(texts)).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+    
+    @staticmethod
+    def cosine_similarity(queries, documents):
+        """Cosine similarity of every query row to every document row.
+        
+        Rows are already L2-normalized, so this is one (sparse) product.
+        """
+        import scipy.sparse as sp
+        if sp.issparse(queries):
+            return np.asarray((queries @ documents.T).todense())
+        return np.atleast_2d(queries) @ np.asarray(documents).T
+    
+    def document_frequencies(self, documents=None):
+        """DocumentFrequencies seeded with the fit corpus and ``(doc_id, text)`` documents.
+        
+        Pass the texts of jobs already in the catalog as ``documents`` so
+        later upserts and deletes of those jobs replace their counts.
+        """
+        if not self.is_fitted:
+            raise RuntimeError("SimilarityMatcher is not fitted; call fit() on the job corpus first")
+        return DocumentFrequencies(self.vectorizer, documents, self.document_counts, self.n_documents)
+    
+    def update_idf(self, frequencies):
+        """Swap in IDF weights from incrementally maintained DocumentFrequencies"""
+        if frequencies.n_documents == 0:
+            raise ValueError("DocumentFrequencies counts no documents; seed it with the fit "
+                             "corpus or the catalog texts first")
+        self.vectorizer.idf_ = frequencies.idf()
+
+
+class DocumentFrequencies:
+    """Per-term document counts over the fitted vocabulary, kept up to date
+    as documents are added and removed, so IDF weights track a changing job
+    catalog without refitting the vectorizer. Terms outside the vocabulary
+    are ignored until the next fit.
+    
+    Counts must cover the whole catalog, not just documents written since
+    the store was opened: seed them with ``documents`` (``(doc_id, text)``
+    pairs, e.g. the catalog's job descriptions) and/or with ``base_counts``
+    of ``base_documents`` anonymous documents, such as the fit corpus that
+    SimilarityMatcher.document_frequencies() passes in. Base counts are a
+    fixed background; only documents with ids can be replaced or removed.
+    """
+    
+    def __init__(self, vectorizer, documents=None, base_counts=None, base_documents=0):
+        self._analyzer = vectorizer.build_analyzer()
+        self._vocabulary = vectorizer.vocabulary_
+        self.counts = np.zeros(len(self._vocabulary), dtype=np.int64)
+        self.base_documents = 0
+        if base_counts is not None:
+            self.counts += np.asarray(base_counts, dtype=np.int64)
+            self.base_documents = int(base_documents)
+        self._terms = {}
+        for doc_id, text in documents or ():
+            self.add(doc_id, text)
+    
+    def __len__(self):
+        return len(self._terms)
+    
+    @property
+    def n_documents(self):
+        """Documents the counts cover, seeded ones included"""
+        return self.base_documents + len(self._terms)
+    
+    def add(self, doc_id, text):
+        """Count a document; an existing doc_id is replaced"""
+        self.remove(doc_id)
+        terms = np.unique(np.array(
+            [self._vocabulary[token] for token in self._analyzer(text) if token in self._vocabulary],
+            dtype=np.int32))
+        self.counts[terms] += 1
+        self._terms[doc_id] = terms
+    
+    def remove(self, doc_id):
+        terms = self._terms.pop(doc_id, None)
+        if terms is not None:
+            self.counts[terms] -= 1
+    
+    def idf(self):
+        """Smoothed IDF, the same formula TfidfVectorizer uses when fitting"""
+        n_docs = self.n_documents
+        return (np.log((1 + n_docs) / (1 + self.counts)) + 1).astype(np.float32)
+
+
+class _VectorStore:
+    """Growable float32 matrix of vectors keyed by id, with tombstoned deletes"""
+    
+    def __init__(self, dim):
+        self.dim = dim
+        self._vectors = np.zeros((16, dim), dtype=np.float32)
+        self._alive = np.zeros(16, dtype=bool)
+        self._ids = []
+        self._rows = {}
+    
+    def __len__(self):
+        return len(self._rows)
+    
+    def __contains__(self, job_id):
+        return job_id in self._rows
+    
+    def ids(self):
+        return list(self._rows)
+    
+    def add(self, ids, vectors):
+        """Insert vectors; an existing id is replaced"""
+        ids = list(ids)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        self.remove([job_id for job_id in ids if job_id in self._rows])
+        
+        start, end = len(self._ids), len(self._ids) + len(ids)
+        if end > len(self._vectors):
+            capacity = max(end, 2 * len(self._vectors))
+            self._vectors = np.resize(self._vectors, (capacity, self.dim))
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+        self._vectors[start:end] = vectors
+        self._alive[start:end] = True
+        for row, job_id in enumerate(ids, start):
+            self._rows[job_id] = row
+        self._ids.extend(ids)
+        return vectors
+    
+    def remove(self, ids):
+        rows = [self._rows.pop(job_id) for job_id in ids if job_id in self._rows]
+        self._alive[rows] = False
+        # Reclaim space once most rows are tombstones
+        if len(self._ids) > 64 and len(self._rows) < len(self._ids) // 2:
+            self._compact()
+    
+    def _compact(self):
+        keep = np.flatnonzero(self._alive[:len(self._ids)])
+        self._vectors = self._vectors[keep].copy()
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._ids = [self._ids[row] for row in keep]
+        self._rows = {job_id: row for row, job_id in enumerate(self._ids)}
+    
+    def _top(self, rows, scores, k):
+        if len(scores) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(self._ids[rows[i]], float(scores[i])) for i in best]
+
+
+class ExactIndex(_VectorStore):
+    """Brute-force inner-product search over every stored vector"""
+    
+    def search(self, query, k=10):
+        """Best k ``(id, score)`` pairs, highest score first"""
+        size = len(self._ids)
+        scores = self._vectors[:size] @ np.asarray(query, dtype=np.float32).ravel()
+        rows = np.flatnonzero(self._alive[:size])
+        return self._top(rows, scores[rows], k)
+
+
+class LSHIndex(_VectorStore):
+    """Random-hyperplane LSH for cosine similarity.
+    
+    Each of n_tables hashes a vector to the sign pattern of n_bits random
+    projections. A query probes its own bucket in every table, plus the
+    buckets one bit away when multiprobe is on, and only those candidates
+    are scored exactly.
+    """
+    
+    def __init__(self, dim, n_tables=8, n_bits=12, multiprobe=True, seed=0):
+        super().__init__(dim)
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.multiprobe = multiprobe
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((dim, n_tables * n_bits)).astype(np.float32)
+        self._bit_values = 1 << np.arange(n_bits, dtype=np.int64)
+        self._buckets = [{} for _ in range(n_tables)]
+        self._keys = {}
+    
+    def _hash(self, vectors):
+        bits = (np.atleast_2d(vectors) @ self._planes) > 0
+        return bits.reshape(-1, self.n_tables, self.n_bits) @ self._bit_values
+    
+    def add(self, ids, vectors):
+        ids = list(ids)
+        vectors = super().add(ids, vectors)
+        for job_id, keys in zip(ids, self._hash(vectors).tolist()):
+            self._keys[job_id] = keys
+            for bucket, key in zip(self._buckets, keys):
+                bucket.setdefault(key, set()).add(job_id)
+    
+    def remove(self, ids):
+        ids = [job_id for job_id in ids if job_id in self._keys]
+        for job_id in ids:
+            for bucket, key in zip(self._buckets, self._keys.pop(job_id)):
+                members = bucket[key]
+                members.discard(job_id)
+                if not members:
+                    del bucket[key]
+        super().remove(ids)
+    
+    def candidates(self, query):
+        """Ids sharing a (probed) bucket with the query"""
+        found = set()
+        flips = [0] + ([1 << bit for bit in range(self.n_bits)] if self.multiprobe else [])
+        for bucket, key in zip(self._buckets, self._hash(query)[0].tolist()):
+            for flip in flips:
+                found.update(bucket.get(key ^ flip, ()))
+        return found
+    
+    def search(self, query, k=10):
+        """Approximate best k ``(id, score)`` pairs, highest score first"""
+        found = self.candidates(query)
+        if not found:
+            return []
+        rows = np.fromiter((self._rows[job_id] for job_id in found), dtype=np.intp, count=len(found))
+        scores = self._vectors[rows] @ np.asarray(query, dtype=np.float32).ravel()
+        return self._top(rows, scores, k)
+
+
+JOB_INDEX_BACKENDS = {"exact": ExactIndex, "lsh": LSHIndex}
+
+
+def create_job_index(dim, backend="exact", **params):
+    """Build an empty job index; backend is "exact" or "lsh" """
+    return JOB_INDEX_BACKENDS[backend](dim, **params)
+
+
+def index_recall_report(vectors, queries, k=10, configs=None):
+    """Recall@k and per-query latency of approximate indexes vs exact search.
+    
+    configs is a list of LSHIndex keyword dicts. Returns one row per index
+    and prints a small table.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    configs = configs or [
+        {"n_tables": 4, "n_bits": 14},
+        {"n_tables": 8, "n_bits": 12},
+        {"n_tables": 16, "n_bits": 10},
+    ]
+    
+    def run(index):
+        index.add(range(len(vectors)), vectors)
+        latencies, results = [], []
+        for query in queries:
+            start = time.perf_counter()
+            results.append({job_id for job_id, _ in index.search(query, k)})
+            latencies.append((time.perf_counter() - start) * 1000)
+        return results, np.array(latencies)
+    
+    truth, latencies = run(ExactIndex(vectors.shape[1]))
+    report = [{"backend": "exact", "params": {}, "recall": 1.0,
+               "p50_ms": float(np.percentile(latencies, 50)),
+               "p99_ms": float(np.percentile(latencies, 99))}]
+    for params in configs:
+        found, latencies = run(LSHIndex(vectors.shape[1], **params))
+        recall = np.mean([len(f & t) / max(len(t), 1) for f, t in zip(found, truth)])
+        report.append({"backend": "lsh", "params": params, "recall": float(recall),
+                       "p50_ms": float(np.percentile(latencies, 50)),
+                       "p99_ms": float(np.percentile(latencies, 99))})
+    
+    for row in report:
+        print(f"{row['backend']:>5} {str(row['params']):<32} recall@{k}={row['recall']:.3f} "
+              f"p50={row['p50_ms']:.2f}ms p99={row['p99_ms']:.2f}ms")
+    return report
+
 
 class ResumeEmbedder:
-    def __init__(self, model_name="TF-IDF"):
+    """Processes resumes and jobs and ranks matches.
+    
+    Matches are scored with a ScoringPolicy: an instance, a config dict or
+    a name from scoring_policies.json (None is the shared default policy).
+    """
+    
+    def __init__(self, model_name="TF-IDF", model_path=None, n_components=None, policy=None):
         self.processor = TextProcessor()
-        self.matcher = SimilarityMatcher(model_name)
+        self.matcher = SimilarityMatcher(model_name, model_path, n_components)
+        self.policy = get_policy(policy)
         print(f"ResumeEmbedder initialized with {model_name}")
     
+    def fit_jobs(self, texts):
+        """Fit (and persist, if model_path is set) the TF-IDF model on job texts"""
+        return self.matcher.fit(texts)
+    
+    @timed("embed")
+    def _embed(self, text):
+        # A dense LSA vector when the model has one, otherwise a sparse
+        # 1 x vocabulary row; None until a model is fitted or loaded
+        if not self.matcher.is_fitted:
+            return None
+        if self.matcher.svd is not None:
+            return self.matcher.get_dense_embeddings([text])[0]
+        return self.matcher.get_embeddings([text])
+    
+    def semantic_scores(self, resume_data, jobs_data):
+        """Cosine similarity of the resume to each job.
+        
+        jobs_data is either a list of processed jobs or a sparse matrix of
+        their embeddings (e.g. the one returned by fit_jobs).
+        """
+        if resume_data["embedding"] is None:
+            raise RuntimeError("Resume has no embedding; fit or load a TF-IDF model first")
+        if isinstance(jobs_data, list):
+            embeddings = [job["embedding"] for job in jobs_data]
+            import scipy.sparse as sp
+            if sp.issparse(resume_data["embedding"]):
+                jobs_data = sp.vstack(embeddings, format="csr")
+            else:
+                jobs_data = np.stack(embeddings)
+        return self.matcher.cosine_similarity(resume_data["embedding"], jobs_data)[0]
+    
+    def build_job_index(self, jobs_data, backend="lsh", **params):
+        """Index the dense job embeddings; ids are positions in jobs_data"""
+        if self.matcher.svd is None:
+            raise RuntimeError("Job indexes need dense embeddings; fit with n_components")
+        index = create_job_index(self.matcher.svd.n_components, backend, **params)
+        index.add(range(len(jobs_data)), np.stack([job["embedding"] for job in jobs_data]))
+        return index
+    
+    def search_jobs(self, resume_data, jobs_data, index, top_k=5, n_candidates=200):
+        """Retrieve candidates from index, then re-rank them like find_best_matches"""
+        hits = index.search(resume_data["embedding"], n_candidates)
+        candidates = [jobs_data[job_id] for job_id, _ in sorted(hits)]
+        if not candidates:
+            return []
+        engine = BatchMatchEngine(candidates)
+        ranked = engine.rank(resume_data, top_k, policy=self.policy)
+        return match_results(engine.jobs, ranked, resume_data["skills"], self.policy)
+    
+    @timed("process_resume")
     def process_resume(self, text, resume_id=None, metadata=None):
         skills = self.processor.extract_skills(text)
         experience = self.processor.extract_experience(text)
@@ -57,10 +459,13 @@ class ResumeEmbedder:
             "id": resume_id or "resume_1",
             "skills": skills,
             "experience_years": experience["years"],
-            "embedding": [0.1] * 10,
+            "has_management": experience["has_management"],
+            "education": experience["education"],
+            "embedding": self._embed(text),
             "metadata": metadata or {}
         }
     
+    @timed("process_job")
     def process_job_description(self, text, job_id=None, metadata=None):
         required_skills = self.processor.extract_skills(text)
         experience_needed = self.processor.extract_experience(text)
@@ -69,34 +474,87 @@ class ResumeEmbedder:
             "id": job_id or "job_1",
             "required_skills": required_skills,
             "experience_needed": experience_needed["years"],
-            "embedding": [0.2] * 10,
+            "requires_management": experience_needed["has_management"],
+            "education_required": experience_needed["education"],
+            "embedding": self._embed(text),
             "metadata": metadata or {}
         }
     
-    def find_best_matches(self, resume_data, jobs_data, top_k=5):
-        results = []
+    @timed("match")
+    def find_best_matches(self, resume_data, jobs_data, top_k=5, policy=None):
+        if not jobs_data:
+            return []
+        
+        # Scored for all jobs at once under the policy
+        policy = get_policy(policy) if policy is not None else self.policy
+        engine = self._engine_for(jobs_data)
+        ranked = engine.rank(resume_data, top_k, policy=policy)
+        return match_results(engine.jobs, ranked, resume_data["skills"], policy)
+    
+    @timed("match_many")
+    def find_best_matches_many(self, resumes, jobs_data, top_k=5, policy=None):
+        """find_best_matches for several resumes, scored as one matrix"""
+        if not jobs_data:
+            return [[] for _ in resumes]
+        
+        policy = get_policy(policy) if policy is not None else self.policy
+        engine = self._engine_for(jobs_data)
+        ranked = engine.rank_many(resumes, top_k, policy=policy)
+        return [match_results(engine.jobs, rows, resume_data["skills"], policy)
+                for resume_data, rows in zip(resumes, ranked)]
+    
+    def compare_policies(self, resume_data, jobs_data, policies, top_k=5):
+        """Top matches under each policy, by name, from one pass over the jobs.
         
-        for job in jobs_data:
-            # Simple matching logic
-            matched_skills = set(resume_data["skills"]) & set(job["required_skills"])
-            total_skills = len(job["required_skills"])
-            match_ratio = len(matched_skills) / max(total_skills, 1)
-            
-            score = match_ratio * 100
-            
-            results.append({
-                "job_title": job["metadata"].get("title", "Unknown"),
-                "company": job["metadata"].get("company", "Unknown"),
-                "match_percentage": round(score, 1),
-                "matched_skills": list(matched_skills),
-                "missing_skills": list(set(job["required_skills"]) - set(resume_data["skills"])),
-                "total_matched": len(matched_skills),
-                "total_required": total_skills
-            })
+        Raises ValueError if two policies share a name.
+        """
+        if not jobs_data:
+            return {}
         
-        results.sort(key=lambda x: x["match_percentage"], reverse=True)
-        return results[:top_k]
+        policies = [get_policy(policy) for policy in policies]
+        engine = self._engine_for(jobs_data)
+        ranked = engine.rank_policies(resume_data, policies, top_k)
+        return {policy.name: match_results(engine.jobs, ranked[policy.name],
+                                           resume_data["skills"], policy)
+                for policy in policies}
+    
+    def _engine_for(self, jobs_data):
+        # A JobStore keeps its own engine in step with its writes
+        if isinstance(jobs_data, JobStore):
+            return jobs_data.engine
+        # A plain list may have been edited in place since the last call,
+        # so its engine is built fresh
+        return BatchMatchEngine(jobs_data)
+    
+    # For backward compatibility
+    process_job = process_job_description
+    match_resume_to_jobs = find_best_matches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit and save the TF-IDF job model")
+    commands = parser.add_subparsers(dest="command", required=True)
+    fit = commands.add_parser("fit", help="Fit on a JSONL or CSV job corpus")
+    fit.add_argument("input", help="JSONL or CSV file of job postings")
+    fit.add_argument("output", help="Model file, for --model-path")
+    fit.add_argument("--text-field", default="description", help="Field holding the job text")
+    fit.add_argument("--components", type=int,
+                     help="Also fit an SVD of this many dimensions (needed for job indexes)")
+    args = parser.parse_args(argv)
+
+    from bulk_ingest import read_records
+    texts = [record.get(args.text_field) or "" for record in read_records(args.input)]
+    if not texts:
+        parser.error(f"No records in {args.input}")
+    start = time.perf_counter()
+    matcher = SimilarityMatcher(n_components=args.components)
+    matcher.fit(texts)
+    matcher.save(args.output)
+    dims = f", {matcher.svd.n_components} SVD dimensions" if matcher.svd is not None else ""
+    print(f"✅ Fitted on {len(texts)} jobs in {time.perf_counter() - start:.1f}s: "
+          f"{len(matcher.vectorizer.vocabulary_)} terms{dims}, saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
 
-# For backward compatibility
-process_job = process_job_description
-match_resume_to_jobs = find_best_matches
@@ -0,0 +1,147 @@
+"""
+Persistent cache for text extraction results
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+# Override with the JOB_MATCH_CACHE_DIR environment variable
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ai-job-match")
+
+# Eviction runs after this many writes rather than on every put
+_EVICT_EVERY = 256
+
+# A hit only refreshes an entry's access time once it is this many seconds
+# old, and refreshed times are written in batches of up to this many, so
+# reads don't take the write lock
+_ACCESS_RESOLUTION = 60.0
+_ACCESS_FLUSH_EVERY = 256
+
+
+class ExtractionCache:
+    """Size-bounded LRU cache in SQLite, keyed by text hash and fingerprint.
+
+    The fingerprint identifies the extractor (skill taxonomy + code
+    version), so changing either simply stops old entries from matching;
+    they age out through LRU eviction or purge_stale(). The database runs
+    in WAL mode and each process opens its own connection, so one cache
+    directory can be shared by several workers. Hits are reads only:
+    access times are kept in memory and written in one transaction with
+    the next put or eviction (or once enough have piled up), at a
+    resolution of _ACCESS_RESOLUTION seconds, which is all LRU needs.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_entries: int = 100000):
+        self.directory = directory or os.environ.get("JOB_MATCH_CACHE_DIR", DEFAULT_CACHE_DIR)
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, "extraction_cache.sqlite3")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._pid = None
+        self._writes = 0
+        self._accessed: Dict[str, float] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite connections must not cross a fork, so reconnect per process
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, "
+                "value TEXT NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @staticmethod
+    def make_key(kind: str, text: str, fingerprint: str) -> str:
+        """Content address of one extraction result"""
+        digest = hashlib.sha256()
+        for part in (fingerprint, kind, text):
+            digest.update(part.encode("utf-8", "surrogatepass"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        conn = self._connection()
+        row = conn.execute("SELECT value, accessed FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        now = time.time()
+        if now - row[1] >= _ACCESS_RESOLUTION:
+            self._accessed[key] = now
+            if len(self._accessed) >= _ACCESS_FLUSH_EVERY:
+                self.flush_access_times()
+        return json.loads(row[0])
+
+    def flush_access_times(self):
+        """Write access times recorded by get() in one transaction"""
+        if not self._accessed:
+            return
+        pending, self._accessed = self._accessed, {}
+        conn = self._connection()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany("UPDATE entries SET accessed = MAX(accessed, ?) WHERE key = ?",
+                             [(accessed, key) for key, accessed in pending.items()])
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def put(self, key: str, fingerprint: str, value: Any):
+        self.flush_access_times()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, fingerprint, value, accessed) VALUES (?, ?, ?, ?)",
+            (key, fingerprint, json.dumps(value), time.time()),
+        )
+        self._writes += 1
+        if self._writes % _EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self):
+        """Drop least recently used entries beyond max_entries"""
+        self.flush_access_times()
+        conn = self._connection()
+        (count,) = conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def purge_stale(self, fingerprint: str):
+        """Remove entries written by any other extractor version"""
+        self._connection().execute("DELETE FROM entries WHERE fingerprint != ?", (fingerprint,))
+
+    def clear(self):
+        self._connection().execute("DELETE FROM entries")
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self.flush_access_times()
+            self._conn.close()
+        self._conn = None
+
+    def __getstate__(self):
+        # Connections can't be pickled; workers reconnect on first use
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_pid"] = None
+        state["_accessed"] = {}
+        return state
@@ -0,0 +1,219 @@
+"""
+Stage timers, counters and opt-in profiling for the matching pipeline
+
+Instrumentation is off by default and then costs one flag check per
+stage. Turn it on process-wide with enable(), or for a single request
+with trace_request(), which also gives that request's timing breakdown:
+
+    with trace_request(profile=True) as trace:
+        matches = embedder.match_resume_to_jobs(resume, jobs)
+    trace.breakdown()      # [(stage, calls, total_ms), ...]
+    trace.profile_text()   # cProfile report of the request
+
+metrics.as_dict() and metrics.to_prometheus() export the process totals.
+"""
+import cProfile
+import io
+import pstats
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, List, Optional, Tuple
+
+# True while enabled process-wide or any trace_request is open; the only
+# thing checked on the hot path when instrumentation is off
+_active = False
+_enabled = False
+_open_traces = 0
+_traces_lock = threading.Lock()
+
+_current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("current_trace", default=None)
+
+
+class Metrics:
+    """Counters and per-stage timers (calls, total and max seconds)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+        self.timers: Dict[str, List[float]] = {}
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, seconds: float, calls: int = 1):
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                self.timers[name] = [calls, seconds, seconds]
+            else:
+                timer[0] += calls
+                timer[1] += seconds
+                timer[2] = max(timer[2], seconds)
+
+    def merge(self, snapshot: Optional[Dict[str, Any]]):
+        """Add a snapshot from as_dict(), e.g. one sent back by a worker process"""
+        if not snapshot:
+            return
+        for name, amount in snapshot.get("counters", {}).items():
+            self.incr(name, amount)
+        for name, timer in snapshot.get("stages", {}).items():
+            with self._lock:
+                current = self.timers.setdefault(name, [0, 0.0, 0.0])
+                current[0] += timer["calls"]
+                current[1] += timer["total_ms"] / 1000
+                current[2] = max(current[2], timer["max_ms"] / 1000)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.timers.clear()
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "stages": {name: {"calls": int(calls), "total_ms": round(total * 1000, 3),
+                                  "max_ms": round(peak * 1000, 3)}
+                           for name, (calls, total, peak) in self.timers.items()},
+            }
+
+    def to_prometheus(self, prefix: str = "jobmatch") -> str:
+        """Prometheus text exposition format"""
+        with self._lock:
+            lines = [f"# TYPE {prefix}_stage_seconds summary"]
+            for name, (calls, total, _) in sorted(self.timers.items()):
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {int(calls)}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f"# TYPE {prefix}_stage_seconds_max gauge")
+            for name, (_, _, peak) in sorted(self.timers.items()):
+                lines.append(f'{prefix}_stage_seconds_max{{stage="{name}"}} {peak:.6f}')
+            lines.append(f"# TYPE {prefix}_events_total counter")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide totals
+metrics = Metrics()
+
+
+def _refresh():
+    global _active
+    _active = _enabled or _open_traces > 0
+
+
+def enable(on: bool = True):
+    """Turn process-wide collection into ``metrics`` on or off"""
+    global _enabled
+    _enabled = on
+    _refresh()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _record(name: str, seconds: float):
+    if _enabled:
+        metrics.observe(name, seconds)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.metrics.observe(name, seconds)
+
+
+def count(name: str, amount: int = 1):
+    """Bump a counter, e.g. count('jobs_scored', n)"""
+    if not _active:
+        return
+    if _enabled:
+        metrics.incr(name, amount)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.metrics.incr(name, amount)
+
+
+def timed(name: str):
+    """Decorator timing every call of a function as ``name``"""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+class RequestTrace:
+    """Timings and counters of one request, optionally with a cProfile run.
+
+    Python 3.12+ allows one active profiler per process; a request asking
+    for a profile while another one is being profiled is traced without
+    it, and ``profile_skipped`` says why.
+    """
+
+    def __init__(self, profile: bool = False):
+        self.metrics = Metrics()
+        self.profiler = cProfile.Profile() if profile else None
+        self.profile_skipped: Optional[str] = None
+        self.total_seconds = 0.0
+        self._token = None
+        self._start = 0.0
+
+    def __enter__(self):
+        global _open_traces
+        # Before any global state changes: enable() can fail, and then
+        # __exit__ never runs
+        if self.profiler is not None:
+            try:
+                self.profiler.enable()
+            except ValueError as e:
+                self.profiler = None
+                self.profile_skipped = str(e)
+        with _traces_lock:
+            _open_traces += 1
+            _refresh()
+        self._token = _current_trace.set(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        global _open_traces
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.total_seconds = time.perf_counter() - self._start
+        _current_trace.reset(self._token)
+        with _traces_lock:
+            _open_traces -= 1
+            _refresh()
+        return False
+
+    def breakdown(self) -> List[Tuple[str, int, float]]:
+        """``(stage, calls, total_ms)``, slowest first"""
+        stages = self.metrics.as_dict()["stages"]
+        return sorted(((name, timer["calls"], timer["total_ms"]) for name, timer in stages.items()),
+                      key=lambda row: -row[2])
+
+    def counters(self) -> Dict[str, int]:
+        return dict(self.metrics.counters)
+
+    def profile_text(self, limit: int = 25, sort: str = "cumulative") -> str:
+        if self.profile_skipped is not None:
+            return f"Profiling skipped: {self.profile_skipped}"
+        if self.profiler is None:
+            return ""
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+def trace_request(profile: bool = False) -> RequestTrace:
+    """Collect this request's stage timings, even with instrumentation off"""
+    return RequestTrace(profile)
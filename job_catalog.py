@@ -0,0 +1,169 @@
+"""
+Columnar, memory-mappable job catalog
+"""
+import json
+import os
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+CATALOG_VERSION = 1
+
+# Education levels as stored in the uint8 education column
+EDUCATION_LEVELS = ["unknown", "bachelors", "masters", "phd"]
+
+
+class StringTable:
+    """Many strings in one UTF-8 buffer plus an offsets array"""
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "StringTable":
+        offsets, data = array("q", [0]), bytearray()
+        for string in strings:
+            data += string.encode("utf-8")
+            offsets.append(len(data))
+        return cls(np.frombuffer(offsets, dtype=np.int64).copy(),
+                   np.frombuffer(bytes(data), dtype=np.uint8).copy())
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class JobCatalog:
+    """Parsed jobs stored column by column.
+
+    Skills are interned to ids and kept CSR-style (``skill_indptr`` /
+    ``skill_indices``), numeric fields are typed arrays, embeddings are
+    one float32 matrix, and ids, titles and companies live in string
+    tables. ``catalog[i]`` rebuilds the usual parsed-job dict on demand,
+    so a catalog can be passed anywhere a list of jobs is expected.
+    """
+
+    ARRAYS = ["skill_indptr", "skill_indices", "experience_needed", "requires_management",
+              "education", "embeddings"]
+    TABLES = ["ids", "titles", "companies", "skills"]
+
+    def __init__(self, ids, titles, companies, skills, skill_indptr, skill_indices,
+                 experience_needed, requires_management, education, embeddings=None):
+        self.ids = ids
+        self.titles = titles
+        self.companies = companies
+        self.skills = skills
+        self.skill_indptr = skill_indptr
+        self.skill_indices = skill_indices
+        self.experience_needed = experience_needed
+        self.requires_management = requires_management
+        self.education = education
+        self.embeddings = embeddings
+        # Set by load(); other processes can map the same files
+        self.directory: Optional[str] = None
+
+    @classmethod
+    def from_jobs(cls, jobs_data: Iterable[Dict[str, Any]]) -> "JobCatalog":
+        """Build from parsed job dicts (process_job output); streams its input"""
+        skill_ids: Dict[str, int] = {}
+        ids, titles, companies = [], [], []
+        indptr, indices = array("q", [0]), array("i")
+        experience, management, education = array("d"), array("b"), array("B")
+        embeddings: Optional[List[np.ndarray]] = []
+
+        for number, job in enumerate(jobs_data):
+            metadata = job.get("metadata") or {}
+            ids.append(str(job.get("id", f"job_{number + 1}")))
+            titles.append(str(metadata.get("title", "Unknown")))
+            companies.append(str(metadata.get("company", "Unknown")))
+            for skill in dict.fromkeys(job.get("required_skills", [])):
+                indices.append(skill_ids.setdefault(skill, len(skill_ids)))
+            indptr.append(len(indices))
+            experience.append(job.get("experience_needed", 0))
+            management.append(bool(job.get("requires_management", False)))
+            level = job.get("education_required", "unknown")
+            education.append(EDUCATION_LEVELS.index(level) if level in EDUCATION_LEVELS else 0)
+            embedding = job.get("embedding")
+            if embeddings is not None and isinstance(embedding, (np.ndarray, list)):
+                embeddings.append(np.asarray(embedding, dtype=np.float32))
+            else:
+                embeddings = None
+
+        return cls(
+            StringTable.from_strings(ids), StringTable.from_strings(titles),
+            StringTable.from_strings(companies), StringTable.from_strings(skill_ids),
+            np.frombuffer(indptr, dtype=np.int64).copy(),
+            np.frombuffer(indices, dtype=np.int32).copy(),
+            np.frombuffer(experience, dtype=np.float64).copy(),
+            np.frombuffer(management, dtype=np.int8).astype(bool),
+            np.frombuffer(education, dtype=np.uint8).copy(),
+            np.stack(embeddings) if embeddings else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self.skill_indptr) - 1
+
+    def job_skills(self, i: int) -> List[str]:
+        start, end = self.skill_indptr[i], self.skill_indptr[i + 1]
+        return [self.skills[skill_id] for skill_id in self.skill_indices[start:end]]
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return {
+            "id": self.ids[i],
+            "required_skills": self.job_skills(i),
+            "experience_needed": float(self.experience_needed[i]),
+            "requires_management": bool(self.requires_management[i]),
+            "education_required": EDUCATION_LEVELS[self.education[i]],
+            "embedding": None if self.embeddings is None else self.embeddings[i],
+            "metadata": {"title": self.titles[i], "company": self.companies[i]},
+        }
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def save(self, directory: str):
+        """Write every column as a .npy file plus a small manifest"""
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            value = getattr(self, name)
+            if value is not None:
+                np.save(os.path.join(directory, f"{name}.npy"), value)
+        for name in self.TABLES:
+            table = getattr(self, name)
+            np.save(os.path.join(directory, f"{name}.offsets.npy"), table.offsets)
+            np.save(os.path.join(directory, f"{name}.data.npy"), table.data)
+        with open(os.path.join(directory, "catalog.json"), "w") as f:
+            json.dump({"version": CATALOG_VERSION, "jobs": len(self),
+                       "skills": len(self.skills),
+                       "embedding_dim": None if self.embeddings is None
+                       else int(self.embeddings.shape[1])}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "JobCatalog":
+        """Open a saved catalog; with mmap the OS page cache is shared by all processes"""
+        with open(os.path.join(directory, "catalog.json")) as f:
+            manifest = json.load(f)
+        if manifest["version"] != CATALOG_VERSION:
+            raise ValueError(f"Unsupported catalog version {manifest['version']}")
+        mode = "r" if mmap else None
+
+        def column(name):
+            path = os.path.join(directory, f"{name}.npy")
+            return np.load(path, mmap_mode=mode) if os.path.exists(path) else None
+
+        tables = {name: StringTable(column(f"{name}.offsets"), column(f"{name}.data"))
+                  for name in cls.TABLES}
+        catalog = cls(**tables, **{name: column(name) for name in cls.ARRAYS})
+        catalog.directory = directory if mmap else None
+        return catalog
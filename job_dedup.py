@@ -0,0 +1,243 @@
+"""
+Near-duplicate detection for job postings at ingest
+
+Reposts of a posting rarely match byte for byte: a changed date, a new
+location line or reordered bullets are enough to defeat exact hashing.
+JobDeduplicator compares postings by the Jaccard similarity of their
+word shingles (runs of ``shingle_size`` words of the cleaned text from
+TextProcessor.clean_text), estimated from MinHash signatures, and finds
+candidates through an LSH index of signature bands, so each posting is
+only compared with the few postings sharing a band with it instead of
+with every posting seen so far:
+
+    dedup = JobDeduplicator(threshold=0.8)
+    for job_id, text in postings:
+        if dedup.add(job_id, text) is None:
+            ...                       # canonical: parse and store it
+    dedup.duplicates_of("job_1")      # reposts collapsed into job_1
+
+The first posting of a group is its canonical record; later ones map to
+it. ``threshold`` is the shingle Jaccard similarity at which two postings
+count as the same.
+"""
+import re
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from instrumentation import count, timed
+from text_processor import TextProcessor
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 3
+
+# Shingles hashed per block, so a long posting needs num_perm * block words
+_BLOCK = 4096
+
+# Words of cleaned text; sentence punctuation is not part of a word
+_WORD = re.compile(r"[^\s.,]+")
+
+# Weight of spurious candidates against missed duplicates in lsh_params
+_SPURIOUS_WEIGHT = 0.1
+
+
+@lru_cache(maxsize=64)
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """``(bands, rows)`` with bands * rows <= num_perm for a similarity threshold.
+
+    Two postings become candidates when all rows of any band agree, which
+    happens with probability 1 - (1 - s**rows)**bands at similarity s. The
+    pair minimizing the missed share above the threshold plus the spurious
+    share below it is picked, with misses weighing more: a spurious
+    candidate costs one signature comparison, a miss a duplicate kept.
+    """
+    similarity = np.linspace(0.0, 1.0, 401)
+    below, above = similarity <= threshold, similarity >= threshold
+    best, best_error = (1, num_perm), np.inf
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            candidate = 1 - (1 - similarity ** rows) ** bands
+            spurious = candidate[below].mean() * threshold
+            missed = (1 - candidate[above]).mean() * (1 - threshold)
+            error = _SPURIOUS_WEIGHT * spurious + (1 - _SPURIOUS_WEIGHT) * missed
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """MinHash signatures of word shingles.
+
+    Words are hashed with crc32 (stable across processes, unlike hash()),
+    shingle hashes combine their words' hashes into 32 bits, and each of
+    ``num_perm`` multiply-shift hash functions ``(a * x + b) >> 32``
+    (wrapping 64-bit arithmetic) is applied to all shingles at once.
+    """
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM,
+                 shingle_size: int = DEFAULT_SHINGLE_SIZE, seed: int = 1):
+        if num_perm < 1 or shingle_size < 1:
+            raise ValueError("num_perm and shingle_size must be positive")
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        top = np.iinfo(np.uint64).max
+        self._a = rng.integers(1, top, num_perm, dtype=np.uint64, endpoint=True)[:, None] | np.uint64(1)
+        self._b = rng.integers(0, top, num_perm, dtype=np.uint64, endpoint=True)[:, None]
+        self._mix = rng.integers(1, 1 << 32, shingle_size, dtype=np.uint64) | np.uint64(1)
+        self._word_hashes: Dict[str, int] = {}
+
+    def shingles(self, clean_text: str) -> np.ndarray:
+        """Distinct 32-bit hashes of the text's word shingles"""
+        words = _WORD.findall(clean_text)
+        if not words:
+            return np.empty(0, dtype=np.uint64)
+        cache = self._word_hashes
+        hashes = np.fromiter((cache[word] if word in cache else
+                              cache.setdefault(word, zlib.crc32(word.encode())) for word in words),
+                             dtype=np.uint64, count=len(words))
+        if len(cache) > 1 << 20:
+            cache.clear()
+        size = min(self.shingle_size, len(words))
+        combined = np.zeros(len(words) - size + 1, dtype=np.uint64)
+        for offset in range(size):
+            combined += hashes[offset:offset + len(combined)] * self._mix[offset]
+        return np.unique(combined ^ (combined >> np.uint64(32))) & np.uint64(0xFFFFFFFF)
+
+    @timed("minhash")
+    def signature(self, clean_text: str) -> Optional[np.ndarray]:
+        """uint32 signature of num_perm minimums; None for text without words"""
+        shingles = self.shingles(clean_text)
+        if not len(shingles):
+            return None
+        signature = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        for start in range(0, len(shingles), _BLOCK):
+            block = shingles[start:start + _BLOCK][None, :]
+            np.minimum(signature, (self._a * block + self._b).min(axis=1), out=signature)
+        return (signature >> np.uint64(32)).astype(np.uint32)
+
+
+def similarity(signature: np.ndarray, other: np.ndarray) -> float:
+    """Estimated Jaccard similarity: the share of signature positions that agree"""
+    return float(np.count_nonzero(signature == other)) / len(signature)
+
+
+class JobDeduplicator:
+    """Streaming near-duplicate index of job postings, by job ID.
+
+    add() files a posting as canonical or as a duplicate of the most
+    similar canonical posting at or above the threshold; only canonical
+    postings are indexed, so every group is matched against its first
+    posting. Similarities are MinHash estimates, within a few hundredths
+    of the true Jaccard similarity at the default 128 permutations.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM,
+                 shingle_size: int = DEFAULT_SHINGLE_SIZE,
+                 processor: Optional[TextProcessor] = None, seed: int = 1):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self.processor = processor or TextProcessor()
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._canonical: Dict[str, str] = {}
+        self._duplicates: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        """Number of canonical postings"""
+        return len(self._signatures)
+
+    @property
+    def duplicate_count(self) -> int:
+        return len(self._canonical)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        rows = self.rows
+        return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        return self.hasher.signature(self.processor.clean_text(text))
+
+    def find(self, text: str) -> Optional[Tuple[str, float]]:
+        """``(canonical job ID, similarity)`` of the closest indexed posting, if near enough"""
+        signature = self.signature(text)
+        return None if signature is None else self._closest(signature)
+
+    def _closest(self, signature: np.ndarray) -> Optional[Tuple[str, float]]:
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(key, ()))
+        count("dedup_candidates", len(candidates))
+        best = None
+        for job_id in candidates:
+            score = similarity(signature, self._signatures[job_id])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (job_id, score)
+        return best
+
+    def add(self, job_id, text: str) -> Optional[str]:
+        """Index a posting; the canonical job ID if it duplicates one, else None.
+
+        Postings without any words are never duplicates and are not indexed.
+        """
+        job_id = str(job_id)
+        self.remove(job_id)
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        closest = self._closest(signature)
+        if closest is not None:
+            canonical = closest[0]
+            self._canonical[job_id] = canonical
+            self._duplicates.setdefault(canonical, []).append(job_id)
+            count("duplicates_found")
+            return canonical
+        self._signatures[job_id] = signature
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(key, []).append(job_id)
+        return None
+
+    def remove(self, job_id) -> List[str]:
+        """Forget a posting; returns the duplicates it was canonical for.
+
+        Those duplicates are forgotten too, since they have no canonical
+        record left; add them again to regroup them.
+        """
+        job_id = str(job_id)
+        canonical = self._canonical.pop(job_id, None)
+        if canonical is not None:
+            self._duplicates[canonical].remove(job_id)
+            if not self._duplicates[canonical]:
+                del self._duplicates[canonical]
+            return []
+        signature = self._signatures.pop(job_id, None)
+        if signature is None:
+            return []
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            members = bucket[key]
+            members.remove(job_id)
+            if not members:
+                del bucket[key]
+        orphans = self._duplicates.pop(job_id, [])
+        for duplicate in orphans:
+            del self._canonical[duplicate]
+        return orphans
+
+    def canonical_of(self, job_id) -> str:
+        """The canonical job ID of a posting (its own ID when it is canonical)"""
+        job_id = str(job_id)
+        return self._canonical.get(job_id, job_id)
+
+    def duplicates_of(self, job_id) -> List[str]:
+        """IDs collapsed into a canonical posting, in the order they were added"""
+        return list(self._duplicates.get(str(job_id), ()))
+
+    def groups(self) -> Dict[str, List[str]]:
+        """Canonical job ID -> duplicate IDs, for every group with duplicates"""
+        return {canonical: list(duplicates) for canonical, duplicates in self._duplicates.items()}
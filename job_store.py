@@ -0,0 +1,251 @@
+"""
+Versioned job catalog with incremental updates
+"""
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from job_catalog import JobCatalog
+from match_engine import BatchMatchEngine
+
+# compact() once the delta holds this many records and this share of the base
+COMPACT_MIN_DELTA = 1024
+COMPACT_FRACTION = 0.25
+
+
+class _SlotView:
+    """Slots of one base catalog and its delta list.
+
+    Compaction swaps in new objects rather than mutating these, so an
+    engine's view stays valid for the slots it ranked.
+    """
+
+    def __init__(self, base: JobCatalog, delta: List[Dict[str, Any]]):
+        self.base = base
+        self.delta = delta
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.delta)
+
+    def __getitem__(self, slot: int) -> Dict[str, Any]:
+        base_size = len(self.base)
+        return self.base[slot] if slot < base_size else self.delta[slot - base_size]
+
+
+class JobStore:
+    """Jobs addressed by ID on top of a columnar base catalog.
+
+    Writes go to an in-memory delta: an update tombstones the job's old
+    slot and appends the new record, a delete only tombstones. Every write
+    bumps ``version`` and is logged, so derived state is patched with just
+    the changed records: the match engine catches up on its next use, an
+    optional vector index and TF-IDF DocumentFrequencies are updated as
+    writes arrive. compact() folds the delta into a fresh JobCatalog,
+    optionally on a background thread while writes continue.
+
+    Slots are the positions matches refer to: ``store[slot]`` is a parsed
+    job, ``len(store)`` and iteration cover live jobs only. A compaction
+    renumbers slots, so resolve ranked slots through ``engine.jobs``.
+    """
+
+    def __init__(self, catalog: Optional[JobCatalog] = None,
+                 parse: Optional[Callable[..., Dict[str, Any]]] = None,
+                 vector_index=None, document_frequencies=None):
+        self.parse = parse
+        self.vector_index = vector_index
+        self.document_frequencies = document_frequencies
+        self.version = 0
+        self._lock = threading.RLock()
+        self._compaction: Optional[threading.Thread] = None
+        # One compaction at a time: each one's snapshot, log and delta are
+        # only valid until the next swap
+        self._compaction_lock = threading.Lock()
+        self._reset(catalog if catalog is not None else JobCatalog.from_jobs([]))
+
+    def _reset(self, catalog: JobCatalog, engine: Optional[BatchMatchEngine] = None):
+        self._base = catalog
+        self._delta: List[Dict[str, Any]] = []
+        self._slots = {job_id: slot for slot, job_id in enumerate(catalog.ids)}
+        self._alive = bytearray(b"\x01") * len(catalog)
+        # (version, job_id, old_slot, new_slot) since the last compaction
+        self._log: List[tuple] = []
+        self._engine = engine
+        self._engine_version = self.version
+
+    # Reading
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, job_id: str) -> bool:
+        return str(job_id) in self._slots
+
+    def __getitem__(self, slot: int) -> Dict[str, Any]:
+        base_size = len(self._base)
+        return self._base[slot] if slot < base_size else self._delta[slot - base_size]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self[slot] for slot in self.live_slots())
+
+    def live_slots(self) -> np.ndarray:
+        return np.flatnonzero(np.frombuffer(bytes(self._alive), dtype=np.uint8))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        slot = self._slots.get(str(job_id))
+        return None if slot is None else self[slot]
+
+    def ids(self) -> List[str]:
+        return list(self._slots)
+
+    @property
+    def delta_size(self) -> int:
+        """Writes not yet folded into the base catalog"""
+        return len(self._log)
+
+    def changes_since(self, version: int) -> List[tuple]:
+        """``(version, job_id, old_slot, new_slot)`` for writes after ``version``.
+
+        Only writes since the last compaction are kept.
+        """
+        with self._lock:
+            return [entry for entry in self._log if entry[0] > version]
+
+    # Writing
+
+    def upsert(self, job_id: str, job: Dict[str, Any], text: Optional[str] = None) -> int:
+        """Insert or replace a parsed job; returns the new version.
+
+        ``text`` is the job description, used for document frequencies.
+        """
+        job_id = str(job_id)
+        job = {**job, "id": job_id}
+        with self._lock:
+            old_slot = self._slots.get(job_id)
+            if old_slot is not None:
+                self._alive[old_slot] = 0
+            new_slot = len(self._base) + len(self._delta)
+            self._delta.append(job)
+            self._alive.append(1)
+            self._slots[job_id] = new_slot
+            self.version += 1
+            self._log.append((self.version, job_id, old_slot, new_slot))
+
+            if self.vector_index is not None:
+                if old_slot is not None:
+                    self.vector_index.remove([old_slot])
+                if isinstance(job.get("embedding"), np.ndarray):
+                    self.vector_index.add([new_slot], job["embedding"][None, :])
+            if self.document_frequencies is not None and text is not None:
+                self.document_frequencies.add(job_id, text)
+            return self.version
+
+    def upsert_text(self, job_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """Parse a job description with ``parse`` and upsert it"""
+        if self.parse is None:
+            raise RuntimeError("JobStore has no parse function")
+        return self.upsert(job_id, self.parse(text, job_id=str(job_id), metadata=metadata), text)
+
+    def delete(self, job_id: str) -> bool:
+        """Remove a job; False if it wasn't there"""
+        job_id = str(job_id)
+        with self._lock:
+            old_slot = self._slots.pop(job_id, None)
+            if old_slot is None:
+                return False
+            self._alive[old_slot] = 0
+            self.version += 1
+            self._log.append((self.version, job_id, old_slot, None))
+            if self.vector_index is not None:
+                self.vector_index.remove([old_slot])
+            if self.document_frequencies is not None:
+                self.document_frequencies.remove(job_id)
+            return True
+
+    def clear(self):
+        for job_id in self.ids():
+            self.delete(job_id)
+
+    # Derived state
+
+    @property
+    def engine(self) -> BatchMatchEngine:
+        """Match engine over the slots, brought up to date with the log"""
+        with self._lock:
+            if self._engine is None:
+                # The log holds every write since the base was built
+                self._engine = BatchMatchEngine(self._base)
+                self._engine_version = 0
+            engine = self._engine
+            if self._engine_version < self.version:
+                changes = [entry for entry in self._log if entry[0] > self._engine_version]
+                engine.append([self[slot] for slot in
+                               range(len(engine), len(self._base) + len(self._delta))])
+                dropped = [old for _, _, old, _ in changes if old is not None]
+                engine.drop(dropped, [self[slot] for slot in dropped])
+                self._engine_version = self.version
+            engine.jobs = _SlotView(self._base, self._delta)
+            return engine
+
+    # Compaction
+
+    def needs_compaction(self) -> bool:
+        return (len(self._log) >= COMPACT_MIN_DELTA
+                and len(self._log) >= COMPACT_FRACTION * max(1, len(self._base)))
+
+    def compact(self, background: bool = False) -> Optional[threading.Thread]:
+        """Rewrite live jobs into a new base catalog and drop the delta.
+
+        Writes arriving while a background compaction runs are replayed
+        onto the new catalog before it is swapped in. A compaction started
+        while another runs waits for it.
+        """
+        if background:
+            if self._compaction is None or not self._compaction.is_alive():
+                self._compaction = threading.Thread(target=self.compact, daemon=True)
+                self._compaction.start()
+            return self._compaction
+
+        with self._compaction_lock:
+            with self._lock:
+                snapshot = self.version
+                slots = self.live_slots()
+                base, delta = self._base, list(self._delta)
+            base_size = len(base)
+            catalog = JobCatalog.from_jobs(
+                base[slot] if slot < base_size else delta[slot - base_size] for slot in slots)
+            engine = BatchMatchEngine(catalog)
+
+            with self._lock:
+                pending = [entry for entry in self._log if entry[0] > snapshot]
+                old_base_size, old_delta = len(self._base), self._delta
+                vector_index, self.vector_index = self.vector_index, None
+                frequencies, self.document_frequencies = self.document_frequencies, None
+                version = self.version
+                self._reset(catalog, engine)
+                self._engine_version = self.version = snapshot
+                for _, job_id, _, new_slot in pending:
+                    if new_slot is None:
+                        self.delete(job_id)
+                    else:
+                        self.upsert(job_id, old_delta[new_slot - old_base_size])
+                self.version = version
+                self.vector_index, self.document_frequencies = vector_index, frequencies
+                if self.vector_index is not None:
+                    self._reindex_vectors()
+        return None
+
+    def maybe_compact(self, background: bool = False) -> Optional[threading.Thread]:
+        if self.needs_compaction():
+            return self.compact(background)
+        return None
+
+    def _reindex_vectors(self):
+        # Slots were renumbered, so re-key the vector index
+        slots = self.live_slots()
+        embeddings = [self[slot].get("embedding") for slot in slots]
+        keep = [i for i, embedding in enumerate(embeddings) if isinstance(embedding, np.ndarray)]
+        self.vector_index.remove(self.vector_index.ids())
+        if keep:
+            self.vector_index.add([int(slots[i]) for i in keep],
+                                  np.stack([embeddings[i] for i in keep]))
@@ -0,0 +1,117 @@
+"""
+Micro-batching of concurrent match requests
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Recent samples kept for the latency percentiles
+_WINDOW = 2048
+
+
+class BatchMetrics:
+    """Batch sizes, queue wait and scoring time over recent batches"""
+
+    def __init__(self):
+        self.batches = 0
+        self.items = 0
+        self.max_batch_size = 0
+        self.failures = 0
+        self._sizes = deque(maxlen=_WINDOW)
+        self._queue_wait_ms = deque(maxlen=_WINDOW)
+        self._scoring_ms = deque(maxlen=_WINDOW)
+
+    def record(self, size: int, queue_waits_ms: Sequence[float], scoring_ms: float):
+        self.batches += 1
+        self.items += size
+        self.max_batch_size = max(self.max_batch_size, size)
+        self._sizes.append(size)
+        self._queue_wait_ms.extend(queue_waits_ms)
+        self._scoring_ms.append(scoring_ms)
+
+    def as_dict(self) -> Dict[str, float]:
+        def pct(samples, q):
+            return round(float(np.percentile(samples, q)), 3) if samples else 0.0
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "failures": self.failures,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "queue_wait_p50_ms": pct(self._queue_wait_ms, 50),
+            "queue_wait_p99_ms": pct(self._queue_wait_ms, 99),
+            "scoring_p50_ms": pct(self._scoring_ms, 50),
+            "scoring_p99_ms": pct(self._scoring_ms, 99),
+        }
+
+
+class MicroBatcher:
+    """Coalesces items submitted close together into one scoring call.
+
+    A batch is flushed when max_batch_size items are waiting or max_wait
+    seconds after its first item arrived, whichever comes first, so the
+    extra latency is bounded by max_wait. score_batch takes a list of
+    items and returns one result per item; it runs on ``executor`` (a
+    process pool needs a picklable, module-level function). An item that
+    fails on its own gets an exception instance as its result, which is
+    raised to that item's submitter only; an exception raised by
+    score_batch fails the whole batch.
+    """
+
+    def __init__(self, score_batch: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 32, max_wait: float = 0.005, executor=None):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.executor = executor
+        self.metrics = BatchMetrics()
+        self._pending = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        # Keep a reference until done so the task isn't garbage collected
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        start = time.perf_counter()
+        waits = [(start - queued) * 1000 for _, _, queued in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.score_batch, [item for item, _, _ in batch])
+        except Exception as e:
+            self.metrics.failures += 1
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.metrics.record(len(batch), waits, (time.perf_counter() - start) * 1000)
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
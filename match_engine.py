@@ -0,0 +1,461 @@
+"""
+Vectorized batch scoring for resume-to-job matching
+"""
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from instrumentation import count, timed
+from job_catalog import JobCatalog
+from scoring_policy import DEFAULT_POLICY, CompiledPolicy, ScoringPolicy, bit_columns, education_rank
+
+# Weights of the default policy: 0.6 * skill match + 0.4 * experience match
+SKILL_WEIGHT = DEFAULT_POLICY.weights['skill']
+EXPERIENCE_WEIGHT = DEFAULT_POLICY.weights['experience']
+
+# Compiled policies cached per engine (ad hoc policies are compiled per call)
+_MAX_COMPILED_POLICIES = 16
+
+# rank_pruned only runs if postings cover at most 1/PRUNE_MAX_FRACTION of the jobs
+PRUNE_MAX_FRACTION = 4
+
+# Largest number of uint64 cells materialized at once by score_many
+_BLOCK_CELLS = 1 << 22
+
+
+def top_k_indices(percentages: np.ndarray, top_k: int) -> List[int]:
+    """Indices of the best ``top_k`` scores.
+
+    Ordered exactly like a stable descending Python sort on
+    ``round(percentage, 1)``, which is how results were ranked before:
+    ties keep catalog order. argpartition narrows the candidates first,
+    and Python's round() only runs once per distinct candidate value, so
+    heavily tied catalogs stay cheap.
+    """
+    n = len(percentages)
+    if top_k <= 0 or n == 0:
+        return []
+    if top_k < n:
+        kth = np.partition(percentages, n - top_k)[n - top_k]
+        # Rounding to one decimal can tie values up to 0.05 apart
+        candidates = np.flatnonzero(percentages >= kth - 0.2)
+    else:
+        candidates = np.arange(n)
+    values, inverse = np.unique(percentages[candidates], return_inverse=True)
+    rounded = np.array([round(float(value), 1) for value in values])[inverse]
+    order = np.lexsort((candidates, -rounded))
+    return candidates[order[:top_k]].tolist()
+
+
+class SkillIndex:
+    """Inverted index from skill to the positions of jobs requiring it"""
+
+    def __init__(self, jobs_data: Sequence[Dict[str, Any]] = ()):
+        self._postings: Dict[str, List[int]] = {}
+        self._arrays: Dict[str, np.ndarray] = {}
+        for position, job in enumerate(jobs_data):
+            self.add(position, job.get('required_skills', []))
+
+    @classmethod
+    def from_csr(cls, indptr: np.ndarray, indices: np.ndarray, skills: Sequence[str]) -> 'SkillIndex':
+        """Build from CSR job-to-skill-id arrays without touching job dicts"""
+        index = cls()
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        order = np.argsort(indices, kind='stable')
+        bounds = np.cumsum(np.bincount(indices, minlength=len(skills)))
+        for skill, postings in zip(skills, np.split(rows[order], bounds[:-1])):
+            if len(postings):
+                index._arrays[skill] = postings.astype(np.intp)
+        return index
+
+    def _mutable(self, skill: str) -> List[int]:
+        postings = self._postings.get(skill)
+        if postings is None:
+            postings = self._arrays[skill].tolist() if skill in self._arrays else []
+            self._postings[skill] = postings
+        return postings
+
+    def add(self, position: int, skills: Sequence[str]):
+        for skill in set(skills):
+            self._mutable(skill).append(position)
+            self._arrays.pop(skill, None)
+
+    def remove(self, position: int, skills: Sequence[str]):
+        for skill in set(skills):
+            postings = self._mutable(skill)
+            if position in postings:
+                postings.remove(position)
+                self._arrays.pop(skill, None)
+            if not postings:
+                del self._postings[skill]
+
+    def postings(self, skill: str) -> np.ndarray:
+        """Job positions requiring ``skill``, as a cached int array"""
+        array = self._arrays.get(skill)
+        if array is None:
+            array = np.asarray(self._postings.get(skill, ()), dtype=np.intp)
+            self._arrays[skill] = array
+        return array
+
+    def posting_count(self, skills: Sequence[str]) -> int:
+        """Total postings a lookup of ``skills`` would touch"""
+        return sum(len(self._arrays[skill]) if skill in self._arrays
+                   else len(self._postings.get(skill, ())) for skill in set(skills))
+
+    def overlap(self, skills: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Jobs sharing at least one skill, with the number shared"""
+        lists = [self.postings(skill) for skill in set(skills)]
+        if not lists:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(lists), return_counts=True)
+
+
+class BatchMatchEngine:
+    """Scores resumes against a list of parsed jobs in one shot.
+
+    Job skill sets are bit-packed into a ``(jobs, words)`` uint64 matrix,
+    so skill overlap is a popcount of an AND. Experience, education and
+    management requirements are kept in arrays. Scores follow a
+    ScoringPolicy (DEFAULT_POLICY unless given), compiled once per engine.
+    Rows can be appended and dropped in place (see JobStore); dropped rows
+    are never ranked.
+    """
+
+    def __init__(self, jobs_data: Sequence[Dict[str, Any]]):
+        if isinstance(jobs_data, JobCatalog):
+            self._init_from_catalog(jobs_data)
+            return
+        self.jobs = list(jobs_data)
+        self.skill_ids: Dict[str, int] = {}
+
+        rows, cols = [], []
+        for row, job in enumerate(self.jobs):
+            for skill in set(job.get('required_skills', [])):
+                rows.append(row)
+                cols.append(self.skill_ids.setdefault(skill, len(self.skill_ids)))
+        self._build_skill_bits(np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.uint64))
+        self.skill_index = SkillIndex(self.jobs)
+        self.experience_needed = np.array(
+            [job.get('experience_needed', 0) for job in self.jobs], dtype=np.float64)
+        self.education_required = np.array(
+            [education_rank(job.get('education_required')) for job in self.jobs], dtype=np.int64)
+        self.requires_management = np.array(
+            [bool(job.get('requires_management', False)) for job in self.jobs], dtype=bool)
+
+    def _init_from_catalog(self, catalog: JobCatalog):
+        """Build straight from the catalog columns, no per-job dicts"""
+        self.jobs = catalog
+        self.skill_ids = {skill: skill_id for skill_id, skill in enumerate(catalog.skills)}
+        rows = np.repeat(np.arange(len(catalog)), np.diff(catalog.skill_indptr))
+        self._build_skill_bits(rows, np.asarray(catalog.skill_indices, dtype=np.uint64))
+        self.skill_index = SkillIndex.from_csr(catalog.skill_indptr, catalog.skill_indices,
+                                               list(catalog.skills))
+        self.experience_needed = np.asarray(catalog.experience_needed, dtype=np.float64)
+        self.education_required = np.asarray(catalog.education, dtype=np.int64)
+        self.requires_management = np.asarray(catalog.requires_management, dtype=bool)
+
+    def _build_skill_bits(self, rows: np.ndarray, cols: np.ndarray):
+        n_words = max(1, (len(self.skill_ids) + 63) // 64)
+        self.skill_bits = np.zeros((len(self.jobs), n_words), dtype=np.uint64)
+        np.bitwise_or.at(self.skill_bits, (rows, (cols >> np.uint64(6)).astype(np.intp)),
+                         np.uint64(1) << (cols & np.uint64(63)))
+        self.total_required = np.bincount(rows, minlength=len(self.jobs))
+        self.alive: Optional[np.ndarray] = None
+        self._policies: Dict[int, CompiledPolicy] = {}
+
+    def __len__(self) -> int:
+        return len(self.total_required)
+
+    def _reserve(self, n_rows: int, n_words: int):
+        """Make room for n_rows rows of n_words words, growing geometrically"""
+        rows, words = self.skill_bits.shape
+        capacity = getattr(self, '_capacity', 0)
+        if n_rows > capacity or n_words > words:
+            capacity = max(n_rows, 2 * capacity)
+            self._bits_buffer = np.zeros((capacity, max(n_words, words)), dtype=np.uint64)
+            self._bits_buffer[:rows, :words] = self.skill_bits
+            self._required_buffer = np.zeros(capacity, dtype=self.total_required.dtype)
+            self._required_buffer[:rows] = self.total_required
+            self._experience_buffer = np.zeros(capacity, dtype=np.float64)
+            self._experience_buffer[:rows] = self.experience_needed
+            self._education_buffer = np.zeros(capacity, dtype=np.int64)
+            self._education_buffer[:rows] = self.education_required
+            self._management_buffer = np.zeros(capacity, dtype=bool)
+            self._management_buffer[:rows] = self.requires_management
+            self._alive_buffer = np.ones(capacity, dtype=bool)
+            if self.alive is not None:
+                self._alive_buffer[:rows] = self.alive
+            self._capacity = capacity
+        self.skill_bits = self._bits_buffer[:n_rows]
+        self.total_required = self._required_buffer[:n_rows]
+        self.experience_needed = self._experience_buffer[:n_rows]
+        self.education_required = self._education_buffer[:n_rows]
+        self.requires_management = self._management_buffer[:n_rows]
+        if self.alive is not None:
+            self.alive = self._alive_buffer[:n_rows]
+
+    def append(self, jobs_data: Sequence[Dict[str, Any]]) -> range:
+        """Add jobs as rows after the current ones; returns their positions.
+
+        The caller keeps ``self.jobs`` in step (JobStore does).
+        """
+        start = len(self)
+        rows, cols, experience, education, management = [], [], [], [], []
+        for row, job in enumerate(jobs_data, start):
+            skills = set(job.get('required_skills', []))
+            for skill in skills:
+                rows.append(row)
+                cols.append(self.skill_ids.setdefault(skill, len(self.skill_ids)))
+            self.skill_index.add(row, skills)
+            experience.append(job.get('experience_needed', 0))
+            education.append(education_rank(job.get('education_required')))
+            management.append(bool(job.get('requires_management', False)))
+        end = start + len(experience)
+        self._reserve(end, (len(self.skill_ids) + 63) // 64)
+
+        rows = np.asarray(rows, dtype=np.intp)
+        cols = np.asarray(cols, dtype=np.uint64)
+        self.skill_bits[start:end] = 0
+        np.bitwise_or.at(self.skill_bits, (rows, (cols >> np.uint64(6)).astype(np.intp)),
+                         np.uint64(1) << (cols & np.uint64(63)))
+        self.total_required[start:end] = np.bincount(rows - start, minlength=end - start)
+        self.experience_needed[start:end] = experience
+        self.education_required[start:end] = education
+        self.requires_management[start:end] = management
+        if self.alive is not None:
+            self.alive[start:end] = True
+        # Compiled policies hold per-row arrays
+        self._policies = {}
+        return range(start, end)
+
+    def drop(self, positions: Sequence[int], jobs_data: Sequence[Dict[str, Any]]):
+        """Exclude rows from ranking; jobs_data are the records they held"""
+        if self.alive is None:
+            self._reserve(len(self), self.skill_bits.shape[1])
+            self.alive = self._alive_buffer[:len(self)]
+        for position, job in zip(positions, jobs_data):
+            if self.alive[position]:
+                self.alive[position] = False
+                self.skill_index.remove(position, job.get('required_skills', []))
+
+    def encode_skills(self, skills: Sequence[str]) -> np.ndarray:
+        """Bit-pack a skill list; skills no job asks for are dropped"""
+        bits = np.zeros(self.skill_bits.shape[1], dtype=np.uint64)
+        for skill in set(skills):
+            skill_id = self.skill_ids.get(skill)
+            if skill_id is not None:
+                bits[skill_id >> 6] |= np.uint64(1) << np.uint64(skill_id & 63)
+        return bits
+
+    def skill_columns(self, skill_ids: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """0/1 matrix of whether each job (row) requires each of skill_ids"""
+        return bit_columns(self.skill_bits if rows is None else self.skill_bits[rows], skill_ids)
+
+    def compile_policy(self, policy: Optional[ScoringPolicy] = None) -> CompiledPolicy:
+        """The policy's weight arrays for these rows, built once"""
+        policy = policy or DEFAULT_POLICY
+        compiled = self._policies.get(id(policy))
+        if compiled is None or compiled.policy is not policy:
+            if len(self._policies) >= _MAX_COMPILED_POLICIES:
+                self._policies = {}
+            compiled = self._policies[id(policy)] = policy.compile(self)
+        return compiled
+
+    @staticmethod
+    def _resume_fields(resumes: Sequence[Dict[str, Any]], matrix: bool):
+        """Experience years, education rank and management flag per resume"""
+        fields = ([r.get('experience_years', 0) for r in resumes],
+                  [education_rank(r.get('education')) for r in resumes],
+                  [bool(r.get('has_management', False)) for r in resumes])
+        if not matrix:
+            return tuple(values[0] for values in fields)
+        return tuple(np.array(values, dtype=dtype).reshape(len(resumes), 1)
+                     for values, dtype in zip(fields, (np.float64, np.int64, bool)))
+
+    def _terms(self, resume_exp, resume_education, resume_management,
+               policies: Sequence[ScoringPolicy], rows: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """Non-skill components, shared by every policy scored together"""
+        def column(values):
+            return values if rows is None else values[rows]
+
+        job_exp = column(self.experience_needed)
+        resume_exp = np.asarray(resume_exp, dtype=np.float64)
+        terms = {'experience': np.where((job_exp <= 0) | (resume_exp >= job_exp),
+                                        1.0, resume_exp / np.maximum(job_exp, 1))}
+        if any(policy.weights['education'] for policy in policies):
+            job_level = column(self.education_required)
+            terms['education'] = np.where(job_level <= 0, 1.0,
+                                          np.minimum(1.0, resume_education / np.maximum(job_level, 1)))
+        if any(policy.weights['management'] for policy in policies):
+            terms['management'] = np.where(column(self.requires_management) & ~np.asarray(resume_management),
+                                           0.0, 1.0)
+        return terms
+
+    def _score(self, overlap: np.ndarray, resume_bits: np.ndarray,
+               resumes: Sequence[Dict[str, Any]], policies: Sequence[ScoringPolicy],
+               rows: Optional[np.ndarray] = None) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """(skill match, experience match, combined) per policy, in one pass"""
+        terms = self._terms(*self._resume_fields(resumes, resume_bits.ndim == 2), policies, rows)
+        results = []
+        for policy in policies:
+            compiled = self.compile_policy(policy)
+            skill_match = compiled.skill_match(self, overlap, resume_bits, rows)
+            combined = compiled.combine(skill_match, terms,
+                                        compiled.missing_required(self, resume_bits, rows))
+            results.append((skill_match, terms['experience'], combined))
+        return results
+
+    def skill_overlap(self, resume_data: Dict[str, Any]) -> np.ndarray:
+        """Number of required skills each job shares with the resume"""
+        bits = self.encode_skills(resume_data.get('skills', []))
+        return np.bitwise_count(self.skill_bits & bits).sum(axis=1)
+
+    def score(self, resume_data: Dict[str, Any], policy: Optional[ScoringPolicy] = None
+              ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Skill match, experience match and combined score for every job"""
+        return self.score_policies(resume_data, [policy or DEFAULT_POLICY])[0]
+
+    def score_policies(self, resume_data: Dict[str, Any], policies: Sequence[ScoringPolicy]
+                       ) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """score() under several policies; the overlap and shared terms are computed once"""
+        bits = self.encode_skills(resume_data.get('skills', []))
+        overlap = np.bitwise_count(self.skill_bits & bits).sum(axis=1)
+        return self._score(overlap, bits, [resume_data], policies)
+
+    def score_many(self, resumes: Sequence[Dict[str, Any]], policy: Optional[ScoringPolicy] = None
+                   ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Like score(), but returns ``(resumes, jobs)`` matrices"""
+        resume_bits = np.stack([self.encode_skills(r.get('skills', [])) for r in resumes]) \
+            if resumes else np.zeros((0, self.skill_bits.shape[1]), dtype=np.uint64)
+        overlap = np.empty((len(resumes), len(self)), dtype=np.int64)
+
+        n_words = self.skill_bits.shape[1]
+        block = max(1, _BLOCK_CELLS // max(1, len(resumes) * n_words))
+        for start in range(0, len(self), block):
+            jobs = self.skill_bits[start:start + block]
+            overlap[:, start:start + block] = np.bitwise_count(
+                resume_bits[:, None, :] & jobs[None, :, :]).sum(axis=2)
+
+        return self._score(overlap, resume_bits, resumes, [policy or DEFAULT_POLICY])[0]
+
+    @timed('rank')
+    def rank(self, resume_data: Dict[str, Any], top_k: int = 5, by: str = 'combined',
+             prune: bool = True, policy: Optional[ScoringPolicy] = None
+             ) -> List[Tuple[int, float, float, float]]:
+        """Top jobs as ``(job_index, skill_match, exp_match, combined)``.
+
+        ``by`` selects the ranking score: ``'combined'`` or ``'skill'``.
+        With ``prune`` only jobs sharing a skill with the resume are scored
+        whenever that provably gives the same result (see rank_pruned).
+        """
+        if prune:
+            ranked = self.rank_pruned(resume_data, top_k, by, policy)
+            if ranked is not None:
+                return ranked
+        skill_match, exp_match, combined = self.score(resume_data, policy)
+        count('jobs_scored', len(self))
+        return self.top(skill_match, exp_match, combined, top_k, by)
+
+    def rank_policies(self, resume_data: Dict[str, Any], policies: Sequence[ScoringPolicy],
+                      top_k: int = 5, by: str = 'combined'
+                      ) -> Dict[str, List[Tuple[int, float, float, float]]]:
+        """rank() under each policy, from one scoring pass over the catalog.
+
+        Results are keyed by policy name, so names must be unique; inline
+        configs without a "name" are all called "default".
+        """
+        names = [policy.name for policy in policies]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Policies need distinct names to be compared; repeated: {duplicates}")
+        count('jobs_scored', len(self))
+        return {policy.name: self.top(*scores, top_k, by)
+                for policy, scores in zip(policies, self.score_policies(resume_data, policies))}
+
+    def rank_pruned(self, resume_data: Dict[str, Any], top_k: int = 5, by: str = 'combined',
+                    policy: Optional[ScoringPolicy] = None
+                    ) -> Optional[List[Tuple[int, float, float, float]]]:
+        """rank() over the skill index, max-score style.
+
+        Candidates come from the inverted index with exact skill overlap.
+        Each gets an upper bound that assumes perfect non-skill components;
+        candidates are scored in descending bound order and scoring stops
+        once no remaining bound can reach the current top_k threshold.
+        A job sharing no skill scores at most the non-skill weights, so
+        the answer is exact only if the threshold beats that; otherwise
+        None is returned and the caller must score the full catalog.
+        """
+        if top_k <= 0:
+            return []
+        skills = resume_data.get('skills', [])
+        # With common skills most of the catalog is a candidate anyway, and
+        # the dense scan is cheaper than gathering postings
+        if self.skill_index.posting_count(skills) > len(self) // PRUNE_MAX_FRACTION:
+            return None
+        positions, overlap = self.skill_index.overlap(skills)
+        if len(positions) < top_k:
+            return None
+
+        policy = policy or DEFAULT_POLICY
+        compiled = self.compile_policy(policy)
+        bits = self.encode_skills(skills)
+        skill_match = compiled.skill_match(self, overlap, bits, positions)
+        missing = compiled.missing_required(self, bits, positions)
+        if by == 'combined':
+            bounds = policy.weights['skill'] * skill_match + policy.non_skill_weight * 1.0
+            outside_bound = policy.non_skill_weight * 100
+        else:
+            bounds = skill_match
+            outside_bound = 0.0
+        order = np.argsort(-bounds, kind='stable')
+
+        fields = self._resume_fields([resume_data], matrix=False)
+        block = max(4 * top_k, 1024)
+        scored = 0
+        threshold = -np.inf
+        combined = np.empty(len(positions), dtype=np.float64)
+        exp_match = np.empty(len(positions), dtype=np.float64)
+        while scored < len(order):
+            if round(float(bounds[order[scored]]) * 100, 1) < threshold:
+                break
+            chunk = order[scored:scored + block]
+            terms = self._terms(*fields, [policy], positions[chunk])
+            exp_match[chunk] = terms['experience']
+            combined[chunk] = compiled.combine(skill_match[chunk], terms,
+                                               None if missing is None else missing[chunk])
+            scored += len(chunk)
+            keys = combined if by == 'combined' else skill_match
+            if scored >= top_k:
+                done = keys[order[:scored]] * 100
+                threshold = round(float(np.partition(done, scored - top_k)[scored - top_k]), 1)
+
+        count('jobs_scored', scored)
+        if not threshold > outside_bound:
+            return None
+        count('pruned_rankings')
+
+        # Restore catalog order among the scored jobs so ties break as before
+        kept = np.sort(order[:scored])
+        keys = combined if by == 'combined' else skill_match
+        return [(int(positions[kept[i]]), float(skill_match[kept[i]]),
+                 float(exp_match[kept[i]]), float(combined[kept[i]]))
+                for i in top_k_indices(keys[kept] * 100, top_k)]
+
+    @timed('rank_many')
+    def rank_many(self, resumes: Sequence[Dict[str, Any]], top_k: int = 5, by: str = 'combined',
+                  policy: Optional[ScoringPolicy] = None) -> List[List[Tuple[int, float, float, float]]]:
+        """rank() for every resume, scored as one matrix operation"""
+        skill_match, exp_match, combined = self.score_many(resumes, policy)
+        count('jobs_scored', len(resumes) * len(self))
+        return [self.top(skill_match[i], exp_match[i], combined[i], top_k, by)
+                for i in range(len(resumes))]
+
+    def top(self, skill_match, exp_match, combined, top_k, by='combined'):
+        """Best live rows of precomputed score() arrays, ranked like rank()"""
+        key = combined if by == 'combined' else skill_match
+        if self.alive is None:
+            rows = top_k_indices(key * 100, top_k)
+        else:
+            live = np.flatnonzero(self.alive)
+            rows = live[top_k_indices(key[live] * 100, top_k)].tolist()
+        return [(i, float(skill_match[i]), float(exp_match[i]), float(combined[i])) for i in rows]
@@ -0,0 +1,278 @@
+"""
+Streaming export of match results to CSV, JSONL or Parquet
+
+    python match_export.py resumes.jsonl --catalog jobs.jsonl --output matches.csv
+    python match_export.py resumes.jsonl --catalog jobs.jsonl --output matches.parquet --resume
+
+Rows are buffered chunk_size at a time, so memory stays flat however many
+resumes are matched. After every chunk a small ``.progress`` file records
+how far the output is committed; with --resume an interrupted run picks up
+from there instead of starting over.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+COLUMNS = ["resume_id", "rank", "job_id", "job_title", "company", "match_percentage",
+           "match_level", "skill_match", "experience_match", "total_matched",
+           "total_required", "matched_skills", "missing_skills"]
+LIST_COLUMNS = {"matched_skills", "missing_skills"}
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+
+# Separator for skill lists in CSV cells
+SKILL_SEPARATOR = "; "
+
+
+def match_rows(resume_id: Optional[str], matches: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One flat row per match with its skill breakdown.
+
+    Accepts both the app's match dicts and ResumeEmbedder's.
+    """
+    rows = []
+    resume_id = None if resume_id is None else str(resume_id)
+    for rank, match in enumerate(matches, 1):
+        matched = sorted(match.get("matched_skills", []))
+        missing = sorted(match.get("missing_skills", []))
+        rows.append({
+            "resume_id": resume_id,
+            "rank": rank,
+            "job_id": None if match.get("job_id") is None else str(match["job_id"]),
+            "job_title": match.get("job_title"),
+            "company": match.get("company"),
+            "match_percentage": match.get("match_percentage"),
+            "match_level": match.get("match_level"),
+            "skill_match": match.get("skill_match"),
+            "experience_match": match.get("experience_match"),
+            "total_matched": match.get("total_matched", match.get("total_skills_matched", len(matched))),
+            "total_required": match.get("total_required",
+                                        match.get("total_skills_required", len(matched) + len(missing))),
+            "matched_skills": matched,
+            "missing_skills": missing,
+        })
+    return rows
+
+
+def _csv_row(row: Dict[str, Any]) -> List[Any]:
+    return [SKILL_SEPARATOR.join(row[column]) if column in LIST_COLUMNS else row[column]
+            for column in COLUMNS]
+
+
+def matches_to_csv(matches: Sequence[Dict[str, Any]], resume_id: Optional[str] = None) -> str:
+    """CSV text for one result list, e.g. for a download button"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(COLUMNS)
+    writer.writerows(_csv_row(row) for row in match_rows(resume_id, matches))
+    return out.getvalue()
+
+
+class MatchExporter:
+    """Writes match results in chunks, checkpointing after each one.
+
+    CSV and JSONL go to a single file. Parquet needs pyarrow and goes to a
+    directory with one part file per chunk, readable as one dataset by
+    ``pandas.read_parquet(path)``. With resume=True an unfinished export at
+    ``path`` is rolled back to its last checkpoint and continued;
+    ``groups_done`` tells the caller how many result groups to skip.
+    """
+
+    def __init__(self, path: str, format: Optional[str] = None, chunk_size: int = 10000,
+                 resume: bool = False):
+        self.path = path
+        self.format = format or os.path.splitext(path)[1].lstrip(".").lower()
+        if self.format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {self.format!r}; use one of {EXPORT_FORMATS}")
+        self.chunk_size = chunk_size
+        self.progress_path = path.rstrip(os.sep) + ".progress"
+        self.groups_done = 0
+        self.rows_done = 0
+        self.parts = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._pending_groups = 0
+        self._file = None
+
+        progress = self._read_progress() if resume else None
+        if progress and self.format != "parquet" and not os.path.exists(path):
+            progress = None
+        if self.format == "parquet":
+            import pyarrow  # noqa: F401 -- fail now rather than after the first chunk
+            os.makedirs(path, exist_ok=True)
+            self.parts = progress["parts"] if progress else 0
+            for name in os.listdir(path):
+                # Parts past the checkpoint are incomplete leftovers
+                if name.startswith("part-") and int(name[5:10]) >= self.parts:
+                    os.remove(os.path.join(path, name))
+        else:
+            self._file = open(path, "r+b" if progress else "wb")
+            if progress:
+                self._file.truncate(progress["offset"])
+                self._file.seek(progress["offset"])
+            elif self.format == "csv":
+                self._file.write(self._csv_bytes([], header=True))
+        if progress:
+            self.groups_done = progress["groups"]
+            self.rows_done = progress["rows"]
+
+    def _read_progress(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.progress_path):
+            return None
+        with open(self.progress_path) as f:
+            progress = json.load(f)
+        if progress.get("format") != self.format:
+            raise ValueError(f"{self.path} was started as {progress.get('format')}, not {self.format}")
+        return progress
+
+    def _write_progress(self):
+        state = {"format": self.format, "groups": self.groups_done, "rows": self.rows_done,
+                 "parts": self.parts, "offset": self._file.tell() if self._file else None}
+        tmp = self.progress_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.progress_path)
+
+    @staticmethod
+    def _csv_bytes(rows, header=False) -> bytes:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        if header:
+            writer.writerow(COLUMNS)
+        writer.writerows(_csv_row(row) for row in rows)
+        return out.getvalue().encode("utf-8")
+
+    def write(self, resume_id: Optional[str], matches: Sequence[Dict[str, Any]]):
+        """Add one resume's matches; a group is never split across chunks"""
+        self._buffer.extend(match_rows(resume_id, matches))
+        self._pending_groups += 1
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows and record a checkpoint"""
+        if not self._pending_groups:
+            return
+        if self.format == "csv":
+            self._file.write(self._csv_bytes(self._buffer))
+        elif self.format == "jsonl":
+            self._file.write("".join(json.dumps(row) + "\n" for row in self._buffer).encode("utf-8"))
+        else:
+            self._write_parquet_part(self._buffer)
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self.groups_done += self._pending_groups
+        self.rows_done += len(self._buffer)
+        self._buffer, self._pending_groups = [], 0
+        self._write_progress()
+
+    def _write_parquet_part(self, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ("resume_id", pa.string()), ("rank", pa.int32()), ("job_id", pa.string()),
+            ("job_title", pa.string()), ("company", pa.string()),
+            ("match_percentage", pa.float64()), ("match_level", pa.string()),
+            ("skill_match", pa.float64()), ("experience_match", pa.float64()),
+            ("total_matched", pa.int32()), ("total_required", pa.int32()),
+            ("matched_skills", pa.list_(pa.string())), ("missing_skills", pa.list_(pa.string())),
+        ])
+        table = pa.Table.from_pydict({column: [row[column] for row in rows] for column in COLUMNS},
+                                     schema=schema)
+        name = os.path.join(self.path, f"part-{self.parts:05d}.parquet")
+        pq.write_table(table, name + ".tmp")
+        os.replace(name + ".tmp", name)
+        self.parts += 1
+
+    def close(self):
+        """Flush the last chunk; a finished export has no progress file"""
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if os.path.exists(self.progress_path):
+            os.remove(self.progress_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._file is not None:
+            # Leave the last checkpoint in place so the run can be resumed
+            self._file.close()
+            self._file = None
+
+
+def export_matches(groups: Iterable[Tuple[Optional[str], Sequence[Dict[str, Any]]]], path: str,
+                   format: Optional[str] = None, chunk_size: int = 10000,
+                   resume: bool = False) -> Dict[str, int]:
+    """Stream ``(resume_id, matches)`` groups to path.
+
+    When resuming, the first groups_done groups are skipped, so ``groups``
+    must yield the same sequence as in the interrupted run.
+    """
+    with MatchExporter(path, format, chunk_size, resume) as exporter:
+        skipped = exporter.groups_done
+        for resume_id, matches in islice(groups, skipped, None):
+            exporter.write(resume_id, matches)
+    return {"groups": exporter.groups_done, "rows": exporter.rows_done, "skipped_groups": skipped}
+
+
+def _match_groups(resumes, jobs, embedder, top_k, batch_size):
+    batch = []
+    for resume in resumes:
+        batch.append(resume)
+        if len(batch) == batch_size:
+            yield from _score(batch, jobs, embedder, top_k)
+            batch = []
+    if batch:
+        yield from _score(batch, jobs, embedder, top_k)
+
+
+def _score(batch, jobs, embedder, top_k):
+    for resume, matches in zip(batch, embedder.find_best_matches_many(batch, jobs, top_k)):
+        yield resume.get("id"), matches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Match parsed resumes and export the results")
+    parser.add_argument("resumes", help="Parsed resumes (JSONL/CSV, e.g. from bulk_ingest)")
+    parser.add_argument("--catalog", required=True,
+                        help="Parsed jobs (JSONL/CSV) or a saved JobCatalog directory")
+    parser.add_argument("--output", required=True, help="Output .csv, .jsonl or .parquet path")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="Defaults to the output extension")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per checkpoint")
+    parser.add_argument("--batch-size", type=int, default=256, help="Resumes scored together")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted export")
+    args = parser.parse_args(argv)
+
+    from bulk_ingest import read_records
+    from embedder import ResumeEmbedder
+    from job_catalog import JobCatalog
+
+    if os.path.isdir(args.catalog):
+        jobs = JobCatalog.load(args.catalog)
+    else:
+        jobs = JobCatalog.from_jobs(read_records(args.catalog))
+    embedder = ResumeEmbedder()
+    with MatchExporter(args.output, args.format, args.chunk_size, args.resume) as exporter:
+        skipped = exporter.groups_done
+        # Skip already exported resumes before scoring them
+        resumes = islice(read_records(args.resumes), skipped, None)
+        for resume_id, matches in _match_groups(resumes, jobs, embedder, args.top_k, args.batch_size):
+            exporter.write(resume_id, matches)
+    print(f"✅ Exported {exporter.rows_done} matches for {exporter.groups_done} resumes",
+          file=sys.stderr)
+    print(json.dumps({"groups": exporter.groups_done, "rows": exporter.rows_done,
+                      "skipped_groups": skipped}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Ranked matches that explain themselves on demand
+
+Ranking only produces ``(job_index, skill_match, exp_match, combined)``
+tuples. MatchResult wraps one of them as a read-only mapping with the keys
+of the old result dicts; job title, company, the matched and missing skill
+lists and the match level are only built when one of them is first read,
+e.g. when the UI renders that result or it is exported. Pickling (a
+process pool boundary) turns a result into a plain dict.
+
+The Streamlit app's results used to name the skill counts
+``total_skills_matched``/``total_skills_required``; results built with
+``keys=APP_KEYS`` still have those names, as aliases of
+``total_matched``/``total_required``.
+"""
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from instrumentation import count
+from scoring_policy import DEFAULT_POLICY, ScoringPolicy
+
+# Keys of every result; all but the scores come from explain()
+KEYS = ("job_id", "job_title", "company", "match_percentage", "match_level", "skill_match",
+        "experience_match", "matched_skills", "missing_skills", "total_matched", "total_required")
+
+# Old names of the app's skill counts, deprecated in favour of KEYS
+ALIASES = {"total_skills_matched": "total_matched", "total_skills_required": "total_required"}
+APP_KEYS = KEYS + tuple(ALIASES)
+
+
+class MatchResult(Mapping):
+    """One ranked job: index and scores up front, explanation on first read"""
+
+    __slots__ = ("jobs", "index", "skill_score", "experience_score", "combined",
+                 "resume_skills", "policy", "_keys", "_details")
+
+    def __init__(self, jobs: Sequence[Dict[str, Any]], index: int, skill_match: float,
+                 exp_match: float, combined: float, resume_skills: frozenset,
+                 policy: ScoringPolicy = DEFAULT_POLICY, keys: Tuple[str, ...] = KEYS):
+        self.jobs = jobs
+        self.index = index
+        self.skill_score = skill_match
+        self.experience_score = exp_match
+        self.combined = combined
+        self.resume_skills = resume_skills
+        self.policy = policy
+        self._keys = keys
+        self._details: Optional[Dict[str, Any]] = None
+
+    def explain(self) -> Dict[str, Any]:
+        """Job details, skill breakdown and match level, built once"""
+        if self._details is None:
+            count("matches_explained")
+            job = self.jobs[self.index]
+            metadata = job.get("metadata") or {}
+            job_skills = list(dict.fromkeys(job.get("required_skills", [])))
+            matched = [skill for skill in job_skills if skill in self.resume_skills]
+            self._details = {
+                "job_id": job.get("id"),
+                "job_title": metadata.get("title", "Unknown"),
+                "company": metadata.get("company", "Unknown"),
+                "match_level": self.policy.match_level(self.combined),
+                "matched_skills": matched,
+                "missing_skills": [skill for skill in job_skills if skill not in self.resume_skills],
+                "total_matched": len(matched),
+                "total_required": len(job_skills),
+            }
+        return self._details
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "match_percentage":
+            return round(self.combined * 100, 1)
+        if key == "skill_match":
+            return round(self.skill_score, 2)
+        if key == "experience_match":
+            return round(self.experience_score, 2)
+        if key in ALIASES and key in self._keys:
+            key = ALIASES[key]
+        return self.explain()[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self[key] for key in self._keys}
+
+    def __reduce__(self):
+        # Don't ship the whole job list to another process
+        return dict, (self.to_dict(),)
+
+    def __repr__(self) -> str:
+        return f"MatchResult(index={self.index}, match_percentage={self['match_percentage']})"
+
+
+def match_results(jobs: Sequence[Dict[str, Any]], ranked: Iterable[Tuple[int, float, float, float]],
+                  resume_skills: Iterable[str], policy: ScoringPolicy = DEFAULT_POLICY,
+                  keys: Tuple[str, ...] = KEYS) -> List[MatchResult]:
+    """Results for the rows of BatchMatchEngine.rank(), best first"""
+    resume_skills = frozenset(resume_skills)
+    return [MatchResult(jobs, index, skill_match, exp_match, combined, resume_skills, policy, keys)
+            for index, skill_match, exp_match, combined in ranked]
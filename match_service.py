@@ -0,0 +1,400 @@
+"""
+Async HTTP matching service
+
+Loads the job catalog and embedder once, then serves JSON endpoints:
+
+    POST /process_resume   {"text": ..., "id": ..., "metadata": {...}}
+    POST /process_job      {"text": ..., "id": ..., "metadata": {...}}
+    POST /match            {"text": ... | "resume": {...}, "top_k": 5, "policy": "default"}
+    GET  /health
+    GET  /metrics              JSON counters and stage timings
+    GET  /metrics/prometheus   the same in Prometheus text format
+
+    python match_service.py --catalog jobs.jsonl --port 8080 --workers 4
+
+--catalog also accepts a directory written by JobCatalog.save.
+
+Scoring runs on a process pool; when more than max_queue requests are in
+flight new ones get 503 instead of piling up. With --batch-window-ms,
+match requests arriving together are scored as one resume-by-job matrix.
+"policy" names a scoring policy from scoring_policies.json (or is an
+inline policy config); it defaults to the shared default policy.
+With --instrument, workers time every stage and send the numbers back
+with each result; a request with "profile": true also gets its cProfile
+report and timing breakdown in the response.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+import instrumentation
+from bulk_ingest import read_records
+from job_catalog import JobCatalog
+from match_batcher import MicroBatcher
+from scoring_policy import get_policy
+
+MAX_BODY_BYTES = 5 * 1024 * 1024
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+# Catalog and embedder of the current (worker) process, see _load_state
+_state = None
+_instrument = False
+
+
+class _ServiceState:
+    """Everything a request needs, built once per process"""
+
+    def __init__(self, catalog_path: Optional[str], model_path: Optional[str]):
+        from embedder import ResumeEmbedder
+        self.embedder = ResumeEmbedder(model_path=model_path)
+        self.jobs = []
+        if catalog_path and os.path.isdir(catalog_path):
+            # Saved JobCatalog: memory-mapped, so workers share the same pages
+            self.jobs = JobCatalog.load(catalog_path)
+        elif catalog_path:
+            for number, record in enumerate(read_records(catalog_path)):
+                if "required_skills" in record:
+                    self.jobs.append(record)  # already parsed, e.g. by bulk_ingest
+                else:
+                    record = dict(record)
+                    text = record.pop("description", "") or ""
+                    job_id = record.get("id", f"job_{number + 1}")
+                    self.jobs.append(self.embedder.process_job(text, job_id=job_id, metadata=record))
+        # Warm the match engine so the first request doesn't build it
+        if self.jobs:
+            self.embedder.match_resume_to_jobs({"skills": [], "experience_years": 0}, self.jobs, 1)
+
+
+def _load_state(catalog_path, model_path, instrument=False):
+    global _state, _instrument
+    _state = _ServiceState(catalog_path, model_path)
+    _instrument = instrument
+
+
+def _jsonable(record: Dict[str, Any]) -> Dict[str, Any]:
+    record = dict(record)
+    embedding = record.pop("embedding", None)
+    if isinstance(embedding, np.ndarray):
+        record["embedding"] = embedding.tolist()
+    return record
+
+
+def _run(operation: str, payload: Dict[str, Any]) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    """Execute one request inside a worker; returns (result, trace or None)"""
+    if not _instrument:
+        return _execute(operation, payload), None
+    profile = bool(payload.get("profile"))
+    with instrumentation.trace_request(profile=profile) as trace:
+        result = _execute(operation, payload)
+    return result, {"metrics": trace.metrics.as_dict(), "breakdown": trace.breakdown(),
+                    "profile": trace.profile_text() if profile else None}
+
+
+def _top_k(payload: Dict[str, Any]) -> int:
+    """The request's top_k; ValueError or TypeError unless a positive integer"""
+    top_k = int(payload.get("top_k", 5))
+    if top_k <= 0:
+        raise ValueError(f"top_k must be positive, got {top_k}")
+    return top_k
+
+
+def _valid_resume(resume: Any) -> bool:
+    return isinstance(resume, dict) and isinstance(resume.get("skills"), list)
+
+
+def _execute(operation: str, payload: Dict[str, Any]) -> Any:
+    embedder = _state.embedder
+    if operation == "process_resume":
+        return _jsonable(embedder.process_resume(
+            payload["text"], resume_id=payload.get("id"), metadata=payload.get("metadata")))
+    if operation == "process_job":
+        return _jsonable(embedder.process_job(
+            payload["text"], job_id=payload.get("id"), metadata=payload.get("metadata")))
+    if operation == "match":
+        resume = payload.get("resume") or embedder.process_resume(payload["text"])
+        matches = embedder.match_resume_to_jobs(resume, _state.jobs, _top_k(payload),
+                                                policy=payload.get("policy"))
+        # Results are explained lazily; a response needs every field
+        return [dict(match) for match in matches]
+    raise KeyError(operation)
+
+
+def _run_match_batch(payloads):
+    """Score a coalesced batch of match requests as one matrix operation.
+
+    Returns (result, trace) per request like _run, or the exception that
+    request failed with, so a bad request doesn't fail its neighbours; the
+    batch's trace rides on the first result so it is counted once.
+    """
+    trace = instrumentation.trace_request() if _instrument else None
+    with trace if trace is not None else nullcontext():
+        embedder = _state.embedder
+        resumes, top_ks = [None] * len(payloads), [0] * len(payloads)
+        ranked: list = [None] * len(payloads)
+        for i, payload in enumerate(payloads):
+            try:
+                top_ks[i] = _top_k(payload)
+                resumes[i] = payload.get("resume") or embedder.process_resume(payload["text"])
+                if not _valid_resume(resumes[i]):
+                    raise ValueError("resume must be an object with a 'skills' list")
+            except Exception as e:
+                ranked[i] = e
+        # One matrix per scoring policy in the batch
+        groups: Dict[str, list] = {}
+        for i, payload in enumerate(payloads):
+            if ranked[i] is None:
+                groups.setdefault(json.dumps(payload.get("policy"), sort_keys=True), []).append(i)
+        for indices in groups.values():
+            try:
+                # Rankings are stable, so a shorter top_k is a prefix of the longest one
+                group = embedder.find_best_matches_many(
+                    [resumes[i] for i in indices], _state.jobs, max(top_ks[i] for i in indices),
+                    policy=payloads[indices[0]].get("policy"))
+            except Exception as e:
+                group = [e] * len(indices)
+            for i, matches in zip(indices, group):
+                ranked[i] = matches
+    # Only the results each request keeps are explained
+    results = [matches if isinstance(matches, Exception)
+               else ([dict(match) for match in matches[:top_k]], None)
+               for matches, top_k in zip(ranked, top_ks)]
+    if trace is not None:
+        first = next((i for i, result in enumerate(results) if isinstance(result, tuple)), None)
+        if first is not None:
+            results[first] = (results[first][0], {"metrics": trace.metrics.as_dict()})
+    return results
+
+
+def _job_count(_):
+    return len(_state.jobs)
+
+
+class MatchService:
+    """Request handling, worker pool and backpressure.
+
+    workers=0 keeps the state in this process and runs requests on a
+    small thread pool, which is handy for tests.
+    """
+
+    ROUTES = {"/process_resume": "process_resume", "/process_job": "process_job",
+              "/match": "match"}
+
+    def __init__(self, catalog_path: Optional[str] = None, model_path: Optional[str] = None,
+                 workers: int = 2, max_queue: int = 64, batch_window_ms: float = 0,
+                 max_batch_size: int = 32, instrument: bool = False):
+        self.catalog_path = catalog_path
+        self.batch_window_ms = batch_window_ms
+        self.max_batch_size = max_batch_size
+        self.batcher = None
+        self.model_path = model_path
+        self.instrument = instrument
+        self.workers = workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.rejected = 0
+        self.job_count = 0
+        self._pool = None
+        self._server = None
+
+    def start(self):
+        """Load the catalog and start the worker pool"""
+        if self.workers > 0:
+            self._pool = ProcessPoolExecutor(self.workers, initializer=_load_state,
+                                             initargs=(self.catalog_path, self.model_path,
+                                                       self.instrument))
+            # Start every worker now rather than on the first requests
+            list(self._pool.map(_job_count, range(self.workers)))
+        else:
+            _load_state(self.catalog_path, self.model_path, self.instrument)
+            self._pool = ThreadPoolExecutor(4)
+        self.job_count = self._pool.submit(_job_count, 0).result()
+        if self.batch_window_ms > 0:
+            self.batcher = MicroBatcher(_run_match_batch, self.max_batch_size,
+                                        self.batch_window_ms / 1000, self._pool)
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def handle(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        """Route one request; returns (status, JSON-able payload)"""
+        if path == "/health":
+            return 200, {"status": "ok", "jobs": self.job_count,
+                         "in_flight": self.in_flight, "rejected": self.rejected}
+        if path == "/metrics":
+            return 200, {"batching": self.batcher.metrics.as_dict() if self.batcher else None,
+                         "instrumentation": instrumentation.metrics.as_dict()}
+        if path == "/metrics/prometheus":
+            return 200, instrumentation.metrics.to_prometheus()
+        operation = self.ROUTES.get(path)
+        if operation is None:
+            return 404, {"error": f"Unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+        try:
+            payload = json.loads(body or b"{}")
+            if operation != "match" or "resume" not in payload:
+                payload["text"] = str(payload["text"])
+        except (ValueError, KeyError, TypeError):
+            return 400, {"error": "Expected a JSON object with a 'text' field"}
+        if operation == "match":
+            try:
+                payload["top_k"] = _top_k(payload)
+            except (ValueError, TypeError):
+                return 400, {"error": "'top_k' must be a positive integer"}
+            if "resume" in payload and not _valid_resume(payload["resume"]):
+                return 400, {"error": "'resume' must be an object with a 'skills' list"}
+        if payload.get("policy") is not None:
+            try:
+                get_policy(payload["policy"])
+            except (ValueError, TypeError) as e:
+                return 400, {"error": f"Bad scoring policy: {e}"}
+
+        if self.in_flight >= self.max_queue:
+            self.rejected += 1
+            return 503, {"error": "Server busy, retry later"}
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            if operation == "match" and self.batcher is not None and not payload.get("profile"):
+                result, trace = await self.batcher.submit(payload)
+            else:
+                loop = asyncio.get_running_loop()
+                result, trace = await loop.run_in_executor(self._pool, _run, operation, payload)
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            self.in_flight -= 1
+        if trace is None:
+            return 200, result
+        # Worker stage timings are merged here, where /metrics reads them
+        instrumentation.metrics.merge(trace["metrics"])
+        instrumentation.metrics.observe(f"request.{operation}", time.perf_counter() - start)
+        if payload.get("profile"):
+            return 200, {"result": result, "breakdown": trace["breakdown"],
+                         "profile": trace["profile"]}
+        return 200, result
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "Bad Content-Length"}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version == "HTTP/1.1")
+
+                status, payload = await self.handle(method, target.split("?", 1)[0], body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload).encode(), "application/json"
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n")
+        if status == 503:
+            head += "Retry-After: 1\r\n"
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080):
+        """Start listening; returns the asyncio server"""
+        self._server = await asyncio.start_server(self._serve_connection, host, port)
+        return self._server
+
+
+class LocalClient:
+    """In-process client that calls the service without a socket"""
+
+    def __init__(self, service: MatchService):
+        self.service = service
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        return await self.service.handle("POST", path, json.dumps(payload).encode())
+
+    async def get(self, path: str) -> Tuple[int, Any]:
+        return await self.service.handle("GET", path, b"")
+
+
+async def _main(args):
+    service = MatchService(args.catalog, args.model_path, args.workers, args.max_queue,
+                           args.batch_window_ms, args.max_batch_size, args.instrument)
+    await asyncio.get_running_loop().run_in_executor(None, service.start)
+    server = await service.serve(args.host, args.port)
+    print(f"✅ Serving {service.job_count} jobs on http://{args.host}:{args.port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve resume/job matching over HTTP")
+    parser.add_argument("--catalog",
+                        help="JSONL/CSV job catalog (raw or parsed) or a saved JobCatalog directory")
+    parser.add_argument("--model-path", help="Fitted TF-IDF model")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument("--batch-window-ms", type=float, default=0,
+                        help="Coalesce match requests arriving within this window")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--instrument", action="store_true",
+                        help="Collect stage timings and counters for /metrics")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
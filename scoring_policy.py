@@ -0,0 +1,231 @@
+"""
+Declarative scoring policies for resume-to-job matching
+
+A policy states how a match score is put together: the weights of the
+skill, experience, education and management components, per-skill
+weights, optional (bonus) and required skills, and the thresholds of the
+match levels shown to users. Policies are plain config, e.g. one entry of
+scoring_policies.json:
+
+    {"name": "senior_ml",
+     "weights": {"skill": 0.5, "experience": 0.3, "education": 0.2},
+     "skill_weights": {"machine learning": 2.0},
+     "optional_skills": ["git"],
+     "required_skills": ["python"], "missing_required_factor": 0.5}
+
+BatchMatchEngine compiles a policy once against its job rows into weight
+arrays (CompiledPolicy) and scores the whole catalog with them; the
+default policy reproduces the original 0.6 skill / 0.4 experience score.
+"""
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from job_catalog import EDUCATION_LEVELS
+
+COMPONENTS = ("skill", "experience", "education", "management")
+
+DEFAULT_WEIGHTS = {"skill": 0.6, "experience": 0.4}
+
+# (minimum score, label), best first; the last one catches everything
+DEFAULT_LEVELS = [(0.8, "🔥 Excellent"), (0.6, "👍 Good"), (0.4, "⚠️ Fair"), (0.0, "❌ Poor")]
+
+POLICIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scoring_policies.json")
+
+
+class ScoringPolicy:
+    """Weights and thresholds of one way of scoring matches.
+
+    Components, each in [0, 1] per job:
+
+    * skill: weighted share of the job's skills the resume has. A skill
+      weighs ``skill_weights.get(skill, default_skill_weight)``; optional
+      skills add to the matched weight but not to the required total.
+    * experience: resume years over required years, capped at 1.
+    * education: resume level over required level, capped at 1.
+    * management: 0 if the job requires management and the resume shows
+      none, else 1.
+
+    The score is the weighted sum, multiplied by ``missing_required_factor``
+    when the job asks for one of ``required_skills`` the resume lacks.
+    """
+
+    def __init__(self, name: str = "default", weights: Optional[Dict[str, float]] = None,
+                 skill_weights: Optional[Dict[str, float]] = None,
+                 default_skill_weight: float = 1.0, optional_skills: Iterable[str] = (),
+                 required_skills: Iterable[str] = (), missing_required_factor: float = 1.0,
+                 levels: Optional[Sequence[Tuple[float, str]]] = None):
+        weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        unknown = set(weights) - set(COMPONENTS)
+        if unknown:
+            raise ValueError(f"Unknown score components {sorted(unknown)}; use {COMPONENTS}")
+        skill_weights = dict(skill_weights or {})
+        if any(value < 0 for value in [*weights.values(), *skill_weights.values(),
+                                       default_skill_weight]):
+            raise ValueError(f"Policy {name!r} has a negative weight")
+        if not 0 <= missing_required_factor <= 1:
+            raise ValueError("missing_required_factor must be between 0 and 1")
+
+        self.name = name
+        self.weights = {component: float(weights.get(component, 0.0)) for component in COMPONENTS}
+        self.skill_weights = skill_weights
+        self.default_skill_weight = float(default_skill_weight)
+        self.optional_skills = frozenset(optional_skills)
+        self.required_skills = frozenset(required_skills)
+        self.missing_required_factor = float(missing_required_factor)
+        self.levels = sorted(((float(minimum), label) for minimum, label in
+                              (levels or DEFAULT_LEVELS)), reverse=True)
+        self._thresholds = np.array([minimum for minimum, _ in self.levels])
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ScoringPolicy":
+        return cls(**config)
+
+    def to_config(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "weights": {component: weight for component, weight in self.weights.items() if weight},
+            "skill_weights": self.skill_weights,
+            "default_skill_weight": self.default_skill_weight,
+            "optional_skills": sorted(self.optional_skills),
+            "required_skills": sorted(self.required_skills),
+            "missing_required_factor": self.missing_required_factor,
+            "levels": [list(level) for level in self.levels],
+        }
+
+    def __repr__(self) -> str:
+        return f"ScoringPolicy({self.name!r})"
+
+    def skill_weight(self, skill: str) -> float:
+        return self.skill_weights.get(skill, self.default_skill_weight)
+
+    @property
+    def non_skill_weight(self) -> float:
+        """Most a job sharing no skill with the resume can score"""
+        return self.weights["experience"] + self.weights["education"] + self.weights["management"]
+
+    def match_level(self, score: float) -> str:
+        """Label of the first level whose minimum the score reaches"""
+        for minimum, label in self.levels:
+            if score >= minimum:
+                return label
+        return self.levels[-1][1]
+
+    def match_levels(self, scores: np.ndarray) -> List[str]:
+        """match_level() of many scores at once"""
+        rank = np.searchsorted(-self._thresholds, -np.asarray(scores, dtype=np.float64),
+                               side="left")
+        labels = [label for _, label in self.levels]
+        return [labels[min(i, len(labels) - 1)] for i in rank.tolist()]
+
+    def compile(self, engine) -> "CompiledPolicy":
+        return CompiledPolicy(self, engine)
+
+
+class CompiledPolicy:
+    """A policy bound to one engine's rows as weight arrays.
+
+    Only skills with a non-default weight or marked optional get columns
+    (``skill_ids``); every other skill weighs default_skill_weight, so the
+    matched weight is that times the popcount overlap plus a small dense
+    correction. ``denominator`` is each job's required skill weight.
+    """
+
+    def __init__(self, policy: ScoringPolicy, engine):
+        self.policy = policy
+        ids = engine.skill_ids
+        base = policy.default_skill_weight
+        names = {ids[skill]: skill for skill in set(policy.skill_weights) | policy.optional_skills
+                 if skill in ids}
+        special = sorted(skill_id for skill_id, skill in names.items()
+                         if skill in policy.optional_skills or policy.skill_weight(skill) != base)
+        self.skill_ids = np.array(special, dtype=np.intp)
+        self.matched_delta = np.array([policy.skill_weight(names[i]) - base for i in special])
+        required_delta = np.array([(0.0 if names[i] in policy.optional_skills
+                                    else policy.skill_weight(names[i])) - base for i in special])
+        denominator = base * engine.total_required + engine.skill_columns(self.skill_ids) @ required_delta
+        self.denominator = np.where(denominator > 0, denominator, 1.0)
+        self.required_ids = np.array(sorted(ids[skill] for skill in policy.required_skills
+                                            if skill in ids), dtype=np.intp)
+
+    def skill_match(self, engine, overlap: np.ndarray, resume_bits: np.ndarray,
+                    rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Weighted skill match from popcount overlaps; one row per resume for 2-d input"""
+        denominator = self.denominator if rows is None else self.denominator[rows]
+        matched = overlap if self.policy.default_skill_weight == 1.0 \
+            else self.policy.default_skill_weight * overlap
+        if len(self.skill_ids):
+            has = bit_columns(resume_bits, self.skill_ids)
+            matched = matched + (has * self.matched_delta) @ engine.skill_columns(self.skill_ids, rows).T
+        skill_match = matched / denominator
+        # Optional skills can push the matched weight past the required total
+        return np.minimum(skill_match, 1.0) if self.policy.optional_skills else skill_match
+
+    def missing_required(self, engine, resume_bits: np.ndarray,
+                         rows: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """True where the job asks for a required skill the resume lacks"""
+        if not len(self.required_ids):
+            return None
+        lacking = 1 - bit_columns(resume_bits, self.required_ids)
+        return (lacking @ engine.skill_columns(self.required_ids, rows).T) > 0
+
+    def combine(self, skill_match: np.ndarray, terms: Dict[str, np.ndarray],
+                missing_required: Optional[np.ndarray] = None) -> np.ndarray:
+        """Weighted sum of the components; ``terms`` holds the non-skill ones"""
+        weights = self.policy.weights
+        combined = weights["skill"] * skill_match + weights["experience"] * terms["experience"]
+        for component in ("education", "management"):
+            if weights[component]:
+                combined = combined + weights[component] * terms[component]
+        if missing_required is not None:
+            combined = np.where(missing_required,
+                                combined * self.policy.missing_required_factor, combined)
+        return combined
+
+
+def bit_columns(bits: np.ndarray, skill_ids: np.ndarray) -> np.ndarray:
+    """0/1 float columns of the given skill ids from bit-packed skill rows"""
+    shifts = (skill_ids & 63).astype(np.uint64)
+    return ((bits[..., skill_ids >> 6] >> shifts) & np.uint64(1)).astype(np.float64)
+
+
+def education_rank(level: Optional[str]) -> int:
+    return EDUCATION_LEVELS.index(level) if level in EDUCATION_LEVELS else 0
+
+
+DEFAULT_POLICY = ScoringPolicy("default")
+
+
+def load_policies(path: Optional[str] = None) -> Dict[str, ScoringPolicy]:
+    """Policies of a JSON list of policy configs, by name"""
+    with open(path or POLICIES_PATH, encoding="utf-8") as f:
+        configs = json.load(f)
+    return {config["name"]: ScoringPolicy.from_config(config) for config in configs}
+
+
+@lru_cache(maxsize=8)
+def _named_policies(path: str) -> Dict[str, ScoringPolicy]:
+    # Named policies are shared objects, so engines compile each one once
+    return load_policies(path)
+
+
+def policy_names(path: Optional[str] = None) -> List[str]:
+    """Names of the policies in the policies file"""
+    return list(_named_policies(path or POLICIES_PATH))
+
+
+def get_policy(policy=None, path: Optional[str] = None) -> ScoringPolicy:
+    """A ScoringPolicy from itself, a config dict, a name in the policies file, or None"""
+    if policy is None:
+        return DEFAULT_POLICY
+    if isinstance(policy, ScoringPolicy):
+        return policy
+    if isinstance(policy, dict):
+        return ScoringPolicy.from_config(policy)
+    policies = _named_policies(path or POLICIES_PATH)
+    if policy not in policies:
+        raise ValueError(f"Unknown scoring policy {policy!r}; known: {sorted(policies)}")
+    return policies[policy]
@@ -0,0 +1,226 @@
+"""
+Shared skill taxonomy with synonyms, implied skills and a precompiled matcher
+
+skill_taxonomy.json lists every canonical skill once with its aliases and
+the skills it implies:
+
+    "pytorch": {"aliases": ["torch"], "implies": ["deep learning"]}
+
+A skill's own name is always one of its aliases, and finding a skill also
+finds everything it implies, transitively. The taxonomy compiles into a
+SkillMatcher: one trie-shaped regex over every alias plus a table from
+alias to the skill ids it yields, so extraction is one scan of the text
+however many skills there are. Building the trie and hit tables for
+thousands of aliases takes a while, so they are cached on disk, keyed by
+a digest of the data file; a loading process only compiles the regex,
+once, as get_skill_matcher keeps one matcher per process:
+
+    python skill_taxonomy.py compile            # prebuild, e.g. at deploy time
+    python skill_taxonomy.py find "PyTorch on k8s"
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import re
+import tempfile
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from extraction_cache import DEFAULT_CACHE_DIR
+from instrumentation import count
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_taxonomy.json")
+
+# Bump when SkillMatcher's compiled form changes
+COMPILER_VERSION = "2"
+
+
+def _is_word_char(char: str) -> bool:
+    """Same test as the regex \\w class for str patterns"""
+    return char.isalnum() or char == "_"
+
+
+def trie_regex(words: Iterable[str]) -> str:
+    """Build a regex alternation shaped like a trie over ``words``.
+
+    Branching on one character at a time keeps the regex engine from
+    retrying every word at every position, and greedy optional suffixes
+    make the longest word win at a given start position.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def emit(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + emit(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return emit(trie)
+
+
+class SkillMatcher:
+    """Finds every skill of a taxonomy in one scan of the text.
+
+    Equivalent to matching each alias separately as a whole word (not
+    preceded or followed by a word character): the scan reports the
+    longest alias starting at each position, and every shorter alias that
+    ends at a word edge inside it is precomputed into the hit table, as
+    are the skills each skill implies.
+    """
+
+    def __init__(self, skill_aliases: Dict[str, List[str]],
+                 implies: Optional[Dict[str, List[str]]] = None):
+        self.skills = list(skill_aliases)
+        self.fingerprint = hashlib.sha256(
+            json.dumps([skill_aliases, implies or {}], sort_keys=True).encode()
+        ).hexdigest()[:16]
+        closure = _implied_ids(self.skills, implies or {})
+
+        alias_skills: Dict[str, set] = {}
+        for skill_id, aliases in enumerate(skill_aliases.values()):
+            for alias in aliases:
+                if alias:
+                    alias_skills.setdefault(alias, set()).update(closure[skill_id])
+
+        self._hits: Dict[str, frozenset] = {}
+        for alias in alias_skills:
+            hits = set(alias_skills[alias])
+            for i in range(1, len(alias)):
+                prefix = alias[:i]
+                if prefix in alias_skills and not _is_word_char(alias[i]):
+                    hits.update(alias_skills[prefix])
+            self._hits[alias] = frozenset(hits)
+
+        self.longest_alias = max(map(len, self._hits), default=0)
+        self._regex = r"(?<!\w)(?=(" + trie_regex(alias_skills) + r")(?!\w))"
+        self.pattern = re.compile(self._regex)
+
+    @classmethod
+    def from_taxonomy(cls, taxonomy: Dict[str, Any]) -> "SkillMatcher":
+        """Build from the parsed contents of a taxonomy file"""
+        skills = taxonomy["skills"]
+        return cls({skill: [skill, *entry.get("aliases", [])] for skill, entry in skills.items()},
+                   {skill: entry["implies"] for skill, entry in skills.items() if entry.get("implies")})
+
+    def __getstate__(self):
+        # The tables and the regex source; the pattern is compiled on load
+        state = self.__dict__.copy()
+        del state["pattern"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.pattern = re.compile(self._regex)
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def find(self, clean_text: str) -> List[str]:
+        """Return matched skills in taxonomy order"""
+        return [self.skills[skill_id] for skill_id in sorted(self.find_ids(clean_text))]
+
+    def find_ids(self, clean_text: str, start: int = 0, end: Optional[int] = None) -> set:
+        """Skill ids matched at positions start..end (the text around counts as context)"""
+        hits = self._hits
+        found = set()
+        count("regex_evaluations")
+        for match in self.pattern.finditer(clean_text, start):
+            if end is not None and match.start() >= end:
+                break
+            found |= hits[match.group(1)]
+        return found
+
+
+def _implied_ids(skills: List[str], implies: Dict[str, List[str]]) -> List[set]:
+    """Each skill's id plus the ids of everything it implies, transitively"""
+    ids = {skill: skill_id for skill_id, skill in enumerate(skills)}
+    direct: List[List[int]] = [[] for _ in skills]
+    for skill, implied in implies.items():
+        for name in implied:
+            if skill not in ids or name not in ids:
+                raise ValueError(f"Skill {skill!r} implies unknown skill {name!r}")
+            direct[ids[skill]].append(ids[name])
+
+    closure = []
+    for skill_id in range(len(skills)):
+        seen, stack = {skill_id}, [skill_id]
+        while stack:
+            for implied_id in direct[stack.pop()]:
+                if implied_id not in seen:
+                    seen.add(implied_id)
+                    stack.append(implied_id)
+        closure.append(seen)
+    return closure
+
+
+def load_taxonomy(path: Optional[str] = None) -> Dict[str, Any]:
+    """Parsed taxonomy file: ``{"version": 1, "skills": {name: entry}}``"""
+    with open(path or TAXONOMY_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compiled_path(path: Optional[str] = None, cache_dir: Optional[str] = None) -> str:
+    """Where the compiled matcher of the taxonomy file at ``path`` is cached"""
+    with open(path or TAXONOMY_PATH, "rb") as f:
+        source = f.read()
+    digest = hashlib.sha256(COMPILER_VERSION.encode() + source).hexdigest()[:16]
+    directory = cache_dir or os.environ.get("JOB_MATCH_CACHE_DIR", DEFAULT_CACHE_DIR)
+    return os.path.join(directory, f"skill_matcher-{digest}.pickle")
+
+
+def load_skill_matcher(path: Optional[str] = None, cache_dir: Optional[str] = None) -> SkillMatcher:
+    """The taxonomy's SkillMatcher, from the compiled cache when it is current"""
+    target = compiled_path(path, cache_dir)
+    try:
+        with open(target, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, KeyError):
+        pass
+
+    matcher = SkillMatcher.from_taxonomy(load_taxonomy(path))
+    try:
+        # Written under a temporary name first so readers never see half a file
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(target), delete=False) as f:
+            pickle.dump(matcher, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, target)
+    except OSError:
+        pass  # read-only cache directory: compile again next time
+    return matcher
+
+
+@lru_cache(maxsize=None)
+def get_skill_matcher(path: Optional[str] = None) -> SkillMatcher:
+    """The process-wide matcher of the taxonomy file, loaded once"""
+    return load_skill_matcher(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile or query the skill taxonomy")
+    parser.add_argument("command", choices=["compile", "find"])
+    parser.add_argument("text", nargs="?", default="", help="Text to search (find)")
+    parser.add_argument("--taxonomy", help="Taxonomy JSON file")
+    parser.add_argument("--cache-dir", help="Where compiled matchers are kept")
+    args = parser.parse_args(argv)
+
+    if args.command == "compile":
+        target = compiled_path(args.taxonomy, args.cache_dir)
+        if os.path.exists(target):
+            os.remove(target)
+        matcher = load_skill_matcher(args.taxonomy, args.cache_dir)
+        print(f"✅ Compiled {len(matcher)} skills ({len(matcher._hits)} aliases) to {target}")
+    else:
+        print(json.dumps(load_skill_matcher(args.taxonomy, args.cache_dir).find(args.text.lower())))
+
+
+if __name__ == "__main__":
+    main()
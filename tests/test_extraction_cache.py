@@ -0,0 +1,93 @@
+"""
+ExtractionCache LRU eviction and batched access-time updates
+"""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import extraction_cache  # noqa: E402
+from extraction_cache import ExtractionCache  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(extraction_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ExtractionCache(str(tmp_path), max_entries=3)
+    yield cache
+    cache.close()
+
+
+def stored_access_time(cache, key):
+    with sqlite3.connect(cache.path) as conn:
+        return conn.execute("SELECT accessed FROM entries WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_evict_drops_least_recently_used(cache, clock):
+    for number in range(5):
+        clock.now += 1
+        cache.put(f"k{number}", "fp", {"n": number})
+    # A hit old enough to count makes k0 the most recently used
+    clock.now += extraction_cache._ACCESS_RESOLUTION
+    assert cache.get("k0") == {"n": 0}
+    cache.evict()
+    assert len(cache) == 3
+    assert cache.get("k1") is None and cache.get("k2") is None
+    assert [cache.get(key) for key in ("k0", "k3", "k4")] == [{"n": 0}, {"n": 3}, {"n": 4}]
+
+
+def test_hits_do_not_write_until_flushed(cache, clock):
+    cache.put("k", "fp", [1, 2])
+    written = stored_access_time(cache, "k")
+
+    # Within the resolution a hit records nothing
+    clock.now += 1
+    assert cache.get("k") == [1, 2]
+    assert cache._accessed == {}
+
+    clock.now += extraction_cache._ACCESS_RESOLUTION
+    assert cache.get("k") == [1, 2]
+    assert stored_access_time(cache, "k") == written
+    cache.flush_access_times()
+    assert stored_access_time(cache, "k") == clock.now
+    assert cache.hits == 2 and cache.misses == 0
+
+
+def test_access_times_flush_in_batches(cache, clock, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "_ACCESS_FLUSH_EVERY", 2)
+    cache.put("a", "fp", 1)
+    cache.put("b", "fp", 2)
+    clock.now += extraction_cache._ACCESS_RESOLUTION
+    cache.get("a")
+    assert stored_access_time(cache, "a") < clock.now
+    cache.get("b")
+    assert cache._accessed == {}
+    assert stored_access_time(cache, "a") == stored_access_time(cache, "b") == clock.now
+
+
+def test_flush_never_moves_access_time_back(cache, clock):
+    cache.put("k", "fp", 1)
+    clock.now += extraction_cache._ACCESS_RESOLUTION
+    cache.get("k")
+    # Another process reads the entry later and flushes first
+    with sqlite3.connect(cache.path) as conn:
+        conn.execute("UPDATE entries SET accessed = ? WHERE key = 'k'", (clock.now + 10,))
+    cache.flush_access_times()
+    assert stored_access_time(cache, "k") == clock.now + 10
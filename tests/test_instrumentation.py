@@ -0,0 +1,53 @@
+"""
+Tests for request traces when profilers collide
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import instrumentation  # noqa: E402
+
+
+class SingleSlotProfile:
+    """Stands in for cProfile.Profile on Python 3.12+: one active at a time"""
+    active = None
+
+    def enable(self):
+        if SingleSlotProfile.active is not None:
+            raise ValueError("Another profiling tool is already active")
+        SingleSlotProfile.active = self
+
+    def disable(self):
+        if SingleSlotProfile.active is self:
+            SingleSlotProfile.active = None
+
+
+def test_second_profiled_trace_runs_unprofiled(monkeypatch):
+    monkeypatch.setattr(instrumentation.cProfile, "Profile", SingleSlotProfile)
+    with instrumentation.trace_request(profile=True) as first:
+        with instrumentation.trace_request(profile=True) as second:
+            instrumentation.count("jobs_scored", 3)
+        assert first.profiler is not None
+        assert second.profiler is None
+        assert "already active" in second.profile_text()
+        assert second.counters() == {"jobs_scored": 3}
+
+    # Nothing is left switched on once both traces close
+    assert instrumentation._open_traces == 0
+    assert not instrumentation._active
+    assert SingleSlotProfile.active is None
+
+
+def test_trace_collects_stage_timings():
+    @instrumentation.timed("work")
+    def work():
+        return 1
+
+    work()
+    with instrumentation.trace_request() as trace:
+        work()
+        work()
+    assert [(name, calls) for name, calls, _ in trace.breakdown()] == [("work", 2)]
+    assert trace.profile_text() == ""
+    assert not instrumentation._active
@@ -0,0 +1,47 @@
+"""
+JobCatalog columns against the job dicts they were built from
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from job_catalog import JobCatalog  # noqa: E402
+from match_engine import BatchMatchEngine  # noqa: E402
+
+
+def make_jobs(rng, n_jobs):
+    skills = [f"skill{number}" for number in range(30)]
+    return [{"id": f"j{number}", "required_skills": rng.sample(skills, rng.randint(0, 4)),
+             "experience_needed": rng.choice([0, 1.1, 2.3, 3.7, 5, 0.1]),
+             "requires_management": rng.random() < 0.2,
+             "education_required": rng.choice(["unknown", "bachelors", "masters", "phd"]),
+             "metadata": {"title": f"Job {number}", "company": "TestCorp"}}
+            for number in range(n_jobs)]
+
+
+def test_round_trip_keeps_every_field(tmp_path):
+    jobs = make_jobs(random.Random(0), 50)
+    catalog = JobCatalog.from_jobs(jobs)
+    catalog.save(str(tmp_path))
+    for loaded in (catalog, JobCatalog.load(str(tmp_path))):
+        assert len(loaded) == len(jobs)
+        for job, row in zip(jobs, loaded):
+            assert row["id"] == job["id"]
+            assert row["required_skills"] == job["required_skills"]
+            assert row["experience_needed"] == job["experience_needed"]
+            assert row["requires_management"] == job["requires_management"]
+            assert row["education_required"] == job["education_required"]
+            assert row["metadata"] == job["metadata"]
+
+
+def test_catalog_engine_scores_like_the_list_engine():
+    rng = random.Random(1)
+    jobs = make_jobs(rng, 200)
+    from_list, from_catalog = BatchMatchEngine(jobs), BatchMatchEngine(JobCatalog.from_jobs(jobs))
+    for _ in range(20):
+        resume = {"skills": [f"skill{rng.randrange(30)}" for _ in range(3)],
+                  "experience_years": rng.choice([0, 1, 2, 3.3])}
+        for expected, actual in zip(from_list.score(resume), from_catalog.score(resume)):
+            assert (expected == actual).all()
@@ -0,0 +1,84 @@
+"""
+JobDeduplicator grouping as postings are added, removed and rechecked
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from job_dedup import JobDeduplicator  # noqa: E402
+
+POSTING = ("Senior Python developer to build data pipelines with SQL, Airflow and AWS. "
+           "You will own ingestion services, mentor two engineers and work with "
+           "analysts on reporting. 5 years of experience required, bachelor degree "
+           "in computer science preferred. Remote friendly, competitive salary.")
+REPOST = POSTING.replace("Remote friendly", "Remote friendly (EU time zones)")
+OTHER = ("Frontend engineer for our design system: React, TypeScript and accessibility "
+         "audits. Pair with designers, ship components and review pull requests daily.")
+
+
+@pytest.fixture
+def dedup():
+    return JobDeduplicator(threshold=0.8)
+
+
+def test_repost_collapses_into_first_posting(dedup):
+    assert dedup.add("a", POSTING) is None
+    assert dedup.add("b", REPOST) == "a"
+    assert dedup.add("c", OTHER) is None
+    assert len(dedup) == 2
+    assert dedup.duplicate_count == 1
+    assert dedup.canonical_of("b") == "a"
+    assert dedup.canonical_of("c") == "c"
+    assert dedup.duplicates_of("a") == ["b"]
+    assert dedup.groups() == {"a": ["b"]}
+    assert dedup.find(REPOST)[0] == "a"
+    assert dedup.find(OTHER + " Also Go.")[0] == "c"
+
+
+def test_removing_a_duplicate_keeps_its_canonical(dedup):
+    dedup.add("a", POSTING)
+    dedup.add("b", REPOST)
+    assert dedup.remove("b") == []
+    assert dedup.groups() == {}
+    assert dedup.duplicate_count == 0
+    assert dedup.find(POSTING)[0] == "a"
+
+
+def test_removing_a_canonical_orphans_its_duplicates_for_recheck(dedup):
+    dedup.add("a", POSTING)
+    dedup.add("b", REPOST)
+    dedup.add("d", REPOST + " Apply today.")
+    assert dedup.remove("a") == ["b", "d"]
+    assert len(dedup) == 0 and dedup.duplicate_count == 0
+    assert dedup.find(POSTING) is None
+
+    # Rechecked in order, the first orphan becomes the new canonical
+    assert dedup.add("b", REPOST) is None
+    assert dedup.add("d", REPOST + " Apply today.") == "b"
+    assert dedup.groups() == {"b": ["d"]}
+
+
+def test_readding_an_id_replaces_its_posting(dedup):
+    dedup.add("a", POSTING)
+    dedup.add("b", REPOST)
+    # b was edited into something else entirely
+    assert dedup.add("b", OTHER) is None
+    assert dedup.groups() == {}
+    assert len(dedup) == 2
+
+
+def test_postings_without_words_are_not_indexed(dedup):
+    assert dedup.add("empty", "") is None
+    assert dedup.add("blank", "   ") is None
+    assert len(dedup) == 0
+    assert dedup.remove("empty") == []
+
+
+def test_threshold_must_be_a_similarity():
+    with pytest.raises(ValueError):
+        JobDeduplicator(threshold=0)
+    with pytest.raises(ValueError):
+        JobDeduplicator(threshold=1.5)
@@ -0,0 +1,53 @@
+"""
+Regression tests for JobStore compaction
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import job_store  # noqa: E402
+from job_catalog import JobCatalog  # noqa: E402
+from job_store import JobStore  # noqa: E402
+
+
+def make_job(number, skills=("python",)):
+    return {"required_skills": list(skills), "experience_needed": number % 5,
+            "metadata": {"title": f"Job {number}", "company": "TestCorp"}}
+
+
+def test_overlapping_compactions_keep_every_write(monkeypatch):
+    store = JobStore()
+    for number in range(1, 5):
+        store.upsert(f"j{number}", make_job(number))
+
+    # Hold the background compaction in its build step
+    building, release = threading.Event(), threading.Event()
+    from_jobs = JobCatalog.from_jobs.__func__
+
+    def blocking_from_jobs(cls, jobs):
+        if not building.is_set():
+            building.set()
+            release.wait(10)
+        return from_jobs(cls, jobs)
+
+    monkeypatch.setattr(job_store.JobCatalog, "from_jobs", classmethod(blocking_from_jobs))
+    background = store.compact(background=True)
+    assert building.wait(10)
+
+    store.upsert("j9", make_job(9, ["docker"]))
+    foreground = threading.Thread(target=store.compact)
+    foreground.start()
+    foreground.join(0.2)
+    store.upsert("j1", make_job(1, ["aws"]))
+    release.set()
+    background.join(10)
+    foreground.join(10)
+
+    assert sorted(store.ids()) == ["j1", "j2", "j3", "j4", "j9"]
+    assert store.get("j1")["required_skills"] == ["aws"]
+    assert store.get("j9")["required_skills"] == ["docker"]
+    assert len(store) == len(store.live_slots()) == 5
+    engine = store.engine
+    assert sorted(engine.jobs[slot]["id"] for slot in store.live_slots()) == sorted(store.ids())
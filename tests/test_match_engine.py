@@ -0,0 +1,97 @@
+"""
+BatchMatchEngine against the original per-job scoring loop
+"""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from match_engine import BatchMatchEngine  # noqa: E402
+
+
+def reference_rank(resume_data, jobs_data, top_k, by="combined"):
+    """The loop match_resume_to_jobs ran before the engine existed"""
+    results = []
+    for index, job in enumerate(jobs_data):
+        resume_skills = set(resume_data.get("skills", []))
+        job_skills = set(job.get("required_skills", []))
+        skill_match = len(resume_skills & job_skills) / max(len(job_skills), 1)
+
+        resume_exp = resume_data.get("experience_years", 0)
+        job_exp = job.get("experience_needed", 0)
+        if job_exp <= 0 or resume_exp >= job_exp:
+            exp_match = 1.0
+        else:
+            exp_match = resume_exp / max(job_exp, 1)
+
+        combined = 0.6 * skill_match + 0.4 * exp_match
+        key = combined if by == "combined" else skill_match
+        results.append((round(key * 100, 1), index, skill_match, exp_match, combined))
+    results.sort(key=lambda row: row[0], reverse=True)
+    return results[:top_k]
+
+
+def random_catalog(rng, n_jobs, n_skills):
+    skills = [f"skill{number}" for number in range(n_skills)]
+    return [{"required_skills": rng.sample(skills, rng.randint(0, min(5, n_skills))),
+             "experience_needed": rng.choice([0, 1, 1.1, 2, 2.5, 3, 5, 7.3, 10]),
+             "metadata": {"title": f"Job {number}"}}
+            for number in range(n_jobs)], skills
+
+
+def random_resume(rng, skills):
+    return {"skills": rng.sample(skills, rng.randint(0, min(6, len(skills)))),
+            "experience_years": rng.choice([0, 0.5, 1, 2, 3.3, 4, 6, 12])}
+
+
+def assert_same_ranking(ranked, expected, by="combined"):
+    assert [index for index, *_ in ranked] == [row[1] for row in expected]
+    for (_, skill_match, exp_match, combined), row in zip(ranked, expected):
+        key = combined if by == "combined" else skill_match
+        assert round(key * 100, 1) == row[0]
+        assert skill_match == pytest.approx(row[2])
+        assert exp_match == pytest.approx(row[3])
+        assert combined == pytest.approx(row[4])
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("by", ["combined", "skill"])
+def test_rank_matches_reference_loop(seed, by):
+    rng = random.Random(seed)
+    jobs, skills = random_catalog(rng, rng.randint(1, 300), rng.choice([3, 20, 80]))
+    engine = BatchMatchEngine(jobs)
+    for _ in range(5):
+        resume = random_resume(rng, skills)
+        top_k = rng.choice([1, 5, 10, len(jobs) + 3])
+        expected = reference_rank(resume, jobs, top_k, by)
+        assert_same_ranking(engine.rank(resume, top_k, by=by), expected, by)
+        assert_same_ranking(engine.rank(resume, top_k, by=by, prune=False), expected, by)
+
+
+def test_rank_pruned_is_exact_whenever_it_answers():
+    rng = random.Random(7)
+    jobs, skills = random_catalog(rng, 2000, 400)
+    engine = BatchMatchEngine(jobs)
+    answered = 0
+    for _ in range(200):
+        resume = random_resume(rng, skills)
+        top_k = rng.choice([1, 3, 5])
+        ranked = engine.rank_pruned(resume, top_k)
+        if ranked is None:
+            continue
+        answered += 1
+        assert_same_ranking(ranked, reference_rank(resume, jobs, top_k))
+    # Rare skills should let most lookups skip the dense scan
+    assert answered > 50
+
+
+def test_rank_many_matches_rank():
+    rng = random.Random(3)
+    jobs, skills = random_catalog(rng, 150, 30)
+    engine = BatchMatchEngine(jobs)
+    resumes = [random_resume(rng, skills) for _ in range(8)]
+    assert engine.rank_many(resumes, 7) == [engine.rank(resume, 7, prune=False)
+                                            for resume in resumes]
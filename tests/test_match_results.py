@@ -0,0 +1,32 @@
+"""
+MatchResult keys, including the app's old skill-count names
+"""
+import os
+import pickle
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from match_results import APP_KEYS, KEYS, match_results  # noqa: E402
+
+JOBS = [{"id": "j1", "required_skills": ["python", "sql", "aws"], "experience_needed": 2,
+         "metadata": {"title": "Data Engineer", "company": "TestCorp"}}]
+RANKED = [(0, 2 / 3, 1.0, 0.6 * 2 / 3 + 0.4)]
+
+
+def test_default_keys():
+    (result,) = match_results(JOBS, RANKED, ["python", "sql"])
+    assert tuple(result) == KEYS
+    assert result["total_matched"] == 2 and result["total_required"] == 3
+    assert "total_skills_matched" not in result
+    assert result.get("total_skills_matched") is None
+
+
+def test_app_keys_keep_the_old_skill_count_names():
+    (result,) = match_results(JOBS, RANKED, ["python", "sql"], keys=APP_KEYS)
+    assert result["total_skills_matched"] == result["total_matched"] == 2
+    assert result["total_skills_required"] == result["total_required"] == 3
+    as_dict = pickle.loads(pickle.dumps(result))
+    assert set(as_dict) == set(APP_KEYS)
+    assert as_dict["match_percentage"] == 80.0
+    assert as_dict["matched_skills"] == ["python", "sql"]
@@ -0,0 +1,92 @@
+"""
+MatchService request validation and backpressure
+"""
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from match_service import LocalClient, MatchService  # noqa: E402
+
+JOBS = [
+    {"id": "j1", "required_skills": ["python", "sql"], "experience_needed": 2,
+     "metadata": {"title": "Data Engineer", "company": "TestCorp"}},
+    {"id": "j2", "required_skills": ["java"], "experience_needed": 5,
+     "metadata": {"title": "Backend Engineer", "company": "TestCorp"}},
+]
+RESUME = {"skills": ["python", "sql"], "experience_years": 3}
+
+
+@pytest.fixture(scope="module")
+def service(tmp_path_factory):
+    catalog = tmp_path_factory.mktemp("catalog") / "jobs.jsonl"
+    catalog.write_text("".join(json.dumps(job) + "\n" for job in JOBS))
+    service = MatchService(str(catalog), workers=0)
+    service.start()
+    yield service
+    service.close()
+
+
+def post(service, path, payload):
+    return asyncio.run(LocalClient(service).post(path, payload))
+
+
+def test_match(service):
+    status, matches = post(service, "/match", {"resume": RESUME, "top_k": 1})
+    assert status == 200
+    assert [match["job_title"] for match in matches] == ["Data Engineer"]
+
+
+@pytest.mark.parametrize("path, payload", [
+    ("/process_resume", {}),
+    ("/process_resume", ["not", "an", "object"]),
+    ("/match", {"resume": RESUME, "top_k": 0}),
+    ("/match", {"resume": RESUME, "top_k": -3}),
+    ("/match", {"resume": RESUME, "top_k": "many"}),
+    ("/match", {"resume": {"skills": "python"}}),
+    ("/match", {"resume": "python"}),
+    ("/match", {"resume": RESUME, "policy": "no-such-policy"}),
+])
+def test_bad_requests_get_400(service, path, payload):
+    status, body = post(service, path, payload)
+    assert status == 400
+    assert "error" in body
+
+
+def test_invalid_json_gets_400(service):
+    status, _ = asyncio.run(service.handle("POST", "/match", b"{not json"))
+    assert status == 400
+
+
+def test_full_queue_gets_503(service, monkeypatch):
+    monkeypatch.setattr(service, "max_queue", 0)
+    rejected = service.rejected
+    status, _ = post(service, "/match", {"resume": RESUME})
+    assert status == 503
+    assert service.rejected == rejected + 1
+
+
+async def raw_request(service, head):
+    server = await service.serve("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(head)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return int(response.split(b" ", 2)[1])
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.parametrize("length, status", [("abc", 400), ("-5", 400), ("99999999999", 413)])
+def test_bad_content_length(service, length, status):
+    head = (f"POST /match HTTP/1.1\r\nContent-Length: {length}\r\n"
+            f"Connection: close\r\n\r\n").encode()
+    assert asyncio.run(raw_request(service, head)) == status
@@ -0,0 +1,61 @@
+"""
+TextLexer over a whole text against the windowed stream of the same text
+"""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from text_processor import TextProcessor  # noqa: E402
+
+WORDS = ["python", "java", "machine learning", "aws", "docker", "sql", "react",
+         "experience", "years", "5 years", "3-5 yrs", "10+ years of experience",
+         "team lead", "manager", "bachelor", "masters", "phd", "built", "models",
+         "and", "with", "the", "C++", "node.js", "  ", "\n", "!!", "-"]
+
+
+@pytest.fixture(scope="module")
+def processor():
+    return TextProcessor()
+
+
+def random_text(rng, n_words):
+    return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def random_pieces(rng, text):
+    pieces, start = [], 0
+    while start < len(text):
+        end = start + rng.randint(1, 700)
+        pieces.append(text[start:end])
+        start = end
+    return pieces
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_windowed_stream_matches_whole_text(processor, seed):
+    rng = random.Random(seed)
+    text = random_text(rng, rng.randint(0, 3000))
+    clean = processor.clean_text(text)
+    whole = processor.lexer.scan(clean)
+    pieces = random_pieces(rng, text)
+
+    assert "".join(processor.clean_chunks(pieces, rng.randint(1, 500))) == clean
+    # The smallest window the lexer allows, so long texts span many windows
+    streamed = processor.analyze_stream(pieces, window_size=2 * processor.lexer.overlap + 1)
+    assert streamed["skills"] == whole["skills"]
+    assert streamed["experience"] == whole["experience"]
+    assert streamed["char_count"] == len(clean)
+    assert streamed["word_count"] == (len(clean.split(" ")) if clean else 0)
+
+
+def test_first_stated_experience_wins_across_windows(processor):
+    filler = "built models with the team " * 200
+    text = f"{filler} experience 4 years {filler} 9 years of experience {filler}"
+    expected = processor.lexer.scan(processor.clean_text(text))["experience"]
+    assert expected["years"] == 9.0
+    streamed = processor.analyze_stream([text], window_size=2 * processor.lexer.overlap + 1)
+    assert streamed["experience"] == expected
@@ -3,131 +3,318 @@
 Text processing utilities
 Simple and reliable for Jupyter
 """
+import hashlib
+import json
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from extraction_cache import ExtractionCache
+from instrumentation import count, timed
+from skill_taxonomy import SkillMatcher, get_skill_matcher
+
+# Bump when extraction logic changes so cached results are invalidated
+EXTRACTOR_VERSION = "2"
+
+# Matched as substrings anywhere in the cleaned text
+MANAGEMENT_KEYWORDS = ['lead', 'manager', 'director', 'head', 'supervisor', 'team lead']
+
+# Highest level first; the first level with any keyword present wins
+EDUCATION_KEYWORDS = {
+    'phd': ['phd', 'ph.d', 'doctorate'],
+    'masters': ['masters', 'ms', 'm.sc', 'm.eng'],
+    'bachelors': ['bachelor', 'bs', 'b.sc', 'b.eng', 'ba']
+}
+
+# A number of years, optionally a range ("3-5 years", which counts as its
+# upper end) and optionally followed by "of experience"
+YEARS_PATTERN = re.compile(r'(\d+)(?:\s*-\s*(\d+))?\+?\s*(?:years?|yrs?)'
+                           r'(\s*(?:of)?\s*experience)?')
+
+# Long documents are cleaned and scanned this many characters at a time.
+# Consecutive windows share WINDOW_OVERLAP characters, so a token crossing
+# a window edge is still seen whole (tokens longer than that are not)
+WINDOW_SIZE = 1 << 16
+WINDOW_OVERLAP = 256
+
+_SPECIAL_CHARS = re.compile(r'[^\w\s.,\-@+#]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class TextLexer:
+    """Skills and experience signals of cleaned text, in linear time.
+    
+    Year mentions are lexed in one pass over the text and paired with the
+    first "experience", which reproduces the old pattern order without the
+    lazy ``experience.*?`` search that rescanned the rest of the text from
+    every "experience". Management and degree terms are substrings and are
+    found with str searches, which beat any regex that visits every
+    position.
+    """
+    
+    def __init__(self, skill_matcher: SkillMatcher,
+                 management_keywords: Iterable[str] = MANAGEMENT_KEYWORDS,
+                 education_keywords: Optional[Dict[str, List[str]]] = None):
+        self.skill_matcher = skill_matcher
+        self.management_keywords = list(management_keywords)
+        self.education_keywords = education_keywords or EDUCATION_KEYWORDS
+        # Room for any keyword or alias plus a character of context
+        self.overlap = max(WINDOW_OVERLAP, skill_matcher.longest_alias + 1,
+                           *map(len, self.management_keywords),
+                           *(len(k) for keywords in self.education_keywords.values()
+                             for k in keywords))
+    
+    def years_mentions(self, clean_text: str, start: int = 0
+                       ) -> Iterator[Tuple[int, int, int, bool]]:
+        """``(start, end, years, followed_by_experience)`` in text order"""
+        count('regex_evaluations')
+        for match in YEARS_PATTERN.finditer(clean_text, start):
+            first, last, experience = match.groups()
+            yield match.start(), match.end(), int(last or first), experience is not None
+    
+    def scanner(self, window_size: int = WINDOW_SIZE) -> "LexerScan":
+        """Incremental scan of cleaned text fed in chunks"""
+        return LexerScan(self, window_size)
+    
+    def scan(self, clean_text: str) -> Dict[str, Any]:
+        """Skills and experience, as the extractors return them"""
+        scan = self.scanner(len(clean_text) + 1)
+        scan.feed(clean_text)
+        return scan.finish()
+
+
+class LexerScan:
+    """TextLexer state carried across windows of one cleaned text.
+    
+    feed() buffers chunks and scans a window whenever WINDOW_SIZE
+    characters are pending. Every scan stops ``overlap`` characters short
+    of the buffer end and the next one resumes there, so memory stays
+    bounded by the window size and each token is counted once.
+    """
+    
+    def __init__(self, lexer: TextLexer, window_size: int = WINDOW_SIZE):
+        if window_size <= 2 * lexer.overlap:
+            window_size = 2 * lexer.overlap + 1
+        self.lexer = lexer
+        self.window_size = window_size
+        self.chars = 0
+        self.spaces = 0
+        self._skills: set = set()
+        self._has_management = False
+        self._education_rank = len(lexer.education_keywords)
+        self._experience_at: Optional[int] = None  # start of the first "experience"
+        self._stated: Optional[int] = None  # first "<n> years (of) experience"
+        self._after: Optional[int] = None  # first years mention after _experience_at
+        self._buffer = ''
+        self._offset = 0  # text position of _buffer[0]
+        self._scanned = 0  # text position where skills and "experience" scans resume
+        self._years_from = 0  # and the years scan, which may have consumed past it
+    
+    def feed(self, chunk: str):
+        self.chars += len(chunk)
+        self.spaces += chunk.count(' ')
+        self._buffer += chunk
+        if len(self._buffer) >= self.window_size:
+            self._scan(final=False)
+    
+    def _scan(self, final: bool):
+        lexer, buffer, offset = self.lexer, self._buffer, self._offset
+        # Tokens starting before cut are complete in this buffer
+        cut = len(buffer) if final else len(buffer) - lexer.overlap
+        start = self._scanned - offset
+        
+        self._skills |= lexer.skill_matcher.find_ids(buffer, start, cut)
+        
+        if self._experience_at is None:
+            at = buffer.find('experience', start)
+            if 0 <= at < cut:
+                self._experience_at = offset + at
+        
+        # A stated "n years (of) experience" wins; failing that the first
+        # mention after the word experience, else 0
+        if self._stated is None:
+            for begin, end, years, followed in lexer.years_mentions(buffer,
+                                                                     self._years_from - offset):
+                if begin >= cut:
+                    break
+                self._years_from = offset + end
+                if followed:
+                    self._stated = years
+                    break
+                if (self._after is None and self._experience_at is not None
+                        and offset + begin >= self._experience_at + len('experience')):
+                    self._after = years
+        
+        # Keywords are substrings; the overlap keeps each one whole in some window
+        if not self._has_management:
+            self._has_management = any(keyword in buffer
+                                       for keyword in lexer.management_keywords)
+        for rank, keywords in enumerate(list(lexer.education_keywords.values())
+                                        [:self._education_rank]):
+            if any(keyword in buffer for keyword in keywords):
+                self._education_rank = rank
+                break
+        
+        self._scanned = offset + cut
+        self._years_from = max(self._years_from, self._scanned)
+        if not final:
+            # Keep one character before the resume point for \b
+            keep = cut - 1
+            self._buffer = buffer[keep:]
+            self._offset += keep
+    
+    def finish(self) -> Dict[str, Any]:
+        self._scan(final=True)
+        self._buffer = ''
+        if self._stated is not None:
+            years = self._stated
+        else:
+            years = self._after if self._after is not None else 0
+        levels = list(self.lexer.education_keywords)
+        skills = self.lexer.skill_matcher.skills
+        return {
+            'skills': [skills[skill_id] for skill_id in sorted(self._skills)],
+            'experience': {
+                'years': float(years),
+                'has_management': self._has_management,
+                'education': (levels[self._education_rank]
+                              if self._education_rank < len(levels) else 'unknown')
+            }
+        }
+
 
 class TextProcessor:
-    def __init__(self):
+    def __init__(self, skill_aliases: Optional[Dict[str, List[str]]] = None,
+                 cache: Optional[ExtractionCache] = None):
+        # The shared skill taxonomy unless a custom canonical -> aliases map
+        # is given; either way extract_skills is a single pass over the text
+        self.skill_matcher = (SkillMatcher(skill_aliases) if skill_aliases
+                              else get_skill_matcher())
+        # One scan yields skills and experience; the last result is kept so
+        # extract_skills and extract_experience on the same text share it
+        self.lexer = TextLexer(self.skill_matcher)
+        self._last_scan = (None, None)
+        # Optional persistent cache of extraction results
+        self.cache = cache
+        self.fingerprint = hashlib.sha256(
+            json.dumps([EXTRACTOR_VERSION, self.skill_matcher.fingerprint]).encode()
+        ).hexdigest()[:16]
         print("✅ TextProcessor initialized")
     
+    def _cached(self, kind: str, text: str, compute: Callable[[str], Any]) -> Any:
+        """Return compute(text), going through the cache when one is set"""
+        if self.cache is None:
+            return compute(text)
+        key = self.cache.make_key(kind, text or "", self.fingerprint)
+        result = self.cache.get(key)
+        if result is None:
+            count('cache_misses')
+            result = compute(text)
+            self.cache.put(key, self.fingerprint, result)
+        else:
+            count('cache_hits')
+        return result
+    
+    @timed('clean_text')
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         if not text:
             return ""
-        
+        return self._normalize(text).strip()
+    
+    @staticmethod
+    def _normalize(text: str) -> str:
         # Lowercase
         text = text.lower()
         
         # Remove special characters but keep basic ones
-        text = re.sub(r'[^\w\s.,\-@+#]', ' ', text)
+        text = _SPECIAL_CHARS.sub(' ', text)
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        return _WHITESPACE.sub(' ', text)
+    
+    def clean_chunks(self, pieces: Iterable[str], chunk_size: int = WINDOW_SIZE // 2
+                     ) -> Iterator[str]:
+        """clean_text for a stream of text pieces, one bounded chunk at a time.
         
-        return text
+        The chunks concatenate to clean_text of the concatenated pieces.
+        """
+        started = pending_space = False
+        for piece in pieces:
+            for start in range(0, len(piece), chunk_size):
+                chunk = self._normalize(piece[start:start + chunk_size])
+                body = chunk.strip(' ')
+                if not body:
+                    pending_space = True
+                    continue
+                # Whitespace runs across a chunk edge collapse to one space
+                if started and (pending_space or chunk[0] == ' '):
+                    yield ' '
+                yield body
+                started = True
+                pending_space = chunk[-1] == ' '
+    
+    def _scan_stream(self, pieces: Iterable[str], window_size: int = WINDOW_SIZE) -> LexerScan:
+        scan = self.lexer.scanner(window_size)
+        for chunk in self.clean_chunks(pieces, window_size // 2):
+            scan.feed(chunk)
+        return scan
+    
+    def _scan(self, text: str) -> Dict[str, Any]:
+        """TextLexer result for raw text, reusing the previous call's"""
+        last_text, features = self._last_scan
+        if last_text != text:
+            if text and len(text) > WINDOW_SIZE:
+                features = self._scan_stream([text]).finish()
+            else:
+                features = self.lexer.scan(self.clean_text(text))
+            self._last_scan = (text, features)
+        return features
     
+    @timed('extract_skills')
     def extract_skills(self, text: str) -> List[str]:
         """Extract skills using keyword matching"""
-        # Common AI/ML skills dictionary
-        skill_patterns = {
-            'python': r'\bpython\b',
-            'tensorflow': r'\btensorflow\b|\btf\b',
-            'pytorch': r'\bpytorch\b|\btorch\b',
-            'keras': r'\bkeras\b',
-            'machine learning': r'\bmachine learning\b|\bml\b',
-            'deep learning': r'\bdeep learning\b',
-            'nlp': r'\bnlp\b|\bnatural language processing\b',
-            'computer vision': r'\bcomputer vision\b|\bcv\b|\bopencv\b',
-            'aws': r'\baws\b|\bamazon web services\b',
-            'docker': r'\bdocker\b',
-            'kubernetes': r'\bkubernetes\b|\bk8s\b',
-            'sql': r'\bsql\b',
-            'git': r'\bgit\b|\bgithub\b|\bgitlab\b',
-            'linux': r'\blinux\b',
-            'pandas': r'\bpandas\b',
-            'numpy': r'\bnumpy\b',
-            'scikit-learn': r'\bscikit-learn\b|\bsklearn\b',
-            'matplotlib': r'\bmatplotlib\b',
-            'seaborn': r'\bseaborn\b',
-            'fastapi': r'\bfastapi\b',
-            'streamlit': r'\bstreamlit\b',
-            'spark': r'\bspark\b|\bpyspark\b',
-        }
-        
-        text_lower = self.clean_text(text)
-        found_skills = []
-        
-        for skill, pattern in skill_patterns.items():
-            if re.search(pattern, text_lower):
-                found_skills.append(skill)
-        
-        return list(set(found_skills))
+        return self._cached('skills', text, lambda t: list(self._scan(t)['skills']))
     
+    @timed('extract_experience')
     def extract_experience(self, text: str) -> Dict[str, Any]:
         """Extract experience information"""
-        text_lower = self.clean_text(text)
-        
-        # Look for years of experience
-        years_patterns = [
-            r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:of)?\s*experience',
-            r'experience.*?(\d+)\+?\s*(?:years?|yrs?)',
-            r'(\d+)\s*-\s*(\d+)\s*(?:years?|yrs?)\s*(?:of)?\s*experience',
-        ]
-        
-        experience_years = 0
-        
-        for pattern in years_patterns:
-            matches = re.search(pattern, text_lower)
-            if matches:
-                groups = matches.groups()
-                if len(groups) == 2:
-                    # Range like "3-5 years"
-                    try:
-                        min_years = int(groups[0])
-                        max_years = int(groups[1])
-                        experience_years = (min_years + max_years) / 2
-                    except:
-                        experience_years = 0
-                elif len(groups) == 1:
-                    try:
-                        experience_years = int(groups[0])
-                    except:
-                        experience_years = 0
-                break
-        
-        # Check for management keywords
-        management_keywords = ['lead', 'manager', 'director', 'head', 'supervisor', 'team lead']
-        has_management = any(keyword in text_lower for keyword in management_keywords)
-        
-        # Education level
-        education_keywords = {
-            'phd': ['phd', 'ph.d', 'doctorate'],
-            'masters': ['masters', 'ms', 'm.sc', 'm.eng'],
-            'bachelors': ['bachelor', 'bs', 'b.sc', 'b.eng', 'ba']
-        }
-        
-        education = 'unknown'
-        for level, keywords in education_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                education = level
-                break
-        
-        return {
-            'years': float(experience_years),
-            'has_management': has_management,
-            'education': education
-        }
+        return self._cached('experience', text, lambda t: dict(self._scan(t)['experience']))
     
+    @timed('analyze_text')
     def analyze_text(self, text: str) -> Dict[str, Any]:
         """Complete text analysis"""
+        return self._cached('analyze', text, self._analyze)
+    
+    def _analyze(self, text: str) -> Dict[str, Any]:
+        if text and len(text) > WINDOW_SIZE:
+            return self.analyze_stream([text])
         clean_text = self.clean_text(text)
+        features = self.lexer.scan(clean_text)
         
+        # Cleaned text is words joined by single spaces
         return {
-            'skills': self.extract_skills(clean_text),
-            'experience': self.extract_experience(clean_text),
-            'word_count': len(clean_text.split()),
+            'skills': features['skills'],
+            'experience': features['experience'],
+            'word_count': clean_text.count(' ') + 1 if clean_text else 0,
             'char_count': len(clean_text)
         }
+    
+    @timed('analyze_stream')
+    def analyze_stream(self, pieces: Iterable[str], window_size: int = WINDOW_SIZE
+                       ) -> Dict[str, Any]:
+        """analyze_text of the concatenated pieces in bounded memory.
+        
+        Takes any iterable of text, e.g. document_reader.iter_text(path);
+        only about two windows of cleaned text are held at once.
+        """
+        scan = self._scan_stream(pieces, window_size)
+        features = scan.finish()
+        return {
+            'skills': features['skills'],
+            'experience': features['experience'],
+            'word_count': scan.spaces + 1 if scan.chars else 0,
+            'char_count': scan.chars
+        }
 
 # Test function
 def test_processor():